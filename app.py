@@ -1,42 +1,69 @@
 import dash
-from dash import dcc, html, Input, Output, callback, dash_table
+from dash import dcc, html, Input, Output, State, callback, dash_table
 import dash_bootstrap_components as dbc
 import plotly.express as px
 import plotly.graph_objects as go
-import pandas as pd
-import requests
-import threading
-import time
-import uvicorn
+import logging
+import os
 import subprocess
 import sys
-from src.api.main import app as fastapi_app
+from src.client.data_client import HttpDataClient, create_data_client
+from src.client.charts import odds_series_figure, player_series_figure, zoom_range
+from src.client.tables import fetch_table_page
+from src.data.cache import CACHE_MAX_ENTRIES, TTLCache
 from src.data.data_service import DataService
 
-# Initialize data service
-data_service = DataService()
-data_service.seed_sample_data()
+# Rendered player analyses are reused until one of these tables changes (or this many seconds pass)
+ANALYSIS_TABLES = ("players", "teams", "player_performances", "games")
+ANALYSIS_CACHE_SECONDS = float(os.getenv("ANALYSIS_CACHE_SECONDS", "600"))
+# Rows per page of the games and teams tables; only the visible page is fetched
+TABLE_PAGE_SIZE = int(os.getenv("TABLE_PAGE_SIZE", "10"))
+# Most recent games offered in the odds chart's game picker
+GAME_OPTIONS = 100
+# Disk cache shared by the Dash server and its background callback processes
+DASH_CACHE_DIR = os.getenv("DASH_CACHE_DIR", ".dash_cache")
 
-# Initialize Dash app
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP, dbc.icons.BOOTSTRAP])
-app.title = "NBA Betting Research MVP"
+# Data access: DataService in-process by default, or the FastAPI server with DATA_BACKEND=http
+data_client = create_data_client()
 
-# Start FastAPI server in background thread
-def start_fastapi():
+if isinstance(data_client, HttpDataClient):
+    # Start the FastAPI server in the background and wait until it answers
     subprocess.Popen([
         sys.executable, "-m", "uvicorn", "src.api.main:app",
         "--host", "127.0.0.1",
         "--port", "8080",
         "--log-level", "warning"
     ])
-api_thread = threading.Thread(target=start_fastapi, daemon=True)
-api_thread.start()
+    data_client.wait_until_ready()
+else:
+    # Initialize data service
+    data_service = DataService()
+    data_service.seed_sample_data()
+    data_service.close()
+
+def analysis_data_version() -> str:
+    return data_client.get_data_version(ANALYSIS_TABLES)
 
-# Wait a moment for API to start
-time.sleep(2)
+logger = logging.getLogger(__name__)
 
-# API base URL
-API_BASE = "http://127.0.0.1:8080/api"
+# Slow callbacks run in background processes (dash[diskcache] is in requirements.txt), and their
+# results are memoized on disk by input and data version; without it they run in the worker with an
+# in-memory memo
+try:
+    import diskcache
+    background_callback_manager = dash.DiskcacheManager(
+        diskcache.Cache(DASH_CACHE_DIR), cache_by=[analysis_data_version], expire=ANALYSIS_CACHE_SECONDS
+    )
+except ImportError:
+    logger.warning("diskcache is not installed; slow callbacks run in the Dash worker "
+                   "(pip install \"dash[diskcache]\" to run them in the background)")
+    background_callback_manager = None
+analysis_memo = TTLCache(CACHE_MAX_ENTRIES, ANALYSIS_CACHE_SECONDS)
+
+# Initialize Dash app
+app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP, dbc.icons.BOOTSTRAP],
+                background_callback_manager=background_callback_manager)
+app.title = "NBA Betting Research MVP"
 
 # App layout
 app.layout = dbc.Container([
@@ -51,8 +78,35 @@ app.layout = dbc.Container([
         dbc.Col([
             dbc.Card([
                 dbc.CardBody([
-                    html.H4("Recent Games", className="card-title"),
-                    html.Div(id="recent-games-table")
+                    html.H4("Games", className="card-title"),
+                    dash_table.DataTable(
+                        id="games-table",
+                        columns=[
+                            {"name": "Date", "id": "date", "type": "datetime"},
+                            {"name": "Away", "id": "away_team"},
+                            {"name": "Home", "id": "home_team"},
+                            {"name": "Away Pts", "id": "away_score", "type": "numeric"},
+                            {"name": "Home Pts", "id": "home_score", "type": "numeric"},
+                            {"name": "Status", "id": "status"}
+                        ],
+                        page_current=0,
+                        page_size=TABLE_PAGE_SIZE,
+                        page_action="custom",
+                        sort_action="custom",
+                        sort_mode="multi",
+                        sort_by=[],
+                        filter_action="custom",
+                        filter_query="",
+                        style_cell={'textAlign': 'left'},
+                        style_data_conditional=[
+                            {
+                                'if': {'filter_query': '{status} = completed'},
+                                'backgroundColor': '#d4edda'
+                            }
+                        ]
+                    ),
+                    dcc.Store(id="games-table-state"),
+                    html.Div(id="games-table-error")
                 ])
             ])
         ], width=6),
@@ -61,7 +115,27 @@ app.layout = dbc.Container([
             dbc.Card([
                 dbc.CardBody([
                     html.H4("Teams Overview", className="card-title"),
-                    html.Div(id="teams-table")
+                    dash_table.DataTable(
+                        id="teams-table",
+                        columns=[
+                            {"name": "Team", "id": "name"},
+                            {"name": "City", "id": "city"},
+                            {"name": "Wins", "id": "wins", "type": "numeric"},
+                            {"name": "Losses", "id": "losses", "type": "numeric"},
+                            {"name": "Win %", "id": "win_pct", "type": "numeric", "format": {"specifier": ".1f"}}
+                        ],
+                        page_current=0,
+                        page_size=TABLE_PAGE_SIZE,
+                        page_action="custom",
+                        sort_action="custom",
+                        sort_mode="multi",
+                        sort_by=[],
+                        filter_action="custom",
+                        filter_query="",
+                        style_cell={'textAlign': 'left'}
+                    ),
+                    dcc.Store(id="teams-table-state"),
+                    html.Div(id="teams-table-error")
                 ])
             ])
         ], width=6)
@@ -101,75 +175,81 @@ app.layout = dbc.Container([
                 ])
             ])
         ])
+    ], className="mb-4"),
+    
+    dbc.Row([
+        dbc.Col([
+            dbc.Card([
+                dbc.CardBody([
+                    html.H4("Game Log Over Time", className="card-title"),
+                    dcc.Graph(id="player-series-chart")
+                ])
+            ])
+        ], width=6),
+        
+        dbc.Col([
+            dbc.Card([
+                dbc.CardBody([
+                    html.H4("Odds Lines", className="card-title"),
+                    dbc.Row([
+                        dbc.Col(dcc.Dropdown(id="game-dropdown", placeholder="Select a game"), width=8),
+                        dbc.Col(dcc.Dropdown(
+                            id="bet-type-dropdown",
+                            options=[{"label": "Moneyline", "value": "moneyline"},
+                                     {"label": "Spread", "value": "spread"},
+                                     {"label": "Over/Under", "value": "over_under"}],
+                            value="moneyline",
+                            clearable=False
+                        ), width=4)
+                    ], className="mb-3"),
+                    dcc.Graph(id="odds-series-chart")
+                ])
+            ])
+        ], width=6)
     ])
 ], fluid=True)
 
 @callback(
-    Output("recent-games-table", "children"),
-    Input("recent-games-table", "id")
+    [Output("games-table", "data"),
+     Output("games-table", "page_count"),
+     Output("games-table", "page_current"),
+     Output("games-table-state", "data"),
+     Output("games-table-error", "children")],
+    [Input("games-table", "page_current"),
+     Input("games-table", "page_size"),
+     Input("games-table", "sort_by"),
+     Input("games-table", "filter_query")],
+    State("games-table-state", "data")
 )
-def update_recent_games(_):
+def update_games_table(page_current, page_size, sort_by, filter_query, state):
     try:
-        response = requests.get(f"{API_BASE}/games/recent?limit=5")
-        if response.status_code == 200:
-            games = response.json()["games"]
-            
-            df = pd.DataFrame(games)
-            if not df.empty:
-                df["matchup"] = df["away_team"] + " @ " + df["home_team"]
-                df["score"] = df["away_score"].astype(str) + " - " + df["home_score"].astype(str)
-                
-                return dash_table.DataTable(
-                    data=df[["date", "matchup", "score", "status"]].to_dict("records"),
-                    columns=[
-                        {"name": "Date", "id": "date"},
-                        {"name": "Matchup", "id": "matchup"},
-                        {"name": "Score", "id": "score"},
-                        {"name": "Status", "id": "status"}
-                    ],
-                    style_cell={'textAlign': 'left'},
-                    style_data_conditional=[
-                        {
-                            'if': {'filter_query': '{status} = completed'},
-                            'backgroundColor': '#d4edda'
-                        }
-                    ]
-                )
-        
-        return html.P("No recent games data available", className="text-muted")
+        page, page_count, page_current, state = fetch_table_page(
+            data_client.get_games_page, page_current, page_size, sort_by, filter_query, state
+        )
+        return page["games"], page_count, page_current, state, None
     except Exception as e:
-        return html.P(f"Error loading games: {str(e)}", className="text-danger")
+        return [], 1, 0, None, html.P(f"Error loading games: {str(e)}", className="text-danger")
 
 @callback(
-    Output("teams-table", "children"),
-    Input("teams-table", "id")
+    [Output("teams-table", "data"),
+     Output("teams-table", "page_count"),
+     Output("teams-table", "page_current"),
+     Output("teams-table-state", "data"),
+     Output("teams-table-error", "children")],
+    [Input("teams-table", "page_current"),
+     Input("teams-table", "page_size"),
+     Input("teams-table", "sort_by"),
+     Input("teams-table", "filter_query")],
+    State("teams-table-state", "data")
 )
-def update_teams(_):
+def update_teams(page_current, page_size, sort_by, filter_query, state):
     try:
-        response = requests.get(f"{API_BASE}/teams")
-        if response.status_code == 200:
-            teams = response.json()["teams"]
-            
-            df = pd.DataFrame(teams)
-            if not df.empty:
-                df["record"] = df["wins"].astype(str) + "-" + df["losses"].astype(str)
-                df["win_pct"] = (df["wins"] / (df["wins"] + df["losses"]) * 100).round(1)
-                
-                return dash_table.DataTable(
-                    data=df[["name", "city", "record", "win_pct"]].to_dict("records"),
-                    columns=[
-                        {"name": "Team", "id": "name"},
-                        {"name": "City", "id": "city"},
-                        {"name": "Record", "id": "record"},
-                        {"name": "Win %", "id": "win_pct", "type": "numeric", "format": {"specifier": ".1f"}}
-                    ],
-                    style_cell={'textAlign': 'left'},
-                    sort_action="native"
-                )
-        
-        return html.P("No teams data available", className="text-muted")
+        page, page_count, page_current, state = fetch_table_page(
+            data_client.get_teams_page, page_current, page_size, sort_by, filter_query, state
+        )
+        return page["teams"], page_count, page_current, state, None
     except Exception as e:
-        return html.P(f"Error loading teams: {str(e)}", className="text-danger")
+        return [], 1, 0, None, html.P(f"Error loading teams: {str(e)}", className="text-danger")
 
 @callback(
     Output("player-dropdown", "options"),
@@ -177,19 +257,85 @@ def update_teams(_):
 )
 def update_player_dropdown(_):
     try:
-        response = requests.get(f"{API_BASE}/players")
-        if response.status_code == 200:
-            players = response.json()["players"]
-            return [{"label": player["name"], "value": player["id"]} for player in players]
-        return []
+        players = data_client.get_players()
+        return [{"label": player["name"], "value": player["id"]} for player in players]
     except:
         return []
 
+def render_player_analysis(player_id):
+    """Stats panel, insights panel and chart for one player"""
+    # Get player stats and insights in one call
+    analysis = data_client.get_player_analysis(player_id)
+    stats = analysis.get("stats")
+    insights = analysis.get("insights")
+    
+    stats_content = html.P("No stats available")
+    insights_content = html.P("No insights available")
+    chart_fig = go.Figure()
+    
+    if stats:
+        if stats.get("games_played", 0) > 0:
+            stats_content = dbc.Row([
+                dbc.Col([
+                    html.H6(f"{stats['name']} ({stats['team']})", className="mb-2"),
+                    html.P(f"Position: {stats['position']}", className="mb-1"),
+                    html.P(f"Games Played: {stats['games_played']}", className="mb-1"),
+                ], width=6),
+                dbc.Col([
+                    html.P(f"PPG: {stats['avg_points']}", className="mb-1"),
+                    html.P(f"APG: {stats['avg_assists']}", className="mb-1"),
+                    html.P(f"RPG: {stats['avg_rebounds']}", className="mb-1"),
+                    html.P(f"FG%: {stats['fg_percentage']}%", className="mb-1"),
+                    html.P(f"3P%: {stats['three_pt_percentage']}%", className="mb-1")
+                ], width=6)
+            ])
+            
+            # Create performance chart
+            categories = ['Points', 'Assists', 'Rebounds', 'FG%', '3P%']
+            values = [
+                stats['avg_points'],
+                stats['avg_assists'],
+                stats['avg_rebounds'],
+                stats['fg_percentage'],
+                stats['three_pt_percentage']
+            ]
+            
+            chart_fig = go.Figure()
+            chart_fig.add_trace(go.Bar(
+                x=categories,
+                y=values,
+                marker_color=['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd']
+            ))
+            chart_fig.update_layout(
+                title=f"{stats['name']} - Season Averages",
+                xaxis_title="Statistics",
+                yaxis_title="Value",
+                height=400
+            )
+    
+    if insights:
+        if "insights" in insights and insights["insights"]:
+            insight_items = [html.Li(insight) for insight in insights["insights"]]
+            recommendation_color = "success" if insights.get("recommendation") == "BUY" else "warning"
+            
+            insights_content = html.Div([
+                html.H6(f"Analysis for {insights.get('player', 'Player')}", className="mb-3"),
+                html.Ul(insight_items, className="mb-3"),
+                dbc.Badge(
+                    f"Recommendation: {insights.get('recommendation', 'HOLD')}", 
+                    color=recommendation_color, 
+                    className="mb-2"
+                )
+            ])
+    
+    return stats_content, insights_content, chart_fig
+
 @callback(
     [Output("player-stats-content", "children"),
      Output("betting-insights-content", "children"),
      Output("player-performance-chart", "figure")],
-    Input("player-dropdown", "value")
+    Input("player-dropdown", "value"),
+    background=background_callback_manager is not None
 )
 def update_player_analysis(player_id):
     if not player_id:
@@ -200,79 +346,88 @@ def update_player_analysis(player_id):
         return html.P("Select a player to view stats"), html.P("Select a player for insights"), empty_fig
     
     try:
-        # Get player stats
-        stats_response = requests.get(f"{API_BASE}/players/{player_id}/stats")
-        insights_response = requests.get(f"{API_BASE}/players/{player_id}/insights")
-        
-        stats_content = html.P("No stats available")
-        insights_content = html.P("No insights available")
-        chart_fig = go.Figure()
-        
-        if stats_response.status_code == 200:
-            stats = stats_response.json()["stats"]
-            
-            if stats.get("games_played", 0) > 0:
-                stats_content = dbc.Row([
-                    dbc.Col([
-                        html.H6(f"{stats['name']} ({stats['team']})", className="mb-2"),
-                        html.P(f"Position: {stats['position']}", className="mb-1"),
-                        html.P(f"Games Played: {stats['games_played']}", className="mb-1"),
-                    ], width=6),
-                    dbc.Col([
-                        html.P(f"PPG: {stats['avg_points']}", className="mb-1"),
-                        html.P(f"APG: {stats['avg_assists']}", className="mb-1"),
-                        html.P(f"RPG: {stats['avg_rebounds']}", className="mb-1"),
-                        html.P(f"FG%: {stats['fg_percentage']}%", className="mb-1"),
-                        html.P(f"3P%: {stats['three_pt_percentage']}%", className="mb-1")
-                    ], width=6)
-                ])
-                
-                # Create performance chart
-                categories = ['Points', 'Assists', 'Rebounds', 'FG%', '3P%']
-                values = [
-                    stats['avg_points'],
-                    stats['avg_assists'],
-                    stats['avg_rebounds'],
-                    stats['fg_percentage'],
-                    stats['three_pt_percentage']
-                ]
-                
-                chart_fig = go.Figure()
-                chart_fig.add_trace(go.Bar(
-                    x=categories,
-                    y=values,
-                    marker_color=['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd']
-                ))
-                chart_fig.update_layout(
-                    title=f"{stats['name']} - Season Averages",
-                    xaxis_title="Statistics",
-                    yaxis_title="Value",
-                    height=400
-                )
-        
-        if insights_response.status_code == 200:
-            insights = insights_response.json()["insights"]
-            
-            if "insights" in insights and insights["insights"]:
-                insight_items = [html.Li(insight) for insight in insights["insights"]]
-                recommendation_color = "success" if insights.get("recommendation") == "BUY" else "warning"
-                
-                insights_content = html.Div([
-                    html.H6(f"Analysis for {insights.get('player', 'Player')}", className="mb-3"),
-                    html.Ul(insight_items, className="mb-3"),
-                    dbc.Badge(
-                        f"Recommendation: {insights.get('recommendation', 'HOLD')}", 
-                        color=recommendation_color, 
-                        className="mb-2"
-                    )
-                ])
+        if background_callback_manager is not None:
+            # The manager already memoizes on (player_id, data version)
+            return render_player_analysis(player_id)
         
-        return stats_content, insights_content, chart_fig
+        key = (player_id, analysis_data_version())
+        result = analysis_memo.get(key)
+        if result is None:
+            result = render_player_analysis(player_id)
+            analysis_memo.set(key, result)
+        return result
         
     except Exception as e:
+        if background_callback_manager is not None:
+            # A returned result would be memoized for this data version; let the job fail instead
+            raise
         error_msg = html.P(f"Error: {str(e)}", className="text-danger")
         empty_fig = go.Figure()
         return error_msg, error_msg, empty_fig
 
+def empty_figure(text):
+    figure = go.Figure()
+    figure.add_annotation(text=text, xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False)
+    return figure
+
+def chart_range(chart_id, relayout_data):
+    """(start, end) to fetch for a chart: the zoomed range when the chart itself triggered
+    the callback, None when that relayout did not change the x range"""
+    if dash.ctx.triggered_id != chart_id:
+        return None, None
+    return zoom_range(relayout_data)
+
+@callback(
+    Output("player-series-chart", "figure"),
+    [Input("player-dropdown", "value"),
+     Input("player-series-chart", "relayoutData")],
+    State("player-dropdown", "options")
+)
+def update_player_series(player_id, relayout_data, options):
+    if not player_id:
+        return empty_figure("Select a player to view their game log")
+    bounds = chart_range("player-series-chart", relayout_data)
+    if bounds is None:
+        return dash.no_update
+    
+    try:
+        # Downsampled to about the chart width; zooming in refetches the visible range
+        series = data_client.get_player_series(player_id, start=bounds[0], end=bounds[1])
+        name = next((option["label"] for option in options or [] if option["value"] == player_id), "Player")
+        return player_series_figure(series, name)
+    except Exception as e:
+        return empty_figure(f"Error loading game log: {str(e)}")
+
+@callback(
+    Output("game-dropdown", "options"),
+    Input("game-dropdown", "id")
+)
+def update_game_dropdown(_):
+    try:
+        games = data_client.get_games_page(GAME_OPTIONS)["games"]
+        return [{"label": f"{game['date']} {game['away_team']} @ {game['home_team']}", "value": game["id"]}
+                for game in games]
+    except:
+        return []
+
+@callback(
+    Output("odds-series-chart", "figure"),
+    [Input("game-dropdown", "value"),
+     Input("bet-type-dropdown", "value"),
+     Input("odds-series-chart", "relayoutData")]
+)
+def update_odds_series(game_id, bet_type, relayout_data):
+    if not game_id:
+        return empty_figure("Select a game to view its odds lines")
+    bounds = chart_range("odds-series-chart", relayout_data)
+    if bounds is None:
+        return dash.no_update
+    
+    try:
+        series = data_client.get_odds_series(game_id, bet_type, start=bounds[0], end=bounds[1])
+        return odds_series_figure(series, game_id, bet_type)
+    except Exception as e:
+        return empty_figure(f"Error loading odds: {str(e)}")
+
 if __name__ == "__main__":
     app.run(debug=True, port=8050, host="127.0.0.1")
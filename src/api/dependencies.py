@@ -0,0 +1,73 @@
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..data.async_data_service import AsyncDataService
+from ..models.database import get_async_db
+
+
+def get_data_service(db: AsyncSession = Depends(get_async_db)) -> AsyncDataService:
+    """AsyncDataService bound to the request-scoped async session"""
+    return AsyncDataService(db)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class ConditionalGet:
+    """Route dependency adding ETag/Last-Modified validators derived from table versions.
+
+    The ETag hashes the request path, query string and the versions of ``tables``,
+    so it changes exactly when a committed write touches data the route reads.
+    Matching ``If-None-Match`` (or, without it, ``If-Modified-Since``) requests are
+    answered with 304 before the route runs.
+    """
+
+    def __init__(self, *tables: str):
+        self.tables = tables
+
+    async def __call__(self, request: Request, response: Response,
+                       data_service: AsyncDataService = Depends(get_data_service)):
+        versions = await data_service.get_table_versions()
+        table_versions = [versions.get(table, (0, None)) for table in self.tables]
+
+        digest = hashlib.sha1(
+            f"{request.url.path}?{request.url.query}|"
+            f"{','.join(str(version) for version, _ in table_versions)}".encode()
+        ).hexdigest()
+        # Weak, because the compression middleware may re-encode the body
+        headers = {"ETag": f'W/"{digest}"', "Cache-Control": "no-cache"}
+
+        modified = [updated_at for _, updated_at in table_versions if updated_at is not None]
+        last_modified = max(modified).replace(tzinfo=timezone.utc, microsecond=0) if modified else None
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+        if_none_match = request.headers.get("if-none-match")
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, headers["ETag"])
+        elif if_modified_since and last_modified is not None:
+            try:
+                not_modified = last_modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                not_modified = False
+        else:
+            not_modified = False
+
+        if not_modified:
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
@@ -0,0 +1,306 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from itertools import chain
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+from fastapi import WebSocket, WebSocketDisconnect
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..data.live_feed import score_event
+from ..data.odds_history import LATEST_COLUMNS, odds_event
+from ..models.database import Game, Odds, OddsLatest, SessionLocal, get_table_versions, on_events_committed
+
+load_dotenv()
+
+# Events buffered per subscriber; the oldest are dropped when a client falls behind
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "256"))
+# Idle seconds before an SSE keep-alive comment is sent
+LIVE_HEARTBEAT_SECONDS = float(os.getenv("LIVE_HEARTBEAT_SECONDS", "15"))
+# Seconds between checks for odds and scores committed by other processes (e.g. the ingestion CLI)
+LIVE_POLL_SECONDS = float(os.getenv("LIVE_POLL_SECONDS", "1.0"))
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ("odds", "score")
+
+
+class Subscription:
+    """One connected client: its filters and a bounded queue of serialized events"""
+
+    __slots__ = ("game_ids", "bookmakers", "types", "queue", "dropped")
+
+    def __init__(self, game_ids: Optional[Set[int]], bookmakers: Optional[Set[str]], types: Optional[Set[str]],
+                 queue_size: int):
+        self.game_ids = game_ids
+        self.bookmakers = bookmakers
+        self.types = types
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.dropped = 0
+
+    def matches(self, event: Dict) -> bool:
+        """Game filtering is done by the hub's index; check the remaining filters"""
+        if self.types and event["type"] not in self.types:
+            return False
+        # Score events have no bookmaker and reach every subscriber of the game
+        return not self.bookmakers or event.get("bookmaker") is None or event["bookmaker"] in self.bookmakers
+
+    def deliver(self, item: Tuple[str, str]):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(item)
+
+
+class LiveHub:
+    """Fan-out of committed odds and score changes to subscribed clients.
+
+    Subscriptions are indexed by game (or all games), so a change only visits the
+    clients watching its game. Each event is serialized once, on first match, and
+    the same string is queued for every matching client; clients that fall behind
+    lose their oldest events instead of slowing down the publisher.
+    """
+
+    def __init__(self, queue_size: int = LIVE_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._by_game: Dict[Optional[int], Set[Subscription]] = defaultdict(set)
+        self._subscribers = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listening = False
+        self.published = 0
+        self.delivered = 0
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """Publish changes committed by this process on ``loop``"""
+        self._loop = loop
+        if not self._listening:
+            on_events_committed(self.publish_threadsafe)
+            self._listening = True
+
+    def subscribe(self, game_ids: Optional[Iterable[int]] = None, bookmakers: Optional[Iterable[str]] = None,
+                  types: Optional[Iterable[str]] = None) -> Subscription:
+        subscription = Subscription(
+            set(game_ids) if game_ids else None,
+            set(bookmakers) if bookmakers else None,
+            set(types) if types else None,
+            self.queue_size,
+        )
+        self._index(subscription)
+        return subscription
+
+    @property
+    def subscribers(self) -> int:
+        return self._subscribers
+
+    def resubscribe(self, subscription: Subscription, game_ids: Optional[Iterable[int]] = None,
+                    bookmakers: Optional[Iterable[str]] = None, types: Optional[Iterable[str]] = None):
+        """Replace the filters of an existing subscription, keeping its queue"""
+        self.unsubscribe(subscription)
+        subscription.game_ids = set(game_ids) if game_ids else None
+        subscription.bookmakers = set(bookmakers) if bookmakers else None
+        subscription.types = set(types) if types else None
+        self._index(subscription)
+
+    def _index(self, subscription: Subscription):
+        for game_id in subscription.game_ids or (None,):
+            self._by_game[game_id].add(subscription)
+        self._subscribers += 1
+
+    def unsubscribe(self, subscription: Subscription):
+        for game_id in subscription.game_ids or (None,):
+            subscribers = self._by_game.get(game_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._by_game[game_id]
+        self._subscribers -= 1
+
+    def publish(self, events: List[Dict]):
+        """Queue ``events`` for every matching subscriber; must run on the hub's loop"""
+        everyone = self._by_game.get(None, ())
+        for event in events:
+            self.published += 1
+            message = None
+            for subscription in chain(self._by_game.get(event["game_id"], ()), everyone):
+                if subscription.matches(event):
+                    if message is None:
+                        message = json.dumps(event)
+                    subscription.deliver((event["type"], message))
+                    self.delivered += 1
+
+    def publish_threadsafe(self, events: List[Dict]):
+        """Commit listener: hand ``events`` to the loop, from whichever thread committed"""
+        loop = self._loop
+        if self._subscribers and loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self.publish, events)
+
+    def stats(self) -> Dict:
+        subscriptions = set(chain.from_iterable(self._by_game.values()))
+        return {
+            "subscribers": self._subscribers,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": sum(subscription.dropped for subscription in subscriptions),
+        }
+
+
+def _odds_key(event: Dict) -> Tuple:
+    return event["game_id"], event["bookmaker"], event["bet_type"], event["selection"], event["timestamp"]
+
+
+class CommittedChangePoller:
+    """Publishes odds and score changes committed by other processes to a hub.
+
+    Commits made by this process reach the hub through the commit listener; a
+    separate writer only moves the odds_latest and games table versions. When one
+    moves, odds snapshots inserted since the last check (the odds table is
+    append-only, so by id) that are now the latest line, and open games whose
+    score or status differ from the last seen, are published. Events this process
+    published itself are remembered so they are not sent twice.
+    """
+
+    def __init__(self, hub: LiveHub, session_factory: Callable[[], Session] = SessionLocal,
+                 interval: float = LIVE_POLL_SECONDS):
+        self.hub = hub
+        self.session_factory = session_factory
+        self.interval = interval
+        self._versions: Optional[Tuple] = None
+        self._odds_id = 0
+        self._scores: Dict[int, Tuple] = {}
+        self._own_odds: Set[Tuple] = set()
+        self._previous_own_odds: Set[Tuple] = set()
+        self._lock = threading.Lock()
+        self._listening = False
+
+    def _remember(self, events: List[Dict]):
+        """Commit listener: note what this process publishes itself"""
+        with self._lock:
+            for event in events:
+                if event["type"] == "odds":
+                    self._own_odds.add(_odds_key(event))
+                else:
+                    self._scores[event["game_id"]] = (event["home_score"], event["away_score"], event["status"])
+
+    def _read_scores(self, db: Session) -> Dict[int, Tuple]:
+        open_games = Game.status.in_(("scheduled", "live"))
+        with self._lock:
+            tracked = list(self._scores)
+        rows = db.execute(
+            select(Game.id, Game.home_score, Game.away_score, Game.status)
+            .where(or_(open_games, Game.id.in_(tracked)) if tracked else open_games)
+        )
+        return {game_id: tuple(score) for game_id, *score in rows}
+
+    def poll(self) -> List[Dict]:
+        """Events for changes committed since the last call; the first call only takes a baseline"""
+        with self.session_factory() as db:
+            versions = get_table_versions(db)
+            current = tuple(versions.get(name, (0, None))[0] for name in ("odds_latest", "games"))
+            first = self._versions is None
+            events = []
+            if first or current[0] != self._versions[0]:
+                odds_id = db.scalar(select(func.max(Odds.id))) or 0
+                if not first and odds_id > self._odds_id:
+                    with self._lock:
+                        own = self._own_odds | self._previous_own_odds
+                        self._previous_own_odds, self._own_odds = self._own_odds, set()
+                    rows = db.execute(
+                        select(*[getattr(OddsLatest, column) for column in LATEST_COLUMNS])
+                        .join(Odds, and_(Odds.game_id == OddsLatest.game_id, Odds.bookmaker == OddsLatest.bookmaker,
+                                         Odds.bet_type == OddsLatest.bet_type, Odds.selection == OddsLatest.selection,
+                                         Odds.timestamp == OddsLatest.timestamp))
+                        .where(Odds.id > self._odds_id, Odds.id <= odds_id)
+                        .distinct()
+                    ).mappings()
+                    events.extend(event for event in map(odds_event, rows) if _odds_key(event) not in own)
+                self._odds_id = odds_id
+            if first or current[1] != self._versions[1]:
+                scores = self._read_scores(db)
+                with self._lock:
+                    if not first:
+                        events.extend(score_event(game_id, *score) for game_id, score in scores.items()
+                                      if self._scores.get(game_id, score) != score)
+                    # A finished game has nothing left to publish
+                    self._scores = {game_id: score for game_id, score in scores.items() if score[2] != "completed"}
+            self._versions = current
+        return events
+
+    async def run(self):
+        """Poll every ``interval`` seconds and publish on the running loop until cancelled"""
+        if not self._listening:
+            on_events_committed(self._remember)
+            self._listening = True
+        while True:
+            try:
+                events = await asyncio.to_thread(self.poll)
+            except SQLAlchemyError:
+                logger.exception("Polling for committed changes failed")
+            else:
+                if events and self.hub.subscribers:
+                    self.hub.publish(events)
+            await asyncio.sleep(self.interval)
+
+
+async def sse_stream(hub: LiveHub, subscription: Subscription):
+    """Server-Sent Events for one subscription, with keep-alives while idle"""
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event_type, message = await asyncio.wait_for(subscription.queue.get(), LIVE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event_type}\ndata: {message}\n\n"
+    finally:
+        hub.unsubscribe(subscription)
+
+
+def parse_filters(message: Dict) -> Dict:
+    """Subscription filters from a WebSocket message ``{"games", "bookmakers", "types"}``"""
+    types = message.get("types")
+    if types and not set(types) <= set(EVENT_TYPES):
+        raise ValueError(f"types must be among {', '.join(EVENT_TYPES)}")
+    return {
+        "game_ids": [int(game_id) for game_id in message.get("games") or []],
+        "bookmakers": [str(bookmaker) for bookmaker in message.get("bookmakers") or []],
+        "types": types,
+    }
+
+
+async def serve_websocket(hub: LiveHub, websocket: WebSocket, subscription: Subscription):
+    """Send the subscription's events; messages from the client replace its filters"""
+
+    async def receive_filters():
+        while True:
+            message = await websocket.receive_json()
+            try:
+                hub.resubscribe(subscription, **parse_filters(message))
+            except (ValueError, TypeError, AttributeError) as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+
+    async def send_events():
+        while True:
+            _, message = await subscription.queue.get()
+            await websocket.send_text(message)
+
+    tasks = [asyncio.create_task(receive_filters()), asyncio.create_task(send_events())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not isinstance(task.exception(), WebSocketDisconnect):
+                task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        hub.unsubscribe(subscription)
+
+
+live_hub = LiveHub()
+change_poller = CommittedChangePoller(live_hub)
@@ -1,21 +1,127 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
 from typing import List, Dict, Optional
+import asyncio
+import os
 import uvicorn
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+from datetime import datetime
 
+from ..data.async_data_service import AsyncDataService
+from ..data.cache import response_cache
 from ..data.data_service import DataService
+from ..data.hit_rates import ALL_STATS
+from ..data.live_feed import SimulatedFeed
+from ..data.odds_history import MAX_INTERVAL_MINUTES, SELECTIONS
+from ..data.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, InvalidQuery, stream_ndjson
+from ..data.performance_store import performance_store
+from ..data.series import MAX_SERIES_POINTS, MIN_SERIES_POINTS, SERIES_POINTS, SERIES_STATS
+from ..models.database import (
+    Team, Player, Game, PlayerPerformance, Odds,
+    AsyncSessionLocal, async_engine, engine
+)
+from .dependencies import ConditionalGet, get_data_service
+from .live import EVENT_TYPES, change_poller, live_hub, parse_filters, serve_websocket, sse_stream
+from .metrics import METRICS_ENABLED, PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, render_metrics
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # brotli is optional, gzip is always available
+    BrotliMiddleware = None
+
+# Play scheduled games live in-process (scores and odds every LIVE_FEED_INTERVAL_SECONDS) for testing
+LIVE_SIMULATION = os.getenv("LIVE_SIMULATION", "False").lower() in ("1", "true", "yes")
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+
+PLAYER_STATS_TABLES = ("players", "teams", "player_season_aggregates")
+PLAYER_ANALYSIS_TABLES = ("players", "teams", "player_performances", "games")
+PLAYER_FORM_TABLES = ("players", "player_performances", "games")
+PLAYER_INSIGHTS_TABLES = PLAYER_STATS_TABLES + ("player_performances", "games")
+
+# Upper bound on ids accepted by the batch endpoints
+MAX_BATCH_IDS = 100
+
+# Tables that can be streamed as NDJSON, and the filters each accepts
+EXPORT_TABLES = {
+    "teams": (Team, ()),
+    "players": (Player, ("team_id",)),
+    "games": (Game, ("home_team_id", "away_team_id")),
+    "player_performances": (PlayerPerformance, ("player_id", "game_id")),
+    "odds": (Odds, ("game_id",)),
+}
+
+# Upper bound on prop lines scored per hit-rate request
+MAX_PROPS = 5000
+
+class PropLine(BaseModel):
+    player_id: int
+    stat: str
+    line: float
+
+class HitRateRequest(BaseModel):
+    props: List[PropLine]
+    windows: Optional[List[int]] = None
+
+def parse_ids(ids: Optional[str]) -> Optional[List[int]]:
+    """Parse a comma separated ``ids`` query parameter"""
+    if not ids:
+        return None
+    try:
+        parsed = [int(i) for i in ids.split(",") if i.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma separated list of integers")
+    if len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    return parsed
+
+def parse_live_filters(games: Optional[str], bookmakers: Optional[str], types: Optional[str]) -> Dict:
+    """Subscription filters from comma separated query parameters"""
+    try:
+        return parse_filters({
+            "games": parse_ids(games),
+            "bookmakers": bookmakers.split(",") if bookmakers else None,
+            "types": types.split(",") if types else None,
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def check_windows(windows: Optional[List[int]]) -> Optional[List[int]]:
+    """Hit-rate windows asked for by a caller are trailing game counts of at least one game"""
+    if windows is not None and any(window < 1 for window in windows):
+        raise HTTPException(status_code=422, detail="windows must be game counts of at least 1")
+    return windows
 
-# Initialize data service
-data_service = DataService()
+def check_offset(offset: int, cursor: Optional[str]):
+    """A page is addressed by cursor or by offset, not both"""
+    if offset and cursor:
+        raise InvalidQuery("Pass either cursor or offset, not both")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    data_service.seed_sample_data()
+    # Startup: create tables, backfill aggregates and seed using a short-lived session
+    data_service = DataService()
+    try:
+        data_service.seed_sample_data()
+    finally:
+        data_service.close()
+    live_hub.attach(asyncio.get_running_loop())
+    # Odds and scores committed by other processes, such as the ingestion CLI
+    poller = asyncio.create_task(change_poller.run())
+    simulation = asyncio.create_task(SimulatedFeed().run()) if LIVE_SIMULATION else None
     yield
     # Shutdown
-    data_service.close()
+    for task in (poller, simulation):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    await async_engine.dispose()
+    engine.dispose()
 
 app = FastAPI(
     title="NBA Betting Research API",
@@ -33,42 +139,272 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large payloads (brotli when installed and accepted, gzip otherwise)
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_BYTES, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
+# Per-route latency and SQL timings, outermost so compression is included
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 @app.get("/")
 async def root():
     return {"message": "NBA Betting Research API", "status": "active"}
 
-@app.get("/api/teams")
-async def get_teams():
-    """Get all NBA teams"""
+@app.get("/api/teams", dependencies=[Depends(ConditionalGet("teams"))])
+async def get_teams(limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None,
+                    offset: int = Query(0, ge=0), sort: Optional[str] = None,
+                    filters: Optional[List[str]] = Query(None, alias="filter"), total: bool = False,
+                    data_service: AsyncDataService = Depends(get_data_service)):
+    """Get all NBA teams; one sorted, filtered page with win percentage when ``limit`` or ``cursor`` is given"""
     try:
-        teams = data_service.get_teams()
-        return {"teams": teams}
+        if limit is None and cursor is None:
+            teams = await data_service.get_teams()
+            return {"teams": teams}
+        check_offset(offset, cursor)
+        return await data_service.get_teams_page(limit or DEFAULT_PAGE_SIZE, cursor, sort, filters, offset, total)
+    except (InvalidCursor, InvalidQuery) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/teams/{team_id}/stats", dependencies=[Depends(ConditionalGet("teams", "team_season_aggregates"))])
+async def get_team_stats(team_id: int, season: Optional[int] = None,
+                         data_service: AsyncDataService = Depends(get_data_service)):
+    """Get team per-game averages, optionally for one season (start year)"""
+    try:
+        stats = await data_service.get_team_stats(team_id, season)
+        if not stats:
+            raise HTTPException(status_code=404, detail="Team not found")
+        return {"stats": stats}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/players")
-async def get_players(team_id: Optional[int] = None):
-    """Get players, optionally filtered by team"""
+@app.get("/api/players", dependencies=[Depends(ConditionalGet("players"))])
+async def get_players(team_id: Optional[int] = None, limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None,
+                      data_service: AsyncDataService = Depends(get_data_service)):
+    """Get players, optionally filtered by team; paged by id when ``limit`` or ``cursor`` is given"""
     try:
-        players = data_service.get_players(team_id)
-        return {"players": players}
+        if limit is None and cursor is None:
+            players = await data_service.get_players(team_id)
+            return {"players": players}
+        return await data_service.get_players_page(limit or DEFAULT_PAGE_SIZE, cursor, team_id)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/games/recent")
-async def get_recent_games(limit: int = 10):
+@app.get("/api/games", dependencies=[Depends(ConditionalGet("games", "teams"))])
+async def get_games(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None,
+                    team_id: Optional[int] = None, offset: int = Query(0, ge=0), sort: Optional[str] = None,
+                    filters: Optional[List[str]] = Query(None, alias="filter"), total: bool = False,
+                    data_service: AsyncDataService = Depends(get_data_service)):
+    """Page through games, most recent first unless ``sort`` (``-home_score,date``) says otherwise.
+
+    ``filter`` (repeatable) is ``column:operator:value``; pass ``next_cursor`` back as
+    ``cursor`` for the next page, or jump with ``offset``. ``total`` adds the match count.
+    """
+    try:
+        check_offset(offset, cursor)
+        return await data_service.get_games_page(limit, cursor, team_id, sort, filters, offset, total)
+    except (InvalidCursor, InvalidQuery) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/performances", dependencies=[Depends(ConditionalGet("player_performances"))])
+async def get_performances(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None,
+                           player_id: Optional[int] = None, game_id: Optional[int] = None,
+                           data_service: AsyncDataService = Depends(get_data_service)):
+    """Page through box scores by id, optionally for one player or game"""
+    try:
+        return await data_service.get_performances_page(limit, cursor, player_id, game_id)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/odds", dependencies=[Depends(ConditionalGet("odds"))])
+async def get_odds(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None,
+                   game_id: Optional[int] = None, offset: int = Query(0, ge=0), sort: Optional[str] = None,
+                   filters: Optional[List[str]] = Query(None, alias="filter"), total: bool = False,
+                   data_service: AsyncDataService = Depends(get_data_service)):
+    """Page through odds snapshots by id (or ``sort``), optionally for one game and matching ``filter``"""
+    try:
+        check_offset(offset, cursor)
+        return await data_service.get_odds_page(limit, cursor, game_id, sort, filters, offset, total)
+    except (InvalidCursor, InvalidQuery) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/odds/scanner", dependencies=[Depends(ConditionalGet("odds_latest", "games", "teams"))])
+async def get_odds_scanner(game_ids: Optional[str] = None, bet_type: Optional[str] = None,
+                           min_edge: Optional[float] = None, arbitrage_only: bool = False,
+                           data_service: AsyncDataService = Depends(get_data_service)):
+    """Best line per side, hold, value edges and arbitrage across every bookmaker.
+
+    Scans today's scheduled games, or the comma separated ``game_ids``.
+    """
+    ids = parse_ids(game_ids)
+    if bet_type is not None and bet_type not in SELECTIONS:
+        raise HTTPException(status_code=400, detail=f"bet_type must be one of {', '.join(SELECTIONS)}")
+    try:
+        markets = await data_service.get_odds_scanner(ids, bet_type, min_edge, arbitrage_only)
+        return {"markets": markets}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/export/{table}")
+async def export_table(table: str, team_id: Optional[int] = None, player_id: Optional[int] = None,
+                       game_id: Optional[int] = None, home_team_id: Optional[int] = None,
+                       away_team_id: Optional[int] = None):
+    """Stream a whole table as NDJSON from a server-side cursor"""
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table {table}")
+    model, allowed = EXPORT_TABLES[table]
+    given = {"team_id": team_id, "player_id": player_id, "game_id": game_id,
+             "home_team_id": home_team_id, "away_team_id": away_team_id}
+    filters = {name: value for name, value in given.items() if value is not None}
+    unsupported = sorted(set(filters) - set(allowed))
+    if unsupported:
+        raise HTTPException(status_code=400, detail=f"{table} cannot be filtered by {', '.join(unsupported)}")
+    return StreamingResponse(stream_ndjson(AsyncSessionLocal, model, filters), media_type="application/x-ndjson")
+
+@app.get("/api/games/recent", dependencies=[Depends(ConditionalGet("games", "teams"))])
+async def get_recent_games(limit: int = 10, data_service: AsyncDataService = Depends(get_data_service)):
     """Get recent games"""
     try:
-        games = data_service.get_recent_games(limit)
+        games = await data_service.get_recent_games(limit)
         return {"games": games}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/players/{player_id}/stats")
-async def get_player_stats(player_id: int):
+@app.get("/api/players/stats", dependencies=[Depends(ConditionalGet(*PLAYER_STATS_TABLES))])
+async def get_players_stats(ids: Optional[str] = None, team_id: Optional[int] = None,
+                            data_service: AsyncDataService = Depends(get_data_service)):
+    """Get statistics for several players (comma separated ids) or a whole team"""
+    player_ids = parse_ids(ids)
+    try:
+        stats = await data_service.get_players_stats(player_ids, team_id)
+        return {"stats": stats}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/players/analysis", dependencies=[Depends(ConditionalGet(*PLAYER_ANALYSIS_TABLES))])
+async def get_players_analysis(ids: str, data_service: AsyncDataService = Depends(get_data_service)):
+    """Get stats, insights and game logs for several players (comma separated ids)"""
+    player_ids = parse_ids(ids)
+    if not player_ids:
+        raise HTTPException(status_code=400, detail="ids is required")
+    try:
+        analyses = await data_service.get_players_analysis(player_ids)
+        return {"analyses": analyses}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/players/form", dependencies=[Depends(ConditionalGet(*PLAYER_FORM_TABLES))])
+async def get_players_form(ids: str, data_service: AsyncDataService = Depends(get_data_service)):
+    """Get last-N and EWMA form for several players (comma separated ids)"""
+    player_ids = parse_ids(ids)
+    if not player_ids:
+        raise HTTPException(status_code=400, detail="ids is required")
+    try:
+        forms = await data_service.get_players_form(player_ids)
+        return {"forms": forms}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/players/{player_id}/form", dependencies=[Depends(ConditionalGet(*PLAYER_FORM_TABLES))])
+async def get_player_form(player_id: int, data_service: AsyncDataService = Depends(get_data_service)):
+    """Get last-N rolling means, standard deviations and EWMAs per stat for a player"""
+    try:
+        forms = await data_service.get_players_form([player_id])
+        if not forms:
+            raise HTTPException(status_code=404, detail="Player not found")
+        return {"form": forms[0]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/props/hit-rates")
+async def get_hit_rates(request: HitRateRequest, data_service: AsyncDataService = Depends(get_data_service)):
+    """Score a board of (player, stat, line) props against each player's history"""
+    if len(request.props) > MAX_PROPS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PROPS} props per request")
+    windows = check_windows(request.windows)
+    unknown = sorted({prop.stat for prop in request.props} - set(ALL_STATS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown stats: {', '.join(unknown)}")
+    try:
+        props = [{"player_id": prop.player_id, "stat": prop.stat, "line": prop.line} for prop in request.props]
+        results = await data_service.get_hit_rates(props, windows)
+        return {"results": results}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/players/{player_id}/hit-rates", dependencies=[Depends(ConditionalGet("player_performances", "games"))])
+async def get_player_hit_rates(player_id: int, stat: str, lines: str, windows: Optional[str] = None,
+                               data_service: AsyncDataService = Depends(get_data_service)):
+    """Hit rates of comma separated ``lines`` on one stat for a player"""
+    if stat not in ALL_STATS:
+        raise HTTPException(status_code=400, detail=f"stat must be one of {', '.join(ALL_STATS)}")
+    try:
+        props = [{"player_id": player_id, "stat": stat, "line": float(line)} for line in lines.split(",") if line.strip()]
+        window_list = [int(window) for window in windows.split(",")] if windows else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="lines and windows must be comma separated numbers")
+    window_list = check_windows(window_list)
+    if len(props) > MAX_PROPS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PROPS} lines per request")
+    try:
+        results = await data_service.get_hit_rates(props, window_list)
+        return {"results": results}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/players/{player_id}/series", dependencies=[Depends(ConditionalGet("player_performances", "games"))])
+async def get_player_series(player_id: int, stats: Optional[str] = None,
+                            points: int = Query(SERIES_POINTS, ge=MIN_SERIES_POINTS, le=MAX_SERIES_POINTS),
+                            start: Optional[datetime] = None, end: Optional[datetime] = None,
+                            data_service: AsyncDataService = Depends(get_data_service)):
+    """Game-by-game comma separated ``stats`` for a player, downsampled to about ``points`` per stat.
+
+    Pass the visible ``start``/``end`` when zooming: a range of at most ``points``
+    games comes back at full resolution.
+    """
+    stat_list = [stat for stat in stats.split(",") if stat] if stats else None
+    unknown = sorted(set(stat_list or ()) - set(SERIES_STATS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown stats: {', '.join(unknown)}")
+    try:
+        return await data_service.get_player_series(player_id, stat_list, points, start, end)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/players/{player_id}/analysis", dependencies=[Depends(ConditionalGet(*PLAYER_ANALYSIS_TABLES))])
+async def get_player_analysis(player_id: int, data_service: AsyncDataService = Depends(get_data_service)):
+    """Get stats, insights and game log for a player in one call"""
+    try:
+        analysis = await data_service.get_player_analysis(player_id)
+        if not analysis:
+            raise HTTPException(status_code=404, detail="Player not found")
+        return {"analysis": analysis}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/players/{player_id}/stats", dependencies=[Depends(ConditionalGet(*PLAYER_STATS_TABLES))])
+async def get_player_stats(player_id: int, data_service: AsyncDataService = Depends(get_data_service)):
     """Get player statistics"""
     try:
-        stats = data_service.get_player_stats(player_id)
+        stats = await data_service.get_player_stats(player_id)
         if not stats:
             raise HTTPException(status_code=404, detail="Player not found")
         return {"stats": stats}
@@ -77,24 +413,88 @@ async def get_player_stats(player_id: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/games/{game_id}/odds")
-async def get_odds_comparison(game_id: int):
-    """Get odds comparison for a specific game"""
+@app.get("/api/games/{game_id}/odds", dependencies=[Depends(ConditionalGet("odds_latest"))])
+async def get_odds_comparison(game_id: int, data_service: AsyncDataService = Depends(get_data_service)):
+    """Get the latest line from every bookmaker for a specific game"""
     try:
-        odds = data_service.get_odds_comparison(game_id)
+        odds = await data_service.get_odds_comparison(game_id)
         return {"odds": odds}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/players/{player_id}/insights")
-async def get_betting_insights(player_id: int):
+@app.get("/api/games/{game_id}/odds/movement", dependencies=[Depends(ConditionalGet("odds"))])
+async def get_line_movement(game_id: int, interval: int = Query(60, ge=1, le=MAX_INTERVAL_MINUTES),
+                            bookmaker: Optional[str] = None, bet_type: Optional[str] = None,
+                            data_service: AsyncDataService = Depends(get_data_service)):
+    """Get open/high/low/close odds and lines per ``interval`` minutes for a game"""
+    try:
+        movement = await data_service.get_line_movement(game_id, interval, bookmaker, bet_type)
+        return {"game_id": game_id, "interval_minutes": interval, "movement": movement}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/games/{game_id}/odds/series", dependencies=[Depends(ConditionalGet("odds"))])
+async def get_odds_series(game_id: int, bet_type: Optional[str] = None, bookmaker: Optional[str] = None,
+                          points: int = Query(SERIES_POINTS, ge=MIN_SERIES_POINTS, le=MAX_SERIES_POINTS),
+                          start: Optional[datetime] = None, end: Optional[datetime] = None,
+                          data_service: AsyncDataService = Depends(get_data_service)):
+    """Price and line over time per bookmaker and side for a game, downsampled to about ``points`` each"""
+    try:
+        series = await data_service.get_odds_series(game_id, bet_type, bookmaker, points, start, end)
+        return {"game_id": game_id, "series": series}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/players/{player_id}/insights", dependencies=[Depends(ConditionalGet(*PLAYER_INSIGHTS_TABLES))])
+async def get_betting_insights(player_id: int, data_service: AsyncDataService = Depends(get_data_service)):
     """Get betting insights for a player"""
     try:
-        insights = data_service.get_betting_insights(player_id)
+        insights = await data_service.get_betting_insights(player_id)
         return {"insights": insights}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/live/events")
+async def live_events(games: Optional[str] = None, bookmakers: Optional[str] = None, types: Optional[str] = None):
+    """Server-Sent Events stream of odds and score changes, optionally for some games, bookmakers or event types"""
+    subscription = live_hub.subscribe(**parse_live_filters(games, bookmakers, types))
+    return StreamingResponse(sse_stream(live_hub, subscription), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.websocket("/api/live/ws")
+async def live_websocket(websocket: WebSocket, games: Optional[str] = None, bookmakers: Optional[str] = None,
+                         types: Optional[str] = None):
+    """WebSocket stream of odds and score changes; send {"games", "bookmakers", "types"} to change filters"""
+    try:
+        filters = parse_live_filters(games, bookmakers, types)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    await websocket.accept()
+    await serve_websocket(live_hub, websocket, live_hub.subscribe(**filters))
+
+@app.get("/api/live/stats")
+async def get_live_stats():
+    """Connected live subscribers and events published, delivered and dropped"""
+    return {"live": live_hub.stats(), "event_types": list(EVENT_TYPES)}
+
+@app.get("/api/versions")
+async def get_versions(tables: Optional[str] = None, data_service: AsyncDataService = Depends(get_data_service)):
+    """Version per table (all tables, or the comma separated ``tables``); bumped by every committed write"""
+    versions = await data_service.get_table_versions()
+    names = tables.split(",") if tables else sorted(versions)
+    return {"versions": {name: versions.get(name, (0, None))[0] for name in names}}
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Response cache hit/miss counters and the size of the in-memory performance snapshot"""
+    return {"cache": response_cache.stats(), "performance_store": performance_store.stats()}
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Request, SQL and slow-query metrics in the Prometheus text format"""
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
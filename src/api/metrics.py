@@ -0,0 +1,284 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.responses import Response
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # pyinstrument is optional, cProfile is the fallback
+    Profiler = None
+
+load_dotenv()
+
+# Record request and SQL metrics (exposed at /metrics)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() in ("1", "true", "yes")
+# Statements slower than this are logged with the route that issued them
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+# Allow ?profile=1 on any request to return a profile of it instead of the response
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False").lower() in ("1", "true", "yes")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Streams that stay open for the life of the connection; their duration is not a latency
+UNTIMED_PATHS = {"/api/live/events"}
+
+_SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+# Lines of cProfile output returned when pyinstrument is not installed
+_PROFILE_LINES = 60
+
+slow_query_logger = logging.getLogger("src.sql.slow")
+_lock = threading.Lock()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_pairs(names: Sequence[str], values: Sequence) -> List[str]:
+    return [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in sorted(self._values.items()):
+            yield self.name, _label_pairs(self.labels, labels), value
+
+
+class Gauge(Counter):
+    """Value that goes up and down, per label set"""
+
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram:
+    """Bucketed observations per label set, rendered as cumulative Prometheus buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labels: Tuple[str, ...], buckets: Sequence[float]):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # Per label set: one count per bucket, then the overflow count, sum and total count
+        self._series: Dict[tuple, List[float]] = {}
+
+    def observe(self, value: float, *labels):
+        with _lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        for labels, series in sorted(self._series.items()):
+            pairs = _label_pairs(self.labels, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                yield f"{self.name}_bucket", pairs + [f'le="{bound}"'], cumulative
+            yield f"{self.name}_sum", pairs, series[-2]
+            yield f"{self.name}_count", pairs, series[-1]
+
+
+requests_total = Counter("http_requests_total", "HTTP requests handled", ("method", "route", "status"))
+requests_in_progress = Gauge("http_requests_in_progress", "HTTP requests being handled")
+request_seconds = Histogram("http_request_duration_seconds", "Time from request to the last response byte",
+                            ("method", "route"), LATENCY_BUCKETS)
+request_sql_seconds = Histogram("http_request_sql_duration_seconds", "Time spent executing SQL per request",
+                                ("method", "route"), LATENCY_BUCKETS)
+request_queries = Histogram("http_request_queries", "SQL statements executed per request",
+                            ("method", "route"), QUERY_COUNT_BUCKETS)
+statement_seconds = Histogram("db_statement_duration_seconds", "SQL statement execution time",
+                              ("operation",), LATENCY_BUCKETS)
+slow_queries_total = Counter("db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS",
+                             ("operation", "route"))
+
+REGISTRY = [requests_total, requests_in_progress, request_seconds, request_sql_seconds, request_queries,
+            statement_seconds, slow_queries_total]
+
+
+def render_metrics() -> str:
+    """Every metric in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        with _lock:
+            samples = list(metric.samples())
+        for name, pairs, value in samples:
+            lines.append(f"{name}{{{','.join(pairs)}}} {value}" if pairs else f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class RequestStats:
+    """SQL work done on behalf of the current request"""
+
+    __slots__ = ("scope", "queries", "sql_seconds")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.sql_seconds = 0.0
+
+    @property
+    def method(self) -> str:
+        return self.scope["method"]
+
+    @property
+    def route(self) -> str:
+        """Path template of the matched route, once routing has happened"""
+        return getattr(self.scope.get("route"), "path", "unmatched")
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def _operation(statement: str) -> str:
+    operation = statement.lstrip()[:6].upper()
+    return operation if operation in _SQL_OPERATIONS else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["statement_started"].pop()
+    operation = _operation(statement)
+    statement_seconds.observe(elapsed, operation)
+
+    request = _current_request.get()
+    if request is not None:
+        request.queries += 1
+        request.sql_seconds += elapsed
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        method, route = (request.method, request.route) if request is not None else ("-", "-")
+        slow_queries_total.inc(operation, route)
+        slow_query_logger.warning("%.1f ms %s %s: %s", elapsed * 1000, method, route, " ".join(statement.split()))
+
+
+def _handle_error(context):
+    started = context.connection.info.get("statement_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+if METRICS_ENABLED:
+    # On the Engine class, so the sync engine behind the async one is covered too
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+def _wants_profile(scope) -> bool:
+    values = parse_qs(scope.get("query_string", b"").decode()).get("profile")
+    return bool(values) and values[-1].lower() in ("1", "true", "yes")
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and SQL work per route.
+
+    Routes are labelled by their path template (``/api/players/{player_id}/stats``)
+    and the response carries a ``Server-Timing`` header splitting the time spent
+    in SQL from the rest. With ``PROFILING_ENABLED``, ``?profile=1`` returns a
+    profile of the request (pyinstrument when installed, cProfile otherwise).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in UNTIMED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        if PROFILING_ENABLED and _wants_profile(scope):
+            await self._profile(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", f'sql;dur={stats.sql_seconds * 1000:.1f};desc="{stats.queries} queries", '
+                                                f'total;dur={(time.perf_counter() - started) * 1000:.1f}')
+            await send(message)
+
+        requests_in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started
+            requests_in_progress.dec()
+            _current_request.reset(token)
+            method, route = stats.method, stats.route
+            requests_total.inc(method, route, str(status))
+            request_seconds.observe(elapsed, method, route)
+            request_sql_seconds.observe(stats.sql_seconds, method, route)
+            request_queries.observe(stats.queries, method, route)
+
+    async def _profile(self, scope, receive, send):
+        async def discard(message):
+            pass
+
+        if Profiler is not None:
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+            try:
+                await self.app(scope, receive, discard)
+            finally:
+                profiler.stop()
+            response = Response(profiler.output_html(), media_type="text/html")
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, discard)
+            finally:
+                profiler.disable()
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(_PROFILE_LINES)
+            response = Response(output.getvalue(), media_type="text/plain")
+        await response(scope, receive, send)
+
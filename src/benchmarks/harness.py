@@ -0,0 +1,257 @@
+import asyncio
+import platform
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+import numpy as np
+from fastapi.routing import APIRoute
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..api.main import app
+from ..data.cache import response_cache
+from ..data.data_service import DataService
+from ..data.seed import SeedConfig, bulk_seed
+from ..models.database import (
+    Team, Player, Game, PlayerPerformance, Odds,
+    SessionLocal, async_engine, create_tables, engine
+)
+from ..models.query_plan import _service_calls
+
+# Routes that never finish (live streams) and cannot be timed request by request
+UNTIMED_ROUTES = {"/api/live/events"}
+
+
+def ensure_dataset(config: SeedConfig) -> Dict[str, int]:
+    """Seed the configured database with ``config`` unless it already holds data; returns row counts"""
+    create_tables()
+    with SessionLocal() as db:
+        if not db.scalar(select(func.count()).select_from(Team)):
+            bulk_seed(db, config)
+    # Builds the aggregate and latest-odds tables if they are missing
+    DataService().close()
+    with SessionLocal() as db:
+        return {
+            model.__tablename__: db.scalar(select(func.count()).select_from(model))
+            for model in (Team, Player, Game, PlayerPerformance, Odds)
+        }
+
+
+def summarize(latencies: Sequence[float], elapsed: float) -> Dict:
+    """Latency percentiles (ms) and throughput of ``latencies`` seconds measured over ``elapsed``"""
+    ms = np.asarray(latencies, dtype=float) * 1000
+    return {
+        "count": len(ms),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+        "per_second": round(len(ms) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def _names(labels: List[str]) -> List[str]:
+    """Unique report keys: repeated labels get a ``#n`` suffix"""
+    seen = Counter()
+    names = []
+    for label in labels:
+        seen[label] += 1
+        names.append(label if seen[label] == 1 else f"{label}#{seen[label]}")
+    return names
+
+
+def _timed(call: Callable, iterations: int, cold: bool) -> Dict:
+    call()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        if cold:
+            response_cache.clear()
+        call_started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def bench_service(iterations: int, cold: bool = False) -> Dict[str, Dict]:
+    """Time every DataService query (see ``query_plan._service_calls``) called directly"""
+    service = DataService()
+    try:
+        calls = _service_calls(service.db)
+        results = {}
+        for name, (method, args) in zip(_names([method for method, _ in calls]), calls):
+            results[name] = _timed(lambda: getattr(service, method)(*args), iterations, cold)
+        return results
+    finally:
+        service.close()
+
+
+def api_requests(db: Session) -> List[Tuple[str, str, Optional[Dict]]]:
+    """Representative request for every API route, using ids present in the database"""
+    team_id = db.scalar(select(Team.id).limit(1))
+    player_id = db.scalar(select(PlayerPerformance.player_id).limit(1))
+    game_id = db.scalar(select(Odds.game_id).limit(1))
+    player_ids = ",".join(str(i) for i in db.scalars(select(Player.id).order_by(Player.id).limit(10)))
+    props = [
+        {"player_id": player, "stat": stat, "line": line}
+        for player in db.scalars(select(Player.id).order_by(Player.id).limit(50))
+        for stat, line in (("points", 18.5), ("rebounds", 6.5), ("points_rebounds_assists", 28.5))
+    ]
+    return [
+        ("GET", "/", None),
+        ("GET", "/api/teams", None),
+        ("GET", "/api/teams?limit=10&sort=-win_pct&total=true", None),
+        ("GET", f"/api/teams/{team_id}/stats", None),
+        ("GET", "/api/players", None),
+        ("GET", f"/api/players?team_id={team_id}&limit=50", None),
+        ("GET", "/api/games?limit=100", None),
+        ("GET", "/api/games?limit=10&offset=20&sort=-home_score,date&filter=status:eq:completed&total=true", None),
+        ("GET", "/api/games/recent", None),
+        ("GET", f"/api/performances?player_id={player_id}&limit=100", None),
+        ("GET", f"/api/odds?game_id={game_id}&limit=100", None),
+        ("GET", f"/api/odds?game_id={game_id}&limit=20&sort=-timestamp&filter=bet_type:eq:spread", None),
+        ("GET", "/api/odds/scanner", None),
+        ("GET", f"/api/odds/scanner?game_ids={game_id}", None),
+        ("GET", f"/api/export/players?team_id={team_id}", None),
+        ("GET", f"/api/players/stats?team_id={team_id}", None),
+        ("GET", f"/api/players/analysis?ids={player_ids}", None),
+        ("GET", f"/api/players/form?ids={player_ids}", None),
+        ("GET", f"/api/players/{player_id}/form", None),
+        ("POST", "/api/props/hit-rates", {"props": props}),
+        ("GET", f"/api/players/{player_id}/hit-rates?stat=points&lines=15.5,20.5,25.5", None),
+        ("GET", f"/api/players/{player_id}/analysis", None),
+        ("GET", f"/api/players/{player_id}/stats", None),
+        ("GET", f"/api/games/{game_id}/odds", None),
+        ("GET", f"/api/games/{game_id}/odds/movement?interval=60", None),
+        ("GET", f"/api/games/{game_id}/odds/series?points=200", None),
+        ("GET", f"/api/players/{player_id}/series?stats=points,rebounds,assists", None),
+        ("GET", f"/api/players/{player_id}/insights", None),
+        ("GET", "/api/live/stats", None),
+        ("GET", "/api/versions?tables=players,player_performances", None),
+        ("GET", "/api/cache/stats", None),
+        ("GET", "/api/health", None),
+        ("GET", "/metrics", None),
+    ]
+
+
+def _route_path(method: str, url: str) -> str:
+    """Path template of the route serving ``url``, so report keys do not depend on ids"""
+    path = url.split("?")[0]
+    for route in app.routes:
+        if isinstance(route, APIRoute) and method in route.methods and route.path_regex.match(path):
+            return route.path
+    return path
+
+
+def uncovered_routes(requests: List[Tuple[str, str, Optional[Dict]]]) -> List[str]:
+    """HTTP routes of the app that no benchmark request reaches (WebSockets excluded)"""
+    uncovered = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or route.path in UNTIMED_ROUTES:
+            continue
+        if not any(_route_path(method, url) == route.path for method, url, _ in requests):
+            uncovered.append(f"{','.join(sorted(route.methods))} {route.path}")
+    return uncovered
+
+
+async def _load(client: httpx.AsyncClient, method: str, url: str, body: Optional[Dict],
+                concurrency: int, total: int, cold: bool) -> Dict:
+    latencies = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            if cold:
+                response_cache.clear()
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - started)
+            errors += response.status_code >= 400
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {**summarize(latencies, time.perf_counter() - started), "errors": errors}
+
+
+async def _bench_api(requests, concurrency_levels: Sequence[int], total: int, cold: bool) -> Dict[str, Dict]:
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        names = _names([f"{method} {_route_path(method, url)}" for method, url, _ in requests])
+        for name, (method, url, body) in zip(names, requests):
+            # Warm-up: first-request costs (snapshot loads, cache fill) are not part of the steady state
+            await client.request(method, url, json=body)
+            results[name] = {"url": url}
+            for concurrency in concurrency_levels:
+                results[name][str(concurrency)] = await _load(
+                    client, method, url, body, concurrency, max(total, concurrency), cold
+                )
+    await async_engine.dispose()
+    return results
+
+
+def bench_api(concurrency_levels: Sequence[int], total: int, cold: bool = False) -> Tuple[Dict[str, Dict], List[str]]:
+    """Time every route through an in-process ASGI client at each concurrency level.
+
+    ``total`` requests are spread over ``concurrency`` concurrent clients per level.
+    Returns the results per route and the routes left untimed.
+    """
+    with SessionLocal() as db:
+        requests = api_requests(db)
+    return asyncio.run(_bench_api(requests, concurrency_levels, total, cold)), uncovered_routes(requests)
+
+
+def run_benchmarks(scale: str, config: SeedConfig, iterations: int, concurrency_levels: Sequence[int],
+                   requests: int, cold: bool = False) -> Dict:
+    """Build (or reuse) the dataset and time the service layer and the API; returns the report"""
+    dataset = ensure_dataset(config)
+    service = bench_service(iterations, cold)
+    api, untimed = bench_api(concurrency_levels, requests, cold)
+    engine.dispose()
+    return {
+        "created": datetime.utcnow().isoformat(timespec="seconds"),
+        "scale": scale,
+        "dataset": dataset,
+        "environment": {"python": platform.python_version(), "machine": platform.machine(),
+                        "database": engine.dialect.name},
+        "settings": {"iterations": iterations, "concurrency": list(concurrency_levels),
+                     "requests": requests, "cold_cache": cold},
+        "service": service,
+        "api": api,
+        "untimed_routes": untimed,
+    }
+
+
+def _flatten(report: Dict) -> Dict[str, Dict]:
+    results = {f"service {name}": result for name, result in report.get("service", {}).items()}
+    for name, levels in report.get("api", {}).items():
+        for level, result in levels.items():
+            if level != "url":
+                results[f"{name} c={level}"] = result
+    return results
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float = 0.2, min_delta_ms: float = 1.0) -> List[Dict]:
+    """Results whose p95 latency grew by more than ``tolerance`` (and ``min_delta_ms``) over the baseline"""
+    current, previous = _flatten(report), _flatten(baseline)
+    regressions = []
+    for name, result in current.items():
+        before = previous.get(name)
+        if before is None:
+            continue
+        delta = result["p95_ms"] - before["p95_ms"]
+        if delta > min_delta_ms and result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append({
+                "name": name,
+                "baseline_p95_ms": before["p95_ms"],
+                "p95_ms": result["p95_ms"],
+                "change": round(delta / before["p95_ms"], 3) if before["p95_ms"] else None,
+            })
+    return regressions
@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Where generated benchmark databases are kept, one SQLite file per scale
+BENCHMARK_DATA_DIR = os.getenv("BENCHMARK_DATA_DIR", "benchmark_data")
+
+# Dataset scales, as SeedConfig overrides (see src/data/seed.py)
+SCALES = {
+    # The demo league the app seeds on first start
+    "sample": {"teams": 6, "players_per_team": 2, "games": 20, "scheduled_games": 3, "lines_per_game": 10,
+               "season_days": 30},
+    # A full regular season with hourly odds for the last day before each game
+    "season": {"games": 1230, "odds_snapshots_per_game": 24},
+    # Five seasons of results with six-hourly odds
+    "five-seasons": {"games": 6150, "season_days": 5 * 365, "odds_snapshots_per_game": 4,
+                     "snapshot_interval_minutes": 360},
+    # Fewer games, odds every minute for the four hours before tip-off
+    "minute-odds": {"games": 200, "odds_snapshots_per_game": 240, "snapshot_interval_minutes": 1},
+}
+
+
+def _print_report(report: dict, regressions: list):
+    print(f"{report['scale']}: " + ", ".join(f"{count} {table}" for table, count in report["dataset"].items()))
+    print(f"{'':60} {'p50 ms':>9} {'p95 ms':>9} {'req/s':>9}")
+    for name, result in report["service"].items():
+        print(f"{'service ' + name:60} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} {result['per_second']:9.1f}")
+    for name, levels in report["api"].items():
+        for level, result in levels.items():
+            if level != "url":
+                label = f"{name} c={level}" + (f" ({result['errors']} errors)" if result["errors"] else "")
+                print(f"{label:60} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} {result['per_second']:9.1f}")
+    if report["untimed_routes"]:
+        print("not covered: " + ", ".join(report["untimed_routes"]))
+    for regression in regressions:
+        print(f"REGRESSION {regression['name']}: p95 {regression['baseline_p95_ms']:.2f} -> "
+              f"{regression['p95_ms']:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every DataService query and API route on a synthetic league")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="season")
+    parser.add_argument("--database-url", default=None,
+                        help=f"database to benchmark (seeded if empty), defaults to {BENCHMARK_DATA_DIR}/<scale>.db")
+    parser.add_argument("--iterations", type=int, default=20, help="timed calls per DataService query")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma separated concurrent client counts")
+    parser.add_argument("--requests", type=int, default=64, help="requests per route and concurrency level")
+    parser.add_argument("--cold", action="store_true", help="clear the response cache before every call")
+    parser.add_argument("--output", default=None, help="write the JSON report to this file")
+    parser.add_argument("--baseline", default=None, help="report to compare against; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative p95 increase")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore p95 increases smaller than this")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        os.makedirs(BENCHMARK_DATA_DIR, exist_ok=True)
+        database_url = f"sqlite:///{os.path.join(BENCHMARK_DATA_DIR, args.scale)}.db"
+    # The engines are created when the models are imported, so point them at the dataset first
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    from ..data.seed import SeedConfig
+    from .harness import compare, run_benchmarks
+
+    report = run_benchmarks(
+        args.scale, SeedConfig(**SCALES[args.scale]), args.iterations,
+        [int(level) for level in args.concurrency.split(",")], args.requests, args.cold,
+    )
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance, args.min_delta_ms)
+        report["regressions"] = regressions
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    _print_report(report, regressions)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
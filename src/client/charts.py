@@ -0,0 +1,58 @@
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import plotly.graph_objects as go
+
+STAT_LABELS = {"points": "Points", "rebounds": "Rebounds", "assists": "Assists"}
+
+
+def zoom_range(relayout_data: Optional[Dict]) -> Optional[Tuple[Optional[str], Optional[str]]]:
+    """Visible x range after a zoom as ISO timestamps, ``(None, None)`` after a reset.
+
+    None when the relayout event did not touch the x axis (first draw, legend
+    clicks, y-only zoom), so the figure can be left as it is.
+    """
+    if not relayout_data:
+        return None
+    if relayout_data.get("xaxis.autorange"):
+        return None, None
+    bounds = relayout_data.get("xaxis.range") or [relayout_data.get("xaxis.range[0]"), relayout_data.get("xaxis.range[1]")]
+    if bounds[0] is None or bounds[1] is None:
+        return None
+    return tuple(pd.Timestamp(bound).floor("s").isoformat() for bound in bounds)
+
+
+def _note(figure: go.Figure, text: str) -> go.Figure:
+    figure.add_annotation(text=text, xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False)
+    return figure
+
+
+def player_series_figure(series: Dict, name: str = "Player") -> go.Figure:
+    """Line per stat of a player's game log, as returned by /api/players/{id}/series"""
+    figure = go.Figure()
+    for stat, values in series.get("series", {}).items():
+        figure.add_trace(go.Scattergl(x=values["dates"], y=values["values"], mode="lines+markers",
+                                      name=STAT_LABELS.get(stat, stat.replace("_", " ").title())))
+    games = series.get("games", 0)
+    detail = "downsampled, zoom in for every game" if series.get("downsampled") else "every game"
+    figure.update_layout(title=f"{name} - Game Log ({games} games, {detail})", xaxis_title="Date",
+                         yaxis_title="Value", height=400, uirevision=series.get("player_id"))
+    if not games:
+        _note(figure, "No games in this range")
+    return figure
+
+
+def odds_series_figure(series: List[Dict], game_id: int, bet_type: str) -> go.Figure:
+    """Price line per bookmaker and side, as returned by /api/games/{id}/odds/series"""
+    figure = go.Figure()
+    for line in series:
+        hover = [f"line {value:+g}" if value is not None else "" for value in line["line"]]
+        figure.add_trace(go.Scattergl(x=line["timestamps"], y=line["odds_value"], mode="lines", text=hover,
+                                      name=f"{line['bookmaker']} {line['selection']}"))
+    snapshots = sum(line["snapshots"] for line in series)
+    figure.update_layout(title=f"{bet_type.replace('_', '/').title()} odds ({snapshots} snapshots)",
+                         xaxis_title="Time", yaxis_title="American odds", height=400,
+                         uirevision=f"{game_id}-{bet_type}")
+    if not series:
+        _note(figure, "No odds in this range")
+    return figure
@@ -0,0 +1,261 @@
+import os
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from ..data.cache import CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, TTLCache
+from ..data.data_service import DataService
+from ..data.series import SERIES_POINTS
+from ..models.database import SessionLocal, get_table_versions
+
+load_dotenv()
+
+# "inprocess" calls DataService directly; "http" goes through the FastAPI server
+DATA_BACKEND = os.getenv("DATA_BACKEND", "inprocess")
+API_BASE_URL = os.getenv("API_BASE_URL", "http://127.0.0.1:8080/api")
+
+
+class DataClientError(Exception):
+    """Raised when the data backend cannot serve a request"""
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    """ISO timestamp (as sent in API query strings) for in-process calls"""
+    return datetime.fromisoformat(value) if value else None
+
+
+def _version_token(versions: Iterable[int]) -> str:
+    return ".".join(str(version) for version in versions)
+
+
+class DataClient(ABC):
+    """Data access used by the Dash app, independent of where the data comes from"""
+
+    @abstractmethod
+    def get_teams(self) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    def get_players(self, team_id: Optional[int] = None) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    def get_recent_games(self, limit: int = 10) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    def get_teams_page(self, limit: int, cursor: Optional[str] = None, offset: int = 0,
+                       sort: Optional[str] = None, filters: Optional[List[str]] = None,
+                       total: bool = False) -> Dict:
+        """One sorted, filtered page of teams: ``{"teams", "next_cursor"}`` (and ``"total"``)"""
+
+    @abstractmethod
+    def get_games_page(self, limit: int, cursor: Optional[str] = None, offset: int = 0,
+                       sort: Optional[str] = None, filters: Optional[List[str]] = None,
+                       total: bool = False) -> Dict:
+        """One sorted, filtered page of games: ``{"games", "next_cursor"}`` (and ``"total"``)"""
+
+    @abstractmethod
+    def get_player_stats(self, player_id: int) -> Dict:
+        """Player statistics, empty dict if the player does not exist"""
+
+    @abstractmethod
+    def get_betting_insights(self, player_id: int) -> Dict:
+        ...
+
+    @abstractmethod
+    def get_player_analysis(self, player_id: int) -> Dict:
+        """Stats, insights and game log in one call, empty dict if the player does not exist"""
+
+    @abstractmethod
+    def get_player_series(self, player_id: int, stats: Optional[List[str]] = None, points: Optional[int] = None,
+                          start: Optional[str] = None, end: Optional[str] = None) -> Dict:
+        """Downsampled game-by-game stats, see DataService.get_player_series"""
+
+    @abstractmethod
+    def get_odds_series(self, game_id: int, bet_type: Optional[str] = None, points: Optional[int] = None,
+                        start: Optional[str] = None, end: Optional[str] = None) -> List[Dict]:
+        """Downsampled price and line series per bookmaker and side, see DataService.get_odds_series"""
+
+    @abstractmethod
+    def get_data_version(self, tables: Sequence[str]) -> str:
+        """Token that changes whenever a write to one of ``tables`` is committed"""
+
+    def close(self):
+        pass
+
+
+class InProcessDataClient(DataClient):
+    """Calls DataService in this process with a short-lived session per call"""
+
+    def _call(self, method: str, *args):
+        with SessionLocal() as db:
+            return getattr(DataService(db), method)(*args)
+
+    def get_teams(self) -> List[Dict]:
+        return self._call("get_teams")
+
+    def get_players(self, team_id: Optional[int] = None) -> List[Dict]:
+        return self._call("get_players", team_id)
+
+    def get_recent_games(self, limit: int = 10) -> List[Dict]:
+        return self._call("get_recent_games", limit)
+
+    def get_teams_page(self, limit: int, cursor: Optional[str] = None, offset: int = 0,
+                       sort: Optional[str] = None, filters: Optional[List[str]] = None,
+                       total: bool = False) -> Dict:
+        return self._call("get_teams_page", limit, cursor, sort, filters, offset, total)
+
+    def get_games_page(self, limit: int, cursor: Optional[str] = None, offset: int = 0,
+                       sort: Optional[str] = None, filters: Optional[List[str]] = None,
+                       total: bool = False) -> Dict:
+        return self._call("get_games_page", limit, cursor, None, sort, filters, offset, total)
+
+    def get_player_stats(self, player_id: int) -> Dict:
+        return self._call("get_player_stats", player_id)
+
+    def get_betting_insights(self, player_id: int) -> Dict:
+        return self._call("get_betting_insights", player_id)
+
+    def get_player_analysis(self, player_id: int) -> Dict:
+        return self._call("get_player_analysis", player_id)
+
+    def get_player_series(self, player_id: int, stats: Optional[List[str]] = None, points: Optional[int] = None,
+                          start: Optional[str] = None, end: Optional[str] = None) -> Dict:
+        return self._call("get_player_series", player_id, stats, points or SERIES_POINTS, _parse_time(start),
+                          _parse_time(end))
+
+    def get_odds_series(self, game_id: int, bet_type: Optional[str] = None, points: Optional[int] = None,
+                        start: Optional[str] = None, end: Optional[str] = None) -> List[Dict]:
+        return self._call("get_odds_series", game_id, bet_type, None, points or SERIES_POINTS, _parse_time(start),
+                          _parse_time(end))
+
+    def get_data_version(self, tables: Sequence[str]) -> str:
+        with SessionLocal() as db:
+            versions = get_table_versions(db)
+        return _version_token(versions.get(table, (0, None))[0] for table in tables)
+
+
+class HttpDataClient(DataClient):
+    """Talks to the FastAPI server over a pooled keep-alive session.
+
+    Responses are revalidated with their ETag, so unchanged data costs a 304
+    instead of a full download. The validated bodies are kept in an LRU of
+    ``CACHE_MAX_ENTRIES`` URLs; one not revalidated for ``CACHE_TTL_SECONDS``
+    is dropped.
+    """
+
+    def __init__(self, base_url: str = API_BASE_URL, timeout: float = 5.0, pool_size: int = 10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._validated = TTLCache(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS)
+
+    def wait_until_ready(self, timeout: float = 15.0, interval: float = 0.1):
+        """Poll the health endpoint until the API answers, instead of sleeping blindly"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if self.session.get(f"{self.base_url}/health", timeout=interval * 10).status_code == 200:
+                    return
+            except requests.ConnectionError:
+                pass
+            if time.monotonic() >= deadline:
+                raise DataClientError(f"API at {self.base_url} not ready after {timeout}s")
+            time.sleep(interval)
+
+    def _get(self, path: str, params: Optional[Dict] = None, not_found=None):
+        url = f"{self.base_url}{path}"
+        key = url + "?" + "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        validated = self._validated.get(key)
+        headers = {"If-None-Match": validated[0]} if validated else {}
+
+        try:
+            response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise DataClientError(str(e)) from e
+
+        if response.status_code == 304 and validated:
+            self._validated.set(key, validated)
+            return validated[1]
+        if response.status_code == 404 and not_found is not None:
+            return not_found
+        if response.status_code != 200:
+            raise DataClientError(f"GET {path} returned {response.status_code}")
+
+        payload = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            self._validated.set(key, (etag, payload))
+        return payload
+
+    def get_teams(self) -> List[Dict]:
+        return self._get("/teams")["teams"]
+
+    def get_players(self, team_id: Optional[int] = None) -> List[Dict]:
+        params = {"team_id": team_id} if team_id else None
+        return self._get("/players", params)["players"]
+
+    def get_recent_games(self, limit: int = 10) -> List[Dict]:
+        return self._get("/games/recent", {"limit": limit})["games"]
+
+    @staticmethod
+    def _page_params(limit: int, cursor: Optional[str], offset: int, sort: Optional[str],
+                     filters: Optional[List[str]], total: bool) -> Dict:
+        params = {"limit": limit, "cursor": cursor, "offset": offset or None, "sort": sort,
+                  "filter": filters or None, "total": "true" if total else None}
+        return {name: value for name, value in params.items() if value is not None}
+
+    def get_teams_page(self, limit: int, cursor: Optional[str] = None, offset: int = 0,
+                       sort: Optional[str] = None, filters: Optional[List[str]] = None,
+                       total: bool = False) -> Dict:
+        return self._get("/teams", self._page_params(limit, cursor, offset, sort, filters, total))
+
+    def get_games_page(self, limit: int, cursor: Optional[str] = None, offset: int = 0,
+                       sort: Optional[str] = None, filters: Optional[List[str]] = None,
+                       total: bool = False) -> Dict:
+        return self._get("/games", self._page_params(limit, cursor, offset, sort, filters, total))
+
+    def get_player_stats(self, player_id: int) -> Dict:
+        return self._get(f"/players/{player_id}/stats", not_found={"stats": {}})["stats"]
+
+    def get_betting_insights(self, player_id: int) -> Dict:
+        return self._get(f"/players/{player_id}/insights")["insights"]
+
+    def get_player_analysis(self, player_id: int) -> Dict:
+        return self._get(f"/players/{player_id}/analysis", not_found={"analysis": {}})["analysis"]
+
+    def get_player_series(self, player_id: int, stats: Optional[List[str]] = None, points: Optional[int] = None,
+                          start: Optional[str] = None, end: Optional[str] = None) -> Dict:
+        params = {"stats": ",".join(stats) if stats else None, "points": points, "start": start, "end": end}
+        return self._get(f"/players/{player_id}/series", {k: v for k, v in params.items() if v is not None})
+
+    def get_odds_series(self, game_id: int, bet_type: Optional[str] = None, points: Optional[int] = None,
+                        start: Optional[str] = None, end: Optional[str] = None) -> List[Dict]:
+        params = {"bet_type": bet_type, "points": points, "start": start, "end": end}
+        return self._get(f"/games/{game_id}/odds/series", {k: v for k, v in params.items() if v is not None})["series"]
+
+    def get_data_version(self, tables: Sequence[str]) -> str:
+        versions = self._get("/versions", {"tables": ",".join(tables)})["versions"]
+        return _version_token(versions[table] for table in tables)
+
+    def close(self):
+        self.session.close()
+
+
+def create_data_client(backend: Optional[str] = None) -> DataClient:
+    """Data client for DATA_BACKEND ("inprocess" or "http")"""
+    backend = (backend or DATA_BACKEND).lower()
+    if backend == "http":
+        return HttpDataClient()
+    if backend == "inprocess":
+        return InProcessDataClient()
+    raise ValueError(f"Unknown data backend: {backend}")
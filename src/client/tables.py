@@ -0,0 +1,65 @@
+import math
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Dash filter_query operators and the API filter operator each maps to
+_OPERATORS = {
+    "=": "eq", "eq": "eq", "!=": "ne", "ne": "ne", "<": "lt", "lt": "lt", "<=": "le", "le": "le",
+    ">": "gt", "gt": "gt", ">=": "ge", "ge": "ge", "contains": "contains", "datestartswith": "eq",
+}
+_CLAUSE = re.compile(r"^\s*\{(?P<column>[^}]+)\}\s+[is]?(?P<operator>\S+)\s+(?P<value>.+?)\s*$")
+
+
+def table_sort(sort_by: Optional[List[Dict]]) -> Optional[str]:
+    """API ``sort`` parameter for a DataTable ``sort_by``"""
+    if not sort_by:
+        return None
+    return ",".join(("-" if column["direction"] == "desc" else "") + column["column_id"] for column in sort_by)
+
+
+def table_filters(filter_query: Optional[str]) -> List[str]:
+    """API ``column:operator:value`` filters for a DataTable ``filter_query``.
+
+    Covers what the filter row produces: clauses joined by ``&&``, each a column,
+    an operator and a (possibly quoted) value. Anything else raises ValueError.
+    """
+    filters = []
+    for clause in (filter_query or "").split(" && "):
+        if not clause.strip():
+            continue
+        match = _CLAUSE.match(clause)
+        if match is None or match["operator"] not in _OPERATORS:
+            raise ValueError(f"Unsupported filter: {clause.strip()}")
+        value = match["value"]
+        if len(value) > 1 and value[0] == value[-1] and value[0] in "\"'`":
+            value = value[1:-1].replace("\\" + value[0], value[0])
+        filters.append(f"{match['column']}:{_OPERATORS[match['operator']]}:{value}")
+    return filters
+
+
+def fetch_table_page(fetch: Callable[..., Dict], page_current: int, page_size: int,
+                     sort_by: Optional[List[Dict]], filter_query: Optional[str],
+                     state: Optional[Dict]) -> Tuple[Dict, int, int, Dict]:
+    """Fetch the visible page of a custom-paged DataTable and nothing else.
+
+    ``fetch(limit, cursor, offset, sort, filters, total)`` is a DataClient page
+    getter. ``state`` (kept in a dcc.Store) remembers the cursor of every page
+    reached so far, so stepping through pages is keyset paged; a jump to an unseen
+    page falls back to its offset. A new sort or filter starts over from the first
+    page and recounts the matching rows, as does every fetch of the first page.
+    Returns the page, the page count, the current page and the new state.
+    """
+    sort, filters = table_sort(sort_by), table_filters(filter_query)
+    query = [sort, filters, page_size]
+    if not state or state.get("query") != query:
+        state = {"query": query, "cursors": {}, "total": None}
+        page_current = 0
+
+    cursor = state["cursors"].get(str(page_current))
+    page = fetch(page_size, cursor, 0 if cursor else page_current * page_size, sort, filters,
+                 state["total"] is None or page_current == 0)
+    if "total" in page:
+        state["total"] = page["total"]
+    if page["next_cursor"]:
+        state["cursors"][str(page_current + 1)] = page["next_cursor"]
+    return page, max(1, math.ceil(state["total"] / page_size)), page_current, state
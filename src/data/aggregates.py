@@ -0,0 +1,282 @@
+import argparse
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, case, delete, distinct, event, exists, extract, func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..models.database import (
+    Game, Player, PlayerPerformance, PlayerSeasonAggregate, TeamSeasonAggregate,
+    SessionLocal, create_tables
+)
+
+# Box-score columns summed into both aggregate tables
+STAT_COLUMNS = [
+    "points", "assists", "rebounds", "steals", "blocks", "turnovers",
+    "field_goals_made", "field_goals_attempted",
+    "three_pointers_made", "three_pointers_attempted",
+    "free_throws_made", "free_throws_attempted",
+    "minutes_played",
+]
+
+
+def season_for_date(date: datetime) -> int:
+    """Season start year for a game date (NBA seasons start in October)"""
+    return date.year if date.month >= 10 else date.year - 1
+
+
+def _season_expr(date_column):
+    return case(
+        (extract("month", date_column) >= 10, extract("year", date_column)),
+        else_=extract("year", date_column) - 1,
+    )
+
+
+def _empty_delta() -> Dict:
+    delta = {column: 0 for column in STAT_COLUMNS}
+    delta["games_played"] = 0
+    return delta
+
+
+def _upsert_deltas(connection: Connection, model, key_name: str, deltas: Dict[Tuple[int, int], Dict]):
+    """Add running-sum deltas to existing aggregate rows and insert the missing ones"""
+    if not deltas:
+        return
+
+    key_column = getattr(model, key_name)
+    keys = {key for key, _ in deltas}
+    seasons = {season for _, season in deltas}
+    existing = set(connection.execute(
+        select(key_column, model.season).where(key_column.in_(keys), model.season.in_(seasons))
+    ).all())
+
+    updates, inserts = [], []
+    for (key, season), delta in deltas.items():
+        if (key, season) in existing:
+            updates.append({"b_key": key, "b_season": season, **{f"d_{c}": v for c, v in delta.items()}})
+        else:
+            inserts.append({key_name: key, "season": season, **delta})
+
+    if updates:
+        counters = [c for c in updates[0] if c.startswith("d_") and c != "d_team_id"]
+        values = {c[2:]: getattr(model, c[2:]) + bindparam(c) for c in counters}
+        if "d_team_id" in updates[0]:
+            values["team_id"] = func.coalesce(bindparam("d_team_id"), model.team_id)
+        connection.execute(
+            update(model)
+            .where(key_column == bindparam("b_key"), model.season == bindparam("b_season"))
+            .values(values),
+            updates,
+        )
+    if inserts:
+        connection.execute(insert(model), inserts)
+
+
+def _performance_team():
+    """Team a box-score line counts for: the one stored on it, else the player's current team"""
+    return func.coalesce(PlayerPerformance.team_id, Player.team_id)
+
+
+def assign_teams(connection: Connection, rows: List[Dict]):
+    """Set ``team_id`` on box-score rows about to be inserted that lack one, from the player's current team.
+
+    Storing the team with the line keeps a traded player's past games with the
+    team they were played for.
+    """
+    missing = {row["player_id"] for row in rows if row.get("team_id") is None}
+    if not missing:
+        return
+    player_teams = dict(connection.execute(select(Player.id, Player.team_id).where(Player.id.in_(missing))).all())
+    for row in rows:
+        if row.get("team_id") is None:
+            row["team_id"] = player_teams.get(row["player_id"])
+
+
+def backfill_performance_teams(connection: Connection):
+    """Pin box-score lines stored before lines carried a team to the player's current team"""
+    if connection.execute(select(exists().where(PlayerPerformance.team_id.is_(None)))).scalar():
+        connection.execute(
+            update(PlayerPerformance)
+            .where(PlayerPerformance.team_id.is_(None))
+            .values(team_id=select(Player.team_id).where(Player.id == PlayerPerformance.player_id).scalar_subquery())
+        )
+
+
+def apply_performances(connection: Connection, rows: List[Dict]):
+    """Fold newly inserted box-score lines into the season aggregates.
+
+    Must run in the same transaction as, and after, the insert of ``rows``.
+    Updates or deletes of existing lines are not tracked; use
+    ``rebuild_aggregates`` for those.
+    """
+    if not rows:
+        return
+
+    game_ids = {row["game_id"] for row in rows}
+    player_ids = {row["player_id"] for row in rows if row.get("team_id") is None}
+    game_dates = dict(connection.execute(select(Game.id, Game.date).where(Game.id.in_(game_ids))).all())
+    player_teams = dict(connection.execute(select(Player.id, Player.team_id).where(Player.id.in_(player_ids))).all())
+
+    player_deltas, team_deltas, batch_team_games, latest_games = {}, {}, {}, {}
+    for row in rows:
+        game_date = game_dates.get(row["game_id"])
+        if game_date is None:
+            continue
+        season = season_for_date(game_date)
+        team_id = row.get("team_id") or player_teams.get(row["player_id"])
+
+        player_delta = player_deltas.get((row["player_id"], season))
+        if player_delta is None:
+            player_delta = player_deltas[(row["player_id"], season)] = _empty_delta()
+        # The season's team is the one of the player's latest line, as in rebuild_aggregates
+        if (row["player_id"], season) not in latest_games or game_date >= latest_games[(row["player_id"], season)]:
+            latest_games[(row["player_id"], season)] = game_date
+            player_delta["team_id"] = team_id
+        player_delta["games_played"] += 1
+        for column in STAT_COLUMNS:
+            player_delta[column] += row.get(column) or 0
+
+        if team_id is not None:
+            team_delta = team_deltas.setdefault((team_id, season), _empty_delta())
+            for column in STAT_COLUMNS:
+                team_delta[column] += row.get(column) or 0
+            key = (team_id, row["game_id"], season)
+            batch_team_games[key] = batch_team_games.get(key, 0) + 1
+
+    # A game counts towards a team the first time any of its players' lines land,
+    # i.e. when every stored line for that (team, game) belongs to this batch
+    if batch_team_games:
+        team = _performance_team()
+        stored = {
+            (team_id, game_id): count
+            for team_id, game_id, count in connection.execute(
+                select(team, PlayerPerformance.game_id, func.count())
+                .join(Player, PlayerPerformance.player_id == Player.id)
+                .where(PlayerPerformance.game_id.in_(game_ids))
+                .group_by(team, PlayerPerformance.game_id)
+            )
+        }
+        for (team_id, game_id, season), count in batch_team_games.items():
+            if stored.get((team_id, game_id), count) <= count:
+                team_deltas[(team_id, season)]["games_played"] += 1
+
+    _upsert_deltas(connection, PlayerSeasonAggregate, "player_id", player_deltas)
+    _upsert_deltas(connection, TeamSeasonAggregate, "team_id", team_deltas)
+
+
+def rebuild_aggregates(connection: Connection, player_ids: Optional[Iterable[int]] = None):
+    """Recompute the aggregate tables from player_performances.
+
+    A player's season row carries the team of their latest line that season,
+    like ``apply_performances`` does. With ``player_ids`` only those players
+    and their teams are rebuilt.
+    """
+    season = _season_expr(Game.date)
+    team = _performance_team()
+    stat_sums = [func.coalesce(func.sum(getattr(PlayerPerformance, c)), 0) for c in STAT_COLUMNS]
+
+    # Each line ranked within its player's season, latest first
+    ranked = (
+        select(PlayerPerformance.id, team.label("team_id"), func.row_number().over(
+            partition_by=(PlayerPerformance.player_id, season),
+            order_by=(Game.date.desc(), PlayerPerformance.id.desc()),
+        ).label("recency"))
+        .join(Game, PlayerPerformance.game_id == Game.id)
+        .join(Player, PlayerPerformance.player_id == Player.id)
+    )
+    if player_ids is not None:
+        player_ids = list(player_ids)
+        ranked = ranked.where(PlayerPerformance.player_id.in_(player_ids))
+    ranked = ranked.subquery()
+    season_team = func.max(case((ranked.c.recency == 1, ranked.c.team_id)))
+
+    player_query = (
+        select(PlayerPerformance.player_id, season, season_team,
+               func.count(PlayerPerformance.id), *stat_sums)
+        .join(Game, PlayerPerformance.game_id == Game.id)
+        .join(ranked, ranked.c.id == PlayerPerformance.id)
+        .group_by(PlayerPerformance.player_id, season)
+    )
+    team_query = (
+        select(team, season, func.count(distinct(PlayerPerformance.game_id)), *stat_sums)
+        .join(Game, PlayerPerformance.game_id == Game.id)
+        .join(Player, PlayerPerformance.player_id == Player.id)
+        .where(team.isnot(None))
+        .group_by(team, season)
+    )
+    player_delete = delete(PlayerSeasonAggregate)
+    team_delete = delete(TeamSeasonAggregate)
+
+    if player_ids is not None:
+        # Every team these players have lines for, not only their current one
+        team_ids = (
+            select(team).select_from(PlayerPerformance)
+            .join(Player, PlayerPerformance.player_id == Player.id)
+            .where(PlayerPerformance.player_id.in_(player_ids))
+            .distinct().scalar_subquery()
+        )
+        player_query = player_query.where(PlayerPerformance.player_id.in_(player_ids))
+        player_delete = player_delete.where(PlayerSeasonAggregate.player_id.in_(player_ids))
+        team_query = team_query.where(team.in_(team_ids))
+        team_delete = team_delete.where(TeamSeasonAggregate.team_id.in_(team_ids))
+
+    connection.execute(player_delete)
+    connection.execute(team_delete)
+    connection.execute(insert(PlayerSeasonAggregate).from_select(
+        ["player_id", "season", "team_id", "games_played", *STAT_COLUMNS], player_query
+    ))
+    connection.execute(insert(TeamSeasonAggregate).from_select(
+        ["team_id", "season", "games_played", *STAT_COLUMNS], team_query
+    ))
+
+
+def ensure_aggregates(connection: Connection):
+    """Backfill the aggregate tables when they are empty but box scores exist"""
+    backfill_performance_teams(connection)
+    has_aggregates = connection.execute(select(exists().where(PlayerSeasonAggregate.player_id.isnot(None)))).scalar()
+    has_performances = connection.execute(select(exists().where(PlayerPerformance.id.isnot(None)))).scalar()
+    if has_performances and not has_aggregates:
+        rebuild_aggregates(connection)
+
+
+def _performance_row(performance: PlayerPerformance) -> Dict:
+    row = {"player_id": performance.player_id, "game_id": performance.game_id, "team_id": performance.team_id}
+    for column in STAT_COLUMNS:
+        row[column] = getattr(performance, column)
+    return row
+
+
+@event.listens_for(Session, "before_flush")
+def _assign_new_performance_teams(session, flush_context, instances):
+    new = [obj for obj in session.new
+           if isinstance(obj, PlayerPerformance) and obj.team_id is None and obj.player_id is not None]
+    if new:
+        rows = [{"player_id": obj.player_id} for obj in new]
+        assign_teams(session.connection(), rows)
+        for obj, row in zip(new, rows):
+            obj.team_id = row["team_id"]
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_new_performances(session, flush_context):
+    rows = [_performance_row(obj) for obj in session.new if isinstance(obj, PlayerPerformance)]
+    if rows:
+        apply_performances(session.connection(), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the player/team season aggregate tables")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: recompute aggregates from box scores")
+    parser.add_argument("--player", type=int, action="append", dest="player_ids",
+                        help="only rebuild this player (repeatable)")
+    args = parser.parse_args()
+
+    create_tables()
+    with SessionLocal() as db:
+        rebuild_aggregates(db.connection(), args.player_ids)
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
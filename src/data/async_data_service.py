@@ -0,0 +1,129 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.database import get_table_versions
+from .data_service import DataService
+from .pagination import DEFAULT_PAGE_SIZE
+from .series import SERIES_POINTS
+
+
+class AsyncDataService:
+    """Non-blocking counterpart of DataService for the async API.
+
+    Queries run through ``AsyncSession.run_sync``: the DataService code is shared,
+    but every round trip to the database is awaited on the async driver instead of
+    blocking the event loop.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _run(self, method: str, *args, **kwargs):
+        return await self.db.run_sync(
+            lambda session: getattr(DataService(session), method)(*args, **kwargs)
+        )
+
+    async def get_table_versions(self) -> Dict:
+        """(version, updated_at) per table, see models.database.get_table_versions"""
+        return await self.db.run_sync(get_table_versions)
+
+    async def get_teams(self) -> List[Dict]:
+        """Get all teams"""
+        return await self._run("get_teams")
+
+    async def get_teams_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                             sort: Optional[str] = None, filters: Optional[List[str]] = None,
+                             offset: int = 0, total: bool = False) -> Dict:
+        """Get one page of teams, sorted and filtered"""
+        return await self._run("get_teams_page", limit, cursor, sort, filters, offset, total)
+
+    async def get_team_stats(self, team_id: int, season: Optional[int] = None) -> Dict:
+        """Get per-game team averages, optionally for a single season"""
+        return await self._run("get_team_stats", team_id, season)
+
+    async def get_players(self, team_id: Optional[int] = None) -> List[Dict]:
+        """Get players, optionally filtered by team"""
+        return await self._run("get_players", team_id)
+
+    async def get_players_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                               team_id: Optional[int] = None) -> Dict:
+        """Get one page of players ordered by id"""
+        return await self._run("get_players_page", limit, cursor, team_id)
+
+    async def get_recent_games(self, limit: int = 10) -> List[Dict]:
+        """Get recent games"""
+        return await self._run("get_recent_games", limit)
+
+    async def get_games_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                             team_id: Optional[int] = None, sort: Optional[str] = None,
+                             filters: Optional[List[str]] = None, offset: int = 0, total: bool = False) -> Dict:
+        """Get one page of games, most recent first unless sorted otherwise"""
+        return await self._run("get_games_page", limit, cursor, team_id, sort, filters, offset, total)
+
+    async def get_performances_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                                    player_id: Optional[int] = None, game_id: Optional[int] = None) -> Dict:
+        """Get one page of box scores ordered by id"""
+        return await self._run("get_performances_page", limit, cursor, player_id, game_id)
+
+    async def get_odds_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                            game_id: Optional[int] = None, sort: Optional[str] = None,
+                            filters: Optional[List[str]] = None, offset: int = 0, total: bool = False) -> Dict:
+        """Get one page of odds snapshots ordered by id unless sorted otherwise"""
+        return await self._run("get_odds_page", limit, cursor, game_id, sort, filters, offset, total)
+
+    async def get_player_stats(self, player_id: int) -> Dict:
+        """Get player statistics"""
+        return await self._run("get_player_stats", player_id)
+
+    async def get_players_stats(self, player_ids: Optional[List[int]] = None,
+                                team_id: Optional[int] = None) -> List[Dict]:
+        """Get statistics for several players, or a whole team, in one query"""
+        return await self._run("get_players_stats", player_ids, team_id)
+
+    async def get_player_analysis(self, player_id: int) -> Dict:
+        """Stats, insights and game log for one player"""
+        return await self._run("get_player_analysis", player_id)
+
+    async def get_players_analysis(self, player_ids: List[int]) -> List[Dict]:
+        """Stats, insights and game log for several players"""
+        return await self._run("get_players_analysis", player_ids)
+
+    async def get_players_form(self, player_ids: List[int]) -> List[Dict]:
+        """Last-N rolling means, standard deviations and EWMAs per stat for several players"""
+        return await self._run("get_players_form", player_ids)
+
+    async def get_hit_rates(self, props: List[Dict], windows: Optional[List[int]] = None) -> List[Dict]:
+        """Over/under/push rates and stat distribution of prop lines over trailing windows"""
+        return await self._run("get_hit_rates", props, windows)
+
+    async def get_odds_comparison(self, game_id: int) -> List[Dict]:
+        """Get the latest line from every bookmaker for a specific game"""
+        return await self._run("get_odds_comparison", game_id)
+
+    async def get_line_movement(self, game_id: int, interval_minutes: int = 60, bookmaker: Optional[str] = None,
+                                bet_type: Optional[str] = None) -> List[Dict]:
+        """Get open/high/low/close odds and lines per time bucket for a game"""
+        return await self._run("get_line_movement", game_id, interval_minutes, bookmaker, bet_type)
+
+    async def get_odds_series(self, game_id: int, bet_type: Optional[str] = None, bookmaker: Optional[str] = None,
+                              points: int = SERIES_POINTS, start: Optional[datetime] = None,
+                              end: Optional[datetime] = None) -> List[Dict]:
+        """Get downsampled price and line series per bookmaker and side for a game"""
+        return await self._run("get_odds_series", game_id, bet_type, bookmaker, points, start, end)
+
+    async def get_player_series(self, player_id: int, stats: Optional[List[str]] = None,
+                                points: int = SERIES_POINTS, start: Optional[datetime] = None,
+                                end: Optional[datetime] = None) -> Dict:
+        """Get a player's downsampled game-by-game stats"""
+        return await self._run("get_player_series", player_id, stats, points, start, end)
+
+    async def get_odds_scanner(self, game_ids: Optional[List[int]] = None, bet_type: Optional[str] = None,
+                               min_edge: Optional[float] = None, arbitrage_only: bool = False) -> List[Dict]:
+        """Best lines, hold, value and arbitrage for the given games or today's upcoming slate"""
+        return await self._run("get_odds_scanner", game_ids, bet_type, min_edge, arbitrage_only)
+
+    async def get_betting_insights(self, player_id: int) -> Dict:
+        """Generate simple betting insights for a player"""
+        return await self._run("get_betting_insights", player_id)
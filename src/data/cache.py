@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict, Hashable, Iterable, Tuple
+
+from dotenv import load_dotenv
+
+from ..models.database import get_table_versions, has_pending_writes, on_tables_committed
+
+load_dotenv()
+
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire ``ttl`` seconds after being stored"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Tuple[str, ...], object]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, _, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value, tables: Iterable[str] = ()):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, tuple(tables), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_tables(self, tables: Iterable[str]):
+        """Drop every entry that was computed from one of ``tables``"""
+        tables = set(tables)
+        with self._lock:
+            stale = [key for key, (_, entry_tables, _) in self._entries.items() if tables.intersection(entry_tables)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": CACHE_ENABLED,
+                "size": len(self._entries),
+                "max_entries": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+response_cache = TTLCache(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS)
+
+# Commits made by this process evict dependent entries right away
+on_tables_committed(response_cache.invalidate_tables)
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+def cached(*tables: str):
+    """Memoize a DataService getter on its arguments and the versions of ``tables``.
+
+    A committed write to one of the tables changes the key: immediately for writes
+    made by this process, within TABLE_VERSION_POLL_SECONDS for other processes.
+    Cached results are shared between callers and must be treated as read-only.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not CACHE_ENABLED or has_pending_writes(self.db):
+                return method(self, *args, **kwargs)
+
+            versions = get_table_versions(self.db)
+            key = (
+                method.__name__,
+                _freeze(args),
+                _freeze(kwargs),
+                tuple(versions.get(table, (0, None))[0] for table in tables),
+            )
+            value = response_cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = method(self, *args, **kwargs)
+                response_cache.set(key, value, tables)
+            return value
+        return wrapper
+    return decorator
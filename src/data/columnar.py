@@ -0,0 +1,169 @@
+import argparse
+import os
+import time
+from typing import Iterator, Optional
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from sqlalchemy import Boolean, DateTime, Float, Integer, String, insert, select
+from sqlalchemy.orm import Session
+
+from ..models.database import (
+    Team, Player, Game, PlayerPerformance, Odds,
+    SessionLocal, create_tables
+)
+from .aggregates import apply_performances, assign_teams
+from .odds_history import apply_snapshots
+
+# Tables that can be moved in and out as columnar files
+TABLES = {
+    "teams": Team,
+    "players": Player,
+    "games": Game,
+    "player_performances": PlayerPerformance,
+    "odds": Odds,
+}
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+_ARROW_TYPES = [
+    (Boolean, pa.bool_()),
+    (Integer, pa.int64()),
+    (Float, pa.float64()),
+    (DateTime, pa.timestamp("us")),
+    (String, pa.string()),
+]
+
+
+def _arrow_type(column) -> pa.DataType:
+    for sql_type, arrow_type in _ARROW_TYPES:
+        if isinstance(column.type, sql_type):
+            return arrow_type
+    raise TypeError(f"No Arrow type for column {column.name} ({column.type})")
+
+
+def arrow_schema(model) -> pa.Schema:
+    """Arrow schema mirroring a model's table columns"""
+    return pa.schema([pa.field(c.name, _arrow_type(c), nullable=c.nullable) for c in model.__table__.columns])
+
+
+def _file_format(path: str, file_format: Optional[str]) -> str:
+    if file_format:
+        return file_format
+    extension = os.path.splitext(path)[1].lower()
+    return "arrow" if extension in (".arrow", ".feather", ".ipc") else "parquet"
+
+
+def export_table(db: Session, model, path: str, file_format: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Stream a table to a Parquet or Arrow IPC file, ``chunk_size`` rows at a time.
+
+    Rows are fetched with ``yield_per`` and written as one record batch per chunk,
+    so memory stays bounded by the chunk size. Returns the number of rows written.
+    """
+    schema = arrow_schema(model)
+    columns = list(model.__table__.columns)
+    result = db.execute(
+        select(*columns).order_by(model.__table__.c.id).execution_options(yield_per=chunk_size)
+    )
+
+    if _file_format(path, file_format) == "arrow":
+        writer = ipc.new_file(path, schema)
+    else:
+        writer = pq.ParquetWriter(path, schema)
+
+    written = 0
+    try:
+        for partition in result.partitions():
+            values = list(zip(*partition))
+            writer.write_batch(pa.record_batch(
+                [pa.array(values[i], type=field.type) for i, field in enumerate(schema)], schema=schema
+            ))
+            written += len(partition)
+    finally:
+        writer.close()
+    return written
+
+
+def _read_batches(path: str, file_format: str, columns, chunk_size: int) -> Iterator[pa.RecordBatch]:
+    if file_format == "arrow":
+        with pa.memory_map(path) as source:
+            reader = ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i).select(columns)
+                for offset in range(0, batch.num_rows, chunk_size):
+                    yield batch.slice(offset, chunk_size)
+    else:
+        yield from pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns)
+
+
+def _file_columns(path: str, file_format: str):
+    if file_format == "arrow":
+        with pa.memory_map(path) as source:
+            return ipc.open_file(source).schema.names
+    return pq.read_schema(path).names
+
+
+def import_table(db: Session, model, path: str, file_format: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, keep_ids: bool = True) -> int:
+    """Bulk-load a Parquet or Arrow IPC file into a table in ``chunk_size`` batches.
+
+    Only columns present in both the file and the table are loaded. Ids are kept by
+    default so foreign keys between files stay valid; load teams, players and games
+    before box scores and odds. Box-score and odds imports also update the season
+    aggregates and latest lines. Returns the number of rows inserted.
+    """
+    file_format = _file_format(path, file_format)
+    table_columns = {c.name for c in model.__table__.columns}
+    if not keep_ids:
+        table_columns.discard("id")
+    columns = [name for name in _file_columns(path, file_format) if name in table_columns]
+    if model is Odds and "timestamp" not in columns:
+        # Every snapshot would get the import time and outrank the real latest lines
+        raise ValueError(f"{path} has no timestamp column; odds snapshots need one")
+
+    connection = db.connection()
+    statement = insert(model.__table__)
+    inserted = 0
+    for batch in _read_batches(path, file_format, columns, chunk_size):
+        rows = batch.to_pylist()
+        if not rows:
+            continue
+        if model is PlayerPerformance:
+            assign_teams(connection, rows)
+        connection.execute(statement, rows)
+        if model is PlayerPerformance:
+            apply_performances(connection, rows)
+        elif model is Odds:
+            apply_snapshots(connection, rows)
+        inserted += len(rows)
+
+    db.commit()
+    return inserted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import/export tables as Parquet or Arrow IPC files")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("path", help="*.parquet, or *.arrow/*.feather/*.ipc for Arrow IPC")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default=None,
+                        help="override the format inferred from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--new-ids", action="store_true", help="import: let the database assign ids")
+    args = parser.parse_args()
+
+    create_tables()
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        if args.command == "export":
+            rows = export_table(db, TABLES[args.table], args.path, args.format, args.chunk_size)
+        else:
+            rows = import_table(db, TABLES[args.table], args.path, args.format, args.chunk_size,
+                                keep_ids=not args.new_ids)
+    print(f"{args.command}ed {rows} {args.table} rows in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,54 @@
 import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from datetime import datetime
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.orm import Session, aliased
 from typing import List, Dict, Optional
-import random
 
 from ..models.database import (
-    Team, Player, Game, PlayerPerformance, Odds,
+    Team, Player, Game, PlayerPerformance, Odds, OddsLatest,
     SessionLocal, create_tables
 )
+from .aggregates import ensure_aggregates
+from .cache import cached
+from .form import form_engine
+from .hit_rates import HIT_RATE_WINDOWS, hit_rate_engine
+from .odds_history import ensure_latest, line_movement
+from .odds_scanner import load_current_odds, scan_markets
+from .pagination import DEFAULT_PAGE_SIZE, apply_filters, keyset_page, parse_sort, sorted_page
+from .performance_store import performance_store
+from .seed import SeedConfig, bulk_seed
+from .series import DEFAULT_SERIES_STATS, SERIES_POINTS, odds_series, player_series
+from .stats_engine import StatsEngine
+
+_home_team, _away_team = aliased(Team), aliased(Team)
+_team_games = Team.wins + Team.losses
+_win_pct = case((_team_games > 0, Team.wins * 100.0 / _team_games), else_=0.0)
+
+# Columns each table listing can be filtered by (``column:operator:value``) ...
+TEAM_FILTERS = {"id": Team.id, "name": Team.name, "city": Team.city, "wins": Team.wins,
+                "losses": Team.losses, "win_pct": _win_pct}
+GAME_FILTERS = {"id": Game.id, "date": Game.date, "home_team": _home_team.name, "away_team": _away_team.name,
+                "home_score": Game.home_score, "away_score": Game.away_score, "status": Game.status}
+ODDS_FILTERS = {name: column for name, column in Odds.__table__.columns.items()}
+# ... and sorted by; NULLs rank below every value (see pagination._after)
+TEAM_SORTS = {**TEAM_FILTERS, "wins": func.coalesce(Team.wins, 0), "losses": func.coalesce(Team.losses, 0)}
+GAME_SORTS = {**GAME_FILTERS, "home_team": func.coalesce(_home_team.name, ""),
+              "away_team": func.coalesce(_away_team.name, ""),
+              "home_score": func.coalesce(Game.home_score, -1), "away_score": func.coalesce(Game.away_score, -1)}
+ODDS_SORTS = {name: ODDS_FILTERS[name] for name in ("id", "game_id", "bookmaker", "bet_type", "odds_value", "timestamp")}
 
 class DataService:
-    def __init__(self):
-        create_tables()
-        self.db = SessionLocal()
+    def __init__(self, db: Optional[Session] = None):
+        """Use the given (e.g. request-scoped) session, or open and own a new one"""
+        self._owns_session = db is None
+        if db is None:
+            create_tables()
+            db = SessionLocal()
+            ensure_aggregates(db.connection())
+            ensure_latest(db.connection())
+            db.commit()
+        self.db = db
+        self.stats_engine = StatsEngine(self.db)
     
     def seed_sample_data(self):
         """Seed the database with sample NBA data for testing"""
@@ -21,212 +56,230 @@ class DataService:
         if self.db.query(Team).count() > 0:
             return
         
-        # Sample NBA teams
-        teams_data = [
-            {"name": "Lakers", "city": "Los Angeles", "conference": "Western", "division": "Pacific"},
-            {"name": "Warriors", "city": "Golden State", "conference": "Western", "division": "Pacific"},
-            {"name": "Celtics", "city": "Boston", "conference": "Eastern", "division": "Atlantic"},
-            {"name": "Heat", "city": "Miami", "conference": "Eastern", "division": "Southeast"},
-            {"name": "Nuggets", "city": "Denver", "conference": "Western", "division": "Northwest"},
-            {"name": "76ers", "city": "Philadelphia", "conference": "Eastern", "division": "Atlantic"},
-        ]
-        
-        teams = []
-        for team_data in teams_data:
-            team = Team(**team_data, wins=random.randint(30, 60), losses=random.randint(22, 52))
-            self.db.add(team)
-            teams.append(team)
-        
-        self.db.commit()
-        
-        # Sample players
-        player_names = [
-            "LeBron James", "Stephen Curry", "Jayson Tatum", "Jimmy Butler",
-            "Nikola Jokic", "Joel Embiid", "Anthony Davis", "Klay Thompson",
-            "Jaylen Brown", "Tyler Herro", "Jamal Murray", "James Harden"
-        ]
-        
-        positions = ["PG", "SG", "SF", "PF", "C"]
-        
-        for i, name in enumerate(player_names):
-            player = Player(
-                name=name,
-                team_id=teams[i % len(teams)].id,
-                position=random.choice(positions),
-                age=random.randint(22, 38),
-                height=f"{random.randint(6, 7)}'{random.randint(0, 11)}\"",
-                weight=random.randint(180, 280),
-                injury_status=random.choice(["healthy", "probable", "questionable"])
-            )
-            self.db.add(player)
-        
-        self.db.commit()
-        
-        # Sample games and performances
-        players = self.db.query(Player).all()
-        
-        for i in range(20):  # Create 20 sample games
-            home_team = random.choice(teams)
-            away_team = random.choice([t for t in teams if t.id != home_team.id])
-            
-            game_date = datetime.now() - timedelta(days=random.randint(1, 30))
-            home_score = random.randint(90, 130)
-            away_score = random.randint(90, 130)
-            
-            game = Game(
-                date=game_date,
-                home_team_id=home_team.id,
-                away_team_id=away_team.id,
-                home_score=home_score,
-                away_score=away_score,
-                status="completed"
-            )
-            self.db.add(game)
-            self.db.commit()
-            
-            # Add player performances for this game
-            game_players = [p for p in players if p.team_id in [home_team.id, away_team.id]]
-            
-            for player in game_players[:10]:  # Limit to 10 players per game
-                performance = PlayerPerformance(
-                    player_id=player.id,
-                    game_id=game.id,
-                    points=random.randint(5, 35),
-                    assists=random.randint(0, 12),
-                    rebounds=random.randint(2, 15),
-                    steals=random.randint(0, 4),
-                    blocks=random.randint(0, 3),
-                    turnovers=random.randint(0, 6),
-                    field_goals_made=random.randint(3, 15),
-                    field_goals_attempted=random.randint(8, 25),
-                    three_pointers_made=random.randint(0, 8),
-                    three_pointers_attempted=random.randint(0, 12),
-                    free_throws_made=random.randint(0, 10),
-                    free_throws_attempted=random.randint(0, 12),
-                    minutes_played=random.uniform(15.0, 42.0)
-                )
-                self.db.add(performance)
-            
-            # Add odds for this game
-            bookmakers = ["DraftKings", "Bet365", "FanDuel", "BetMGM"]
-            bet_types = ["moneyline", "spread", "over_under"]
-            
-            for bookmaker in bookmakers:
-                for bet_type in bet_types:
-                    if bet_type == "moneyline":
-                        odds_value = random.uniform(-200, 200)
-                        line = None
-                    elif bet_type == "spread":
-                        odds_value = random.uniform(-115, -105)
-                        line = random.uniform(-10, 10)
-                    else:  # over_under
-                        odds_value = random.uniform(-115, -105)
-                        line = random.uniform(200, 240)
-                    
-                    odds = Odds(
-                        game_id=game.id,
-                        bookmaker=bookmaker,
-                        bet_type=bet_type,
-                        odds_value=odds_value,
-                        line=line,
-                        timestamp=game_date - timedelta(hours=2)
-                    )
-                    self.db.add(odds)
-        
-        self.db.commit()
+        bulk_seed(self.db, SeedConfig.sample())
     
+    @cached("teams")
     def get_teams(self) -> List[Dict]:
         """Get all teams"""
         teams = self.db.query(Team).all()
         return [{"id": t.id, "name": t.name, "city": t.city, "wins": t.wins, "losses": t.losses} for t in teams]
     
+    @cached("teams")
+    def get_teams_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                       sort: Optional[str] = None, filters: Optional[List[str]] = None,
+                       offset: int = 0, total: bool = False) -> Dict:
+        """Get one page of teams with their win percentage, by name unless ``sort`` says otherwise"""
+        query = apply_filters(select(Team.id, Team.name, Team.city, Team.wins, Team.losses,
+                                     _win_pct.label("win_pct")), filters, TEAM_FILTERS)
+        page = sorted_page(self.db, query, TEAM_SORTS, parse_sort(sort, TEAM_SORTS, "name", "id"),
+                           limit, cursor, offset, total)
+        teams = [{"id": t.id, "name": t.name, "city": t.city, "wins": t.wins, "losses": t.losses,
+                  "win_pct": round(t.win_pct, 1)} for t in page.pop("rows")]
+        return {"teams": teams, **page}
+    
+    @cached("players")
     def get_players(self, team_id: Optional[int] = None) -> List[Dict]:
         """Get players, optionally filtered by team"""
         query = self.db.query(Player)
         if team_id:
             query = query.filter(Player.team_id == team_id)
         
-        players = query.all()
-        return [{
-            "id": p.id,
-            "name": p.name,
-            "team_id": p.team_id,
-            "position": p.position,
-            "age": p.age,
-            "injury_status": p.injury_status
-        } for p in players]
+        return [self._player_row(p) for p in query.all()]
+    
+    @cached("players")
+    def get_players_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                         team_id: Optional[int] = None) -> Dict:
+        """Get one page of players ordered by id, optionally filtered by team"""
+        query = select(Player.id, Player.name, Player.team_id, Player.position, Player.age, Player.injury_status)
+        if team_id:
+            query = query.where(Player.team_id == team_id)
+        
+        players, next_cursor = keyset_page(self.db, query, [Player.id], limit, cursor)
+        return {"players": [self._player_row(p) for p in players], "next_cursor": next_cursor}
     
+    @cached("games", "teams")
     def get_recent_games(self, limit: int = 10) -> List[Dict]:
         """Get recent games"""
-        games = self.db.query(Game).order_by(Game.date.desc()).limit(limit).all()
-        
-        result = []
-        for game in games:
-            result.append({
-                "id": game.id,
-                "date": game.date.strftime("%Y-%m-%d"),
-                "home_team": game.home_team.name,
-                "away_team": game.away_team.name,
-                "home_score": game.home_score,
-                "away_score": game.away_score,
-                "status": game.status
-            })
-        
-        return result
+        games = self.db.execute(self._games_query().order_by(Game.date.desc()).limit(limit)).all()
+        return [self._game_row(game) for game in games]
     
-    def get_player_stats(self, player_id: int) -> Dict:
-        """Get player statistics"""
-        player = self.db.query(Player).filter(Player.id == player_id).first()
-        if not player:
-            return {}
+    @cached("games", "teams")
+    def get_games_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                       team_id: Optional[int] = None, sort: Optional[str] = None,
+                       filters: Optional[List[str]] = None, offset: int = 0, total: bool = False) -> Dict:
+        """Get one page of games, most recent first unless ``sort`` says otherwise, optionally for one team"""
+        query = apply_filters(self._games_query(), filters, GAME_FILTERS)
+        if team_id:
+            query = query.where(or_(Game.home_team_id == team_id, Game.away_team_id == team_id))
         
-        performances = self.db.query(PlayerPerformance).filter(
-            PlayerPerformance.player_id == player_id
-        ).all()
+        page = sorted_page(self.db, query, GAME_SORTS, parse_sort(sort, GAME_SORTS, "-date", "id"),
+                           limit, cursor, offset, total)
+        return {"games": [self._game_row(game) for game in page.pop("rows")], **page}
+    
+    def get_performances_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                              player_id: Optional[int] = None, game_id: Optional[int] = None) -> Dict:
+        """Get one page of box scores ordered by id, optionally for one player or game"""
+        query = select(*PlayerPerformance.__table__.columns)
+        if player_id:
+            query = query.where(PlayerPerformance.player_id == player_id)
+        if game_id:
+            query = query.where(PlayerPerformance.game_id == game_id)
         
-        if not performances:
-            return {"name": player.name, "games_played": 0}
+        performances, next_cursor = keyset_page(self.db, query, [PlayerPerformance.id], limit, cursor)
+        return {"performances": [dict(p._mapping) for p in performances], "next_cursor": next_cursor}
+    
+    def get_odds_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                      game_id: Optional[int] = None, sort: Optional[str] = None,
+                      filters: Optional[List[str]] = None, offset: int = 0, total: bool = False) -> Dict:
+        """Get one page of odds snapshots ordered by id unless ``sort`` says otherwise, optionally for one game"""
+        columns = Odds.__table__.columns
+        query = apply_filters(select(*columns), filters, ODDS_FILTERS)
+        if game_id:
+            query = query.where(Odds.game_id == game_id)
         
-        # Calculate averages
-        stats = {
+        page = sorted_page(self.db, query, ODDS_SORTS, parse_sort(sort, ODDS_SORTS, "id", "id"),
+                           limit, cursor, offset, total)
+        odds = [{**{name: o._mapping[name] for name in columns.keys()}, "timestamp": o.timestamp.isoformat() if o.timestamp else None}
+                for o in page.pop("rows")]
+        return {"odds": odds, **page}
+    
+    @staticmethod
+    def _player_row(player) -> Dict:
+        return {
+            "id": player.id,
             "name": player.name,
-            "team": player.team.name,
+            "team_id": player.team_id,
             "position": player.position,
-            "games_played": len(performances),
-            "avg_points": round(np.mean([p.points for p in performances]), 1),
-            "avg_assists": round(np.mean([p.assists for p in performances]), 1),
-            "avg_rebounds": round(np.mean([p.rebounds for p in performances]), 1),
-            "fg_percentage": round(
-                sum(p.field_goals_made for p in performances) / 
-                max(sum(p.field_goals_attempted for p in performances), 1) * 100, 1
-            ),
-            "three_pt_percentage": round(
-                sum(p.three_pointers_made for p in performances) / 
-                max(sum(p.three_pointers_attempted for p in performances), 1) * 100, 1
+            "age": player.age,
+            "injury_status": player.injury_status
+        }
+    
+    @staticmethod
+    def _games_query():
+        """Games with team names projected through joins, so a page of games costs a single query"""
+        return (
+            select(
+                Game.id, Game.date, Game.home_score, Game.away_score, Game.status,
+                _home_team.name.label("home_team"), _away_team.name.label("away_team")
             )
+            .outerjoin(_home_team, Game.home_team_id == _home_team.id)
+            .outerjoin(_away_team, Game.away_team_id == _away_team.id)
+        )
+    
+    @staticmethod
+    def _game_row(game) -> Dict:
+        return {
+            "id": game.id,
+            "date": game.date.strftime("%Y-%m-%d"),
+            "home_team": game.home_team,
+            "away_team": game.away_team,
+            "home_score": game.home_score,
+            "away_score": game.away_score,
+            "status": game.status
         }
-        
-        return stats
     
+    @cached("players", "teams", "player_season_aggregates")
+    def get_player_stats(self, player_id: int) -> Dict:
+        """Get player statistics"""
+        return self.stats_engine.player_stats(player_id)
+    
+    @cached("players", "teams", "player_season_aggregates")
+    def get_players_stats(self, player_ids: Optional[List[int]] = None,
+                          team_id: Optional[int] = None) -> List[Dict]:
+        """Get statistics for several players, or a whole team, in one query"""
+        stats = self.stats_engine.bulk_player_stats(player_ids, team_id)
+        return [{"player_id": player_id, **player_stats} for player_id, player_stats in stats.items()]
+    
+    @cached("players", "teams", "player_performances", "games")
+    def get_players_analysis(self, player_ids: List[int]) -> List[Dict]:
+        """Stats, form, insights and game log for several players, computed from one query"""
+        game_logs = self.stats_engine.player_game_logs(player_ids)
+        forms = form_engine.player_form(self.db, list(game_logs))
+        return [{
+            "player_id": player_id,
+            "stats": game_logs[player_id]["stats"],
+            "form": forms[player_id],
+            "insights": self._build_insights(game_logs[player_id]["stats"], forms[player_id]),
+            "game_log": game_logs[player_id]["game_log"],
+        } for player_id in player_ids if player_id in game_logs]
+    
+    @cached("players", "player_performances", "games")
+    def get_players_form(self, player_ids: List[int]) -> List[Dict]:
+        """Last-N rolling means, standard deviations and EWMAs per stat for several players"""
+        names = dict(self.db.execute(select(Player.id, Player.name).where(Player.id.in_(player_ids))).all())
+        forms = form_engine.player_form(self.db, [player_id for player_id in player_ids if player_id in names])
+        return [{"player_id": player_id, "name": names[player_id], **form} for player_id, form in forms.items()]
+    
+    def get_player_analysis(self, player_id: int) -> Dict:
+        """Stats, insights and game log for one player, empty dict if not found"""
+        analyses = self.get_players_analysis([player_id])
+        return analyses[0] if analyses else {}
+    
+    def get_hit_rates(self, props: List[Dict], windows: Optional[List[int]] = None) -> List[Dict]:
+        """Over/under/push rates and stat distribution of prop lines over trailing windows"""
+        return hit_rate_engine.evaluate(self.db, props, windows or HIT_RATE_WINDOWS)
+    
+    @cached("teams", "team_season_aggregates")
+    def get_team_stats(self, team_id: int, season: Optional[int] = None) -> Dict:
+        """Get per-game team averages, optionally for a single season"""
+        return self.stats_engine.team_stats(team_id, season)
+    
+    @cached("odds_latest")
     def get_odds_comparison(self, game_id: int) -> List[Dict]:
-        """Get odds comparison for a specific game"""
-        odds = self.db.query(Odds).filter(Odds.game_id == game_id).all()
+        """Get the latest line from every bookmaker for a specific game"""
+        odds = self.db.execute(
+            select(OddsLatest)
+            .where(OddsLatest.game_id == game_id)
+            .order_by(OddsLatest.bet_type, OddsLatest.bookmaker, OddsLatest.selection)
+        ).scalars()
         
-        result = []
-        for odd in odds:
-            result.append({
-                "bookmaker": odd.bookmaker,
-                "bet_type": odd.bet_type,
-                "odds_value": odd.odds_value,
-                "line": odd.line
-            })
-        
-        return result
+        return [{
+            "bookmaker": odd.bookmaker,
+            "bet_type": odd.bet_type,
+            "selection": odd.selection,
+            "odds_value": odd.odds_value,
+            "line": odd.line,
+            "timestamp": odd.timestamp.isoformat() if odd.timestamp else None
+        } for odd in odds]
+    
+    @cached("odds")
+    def get_line_movement(self, game_id: int, interval_minutes: int = 60, bookmaker: Optional[str] = None,
+                          bet_type: Optional[str] = None) -> List[Dict]:
+        """Get open/high/low/close odds and lines per time bucket for a game"""
+        return line_movement(self.db.connection(), game_id, interval_minutes, bookmaker, bet_type)
     
+    @cached("odds")
+    def get_odds_series(self, game_id: int, bet_type: Optional[str] = None, bookmaker: Optional[str] = None,
+                        points: int = SERIES_POINTS, start: Optional[datetime] = None,
+                        end: Optional[datetime] = None) -> List[Dict]:
+        """Get downsampled price and line series per bookmaker and side for a game"""
+        return odds_series(self.db.connection(), game_id, bet_type, bookmaker, points, start, end)
+    
+    @cached("player_performances", "games")
+    def get_player_series(self, player_id: int, stats: Optional[List[str]] = None,
+                          points: int = SERIES_POINTS, start: Optional[datetime] = None,
+                          end: Optional[datetime] = None) -> Dict:
+        """Get a player's downsampled game-by-game stats, optionally between two dates"""
+        snapshot = performance_store.snapshot(self.db, [player_id])
+        return player_series(snapshot, player_id, stats or DEFAULT_SERIES_STATS, points, start, end)
+    
+    @cached("odds_latest", "games", "teams")
+    def get_odds_scanner(self, game_ids: Optional[List[int]] = None, bet_type: Optional[str] = None,
+                         min_edge: Optional[float] = None, arbitrage_only: bool = False) -> List[Dict]:
+        """Best lines, hold, value and arbitrage for the given games or today's upcoming slate"""
+        odds = load_current_odds(self.db.connection(), game_ids, bet_type)
+        return scan_markets(odds, min_edge, arbitrage_only)
+    
+    @cached("players", "teams", "player_season_aggregates", "player_performances", "games")
     def get_betting_insights(self, player_id: int) -> Dict:
         """Generate simple betting insights for a player"""
         stats = self.get_player_stats(player_id)
-        
+        form = form_engine.player_form(self.db, [player_id])[player_id] if stats else None
+        return self._build_insights(stats, form)
+    
+    @staticmethod
+    def _build_insights(stats: Dict, form: Optional[Dict] = None) -> Dict:
+        """Apply the insight rules to a player's aggregated stats and recent form"""
         if not stats or stats.get("games_played", 0) == 0:
             return {"insight": "Insufficient data for analysis"}
         
@@ -250,6 +303,20 @@ class DataService:
         if stats["avg_assists"] > 7 and stats["avg_rebounds"] > 7:
             insights.append("Triple-double threat - good for player prop combinations")
         
+        # Recent form against the whole-sample average
+        short, long = form_engine.windows[0], form_engine.windows[-1]
+        if form and form["games_played"] >= short:
+            recent_points = form["stats"]["points"][f"last_{short}"]["mean"]
+            if recent_points >= avg_points * 1.15:
+                insights.append(f"Hot streak at {recent_points} PPG over the last {short} games - lean over on points")
+            elif recent_points <= avg_points * 0.85:
+                insights.append(f"Cold streak at {recent_points} PPG over the last {short} games - lean under on points")
+            
+            points_std = form["stats"]["points"][f"last_{long}"]["std"]
+            points_mean = form["stats"]["points"][f"last_{long}"]["mean"]
+            if form["games_played"] >= long and points_std is not None and points_mean and points_std / points_mean < 0.2:
+                insights.append(f"Consistent scorer (+/-{points_std} points over {long} games) - steady prop lines")
+        
         return {
             "player": stats["name"],
             "insights": insights,
@@ -257,4 +324,5 @@ class DataService:
         }
     
     def close(self):
-        self.db.close()
+        if self._owns_session:
+            self.db.close()
@@ -0,0 +1,98 @@
+import os
+import threading
+from typing import Dict, Iterable
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from .performance_store import BOX_COLUMNS, PerformanceSnapshot, PerformanceStore, performance_store
+
+load_dotenv()
+
+# Box-score columns tracked by the form engine
+FORM_STATS = [
+    "points", "assists", "rebounds", "steals", "blocks", "turnovers",
+    "three_pointers_made", "minutes_played",
+]
+
+# Rolling windows, in games, and the span of the exponentially weighted mean
+FORM_WINDOWS = tuple(int(window) for window in os.getenv("FORM_WINDOWS", "5,10").split(","))
+FORM_EWMA_SPAN = int(os.getenv("FORM_EWMA_SPAN", "10"))
+
+
+_STAT_INDEXES = [BOX_COLUMNS.index(stat) for stat in FORM_STATS if stat != "minutes_played"]
+
+
+def ewma_weights(games: int, alpha: float) -> np.ndarray:
+    """Weights of each game in the final value of ``y[t] = alpha * x[t] + (1 - alpha) * y[t - 1]``, ``y[0] = x[0]``"""
+    weights = alpha * (1 - alpha) ** np.arange(games - 1, -1, -1, dtype=float)
+    if games:
+        weights[0] = (1 - alpha) ** (games - 1)
+    return weights
+
+
+class FormEngine:
+    """Last-N rolling means/standard deviations and EWMAs per player.
+
+    Form is computed from slices of the shared ``PerformanceSnapshot``: the last
+    games of a player are a view of its arrays, and the EWMA over the whole
+    history is a single dot product with precomputed decay weights. Results are
+    memoized until the snapshot changes.
+    """
+
+    def __init__(self, windows: Iterable[int] = FORM_WINDOWS, ewma_span: int = FORM_EWMA_SPAN,
+                 store: PerformanceStore = performance_store):
+        self.windows = tuple(sorted(windows))
+        self.keep = max(self.windows)
+        self.alpha = 2 / (ewma_span + 1)
+        self.ewma_span = ewma_span
+        self.store = store
+        self._snapshot = None
+        self._forms: Dict[int, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _values(self, snapshot: PerformanceSnapshot, player_id: int) -> np.ndarray:
+        rows = snapshot.rows(player_id)
+        return np.column_stack([snapshot.stats[rows][:, _STAT_INDEXES], snapshot.minutes[rows]]).astype(float)
+
+    def compute(self, snapshot: PerformanceSnapshot, player_id: int) -> Dict:
+        """Form of one player, ``{"games_played", "stats"}``"""
+        values = self._values(snapshot, player_id)
+        games = len(values)
+        summaries = {}
+        for window in self.windows:
+            recent = values[-window:]
+            means = np.round(recent.mean(axis=0), 2).tolist() if len(recent) else [None] * len(FORM_STATS)
+            stds = np.round(recent.std(axis=0, ddof=1), 2).tolist() if len(recent) > 1 else [None] * len(FORM_STATS)
+            summaries[f"last_{window}"] = (means, stds)
+        ewma = np.round(ewma_weights(games, self.alpha) @ values, 2).tolist() if games else [None] * len(FORM_STATS)
+
+        stats = {}
+        for i, stat in enumerate(FORM_STATS):
+            stats[stat] = {name: {"mean": means[i], "std": stds[i]} for name, (means, stds) in summaries.items()}
+            stats[stat]["ewma"] = ewma[i]
+        return {"games_played": games, "stats": stats}
+
+    def player_form(self, db: Session, player_ids: Iterable[int]) -> Dict[int, Dict]:
+        """Rolling form for several players, ``{player_id: {"games_played", "stats"}}``"""
+        player_ids = list(dict.fromkeys(player_ids))
+        snapshot = self.store.snapshot(db, player_ids)
+        if snapshot is not self.store.current:
+            # A private snapshot with uncommitted rows: nothing to share
+            return {player_id: self.compute(snapshot, player_id) for player_id in player_ids}
+        with self._lock:
+            if snapshot is not self._snapshot:
+                self._forms = {}
+                self._snapshot = snapshot
+            forms = self._forms
+        results = {}
+        for player_id in player_ids:
+            form = forms.get(player_id)
+            if form is None:
+                form = forms[player_id] = self.compute(snapshot, player_id)
+            results[player_id] = form
+        return results
+
+
+form_engine = FormEngine()
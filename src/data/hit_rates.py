@@ -0,0 +1,149 @@
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from .performance_store import BOX_COLUMNS, PerformanceSnapshot, PerformanceStore, performance_store
+
+load_dotenv()
+
+# Box-score columns a prop line can be set on
+PROP_STATS = ["points", "assists", "rebounds", "steals", "blocks", "turnovers", "three_pointers_made"]
+
+# Combined props, summed from the columns above
+COMBO_STATS = {
+    "points_rebounds_assists": ("points", "rebounds", "assists"),
+    "points_rebounds": ("points", "rebounds"),
+    "points_assists": ("points", "assists"),
+    "rebounds_assists": ("rebounds", "assists"),
+    "steals_blocks": ("steals", "blocks"),
+}
+
+ALL_STATS = PROP_STATS + list(COMBO_STATS)
+
+# Trailing windows in games; 0 means the whole history
+HIT_RATE_WINDOWS = tuple(int(window) for window in os.getenv("HIT_RATE_WINDOWS", "5,10,20,0").split(","))
+
+_QUANTILES = [0.0, 0.25, 0.5, 0.75, 1.0]
+
+
+def _stat_matrix() -> np.ndarray:
+    """0/1 matrix taking box-score columns to ALL_STATS: ``box_scores @ _stat_matrix()``"""
+    matrix = np.zeros((len(BOX_COLUMNS), len(ALL_STATS)), dtype=np.int16)
+    for i, stat in enumerate(ALL_STATS):
+        for part in COMBO_STATS.get(stat, (stat,)):
+            matrix[BOX_COLUMNS.index(part), i] = 1
+    return matrix
+
+
+_STAT_MATRIX = _stat_matrix()
+
+
+def _window_name(window: int) -> str:
+    return f"last_{window}" if window else "all"
+
+
+class HitRateEngine:
+    """Historical over/under/push rates of prop lines, evaluated in batches.
+
+    A player's history is taken from the shared ``PerformanceSnapshot`` and
+    expanded to a ``(games, ALL_STATS)`` array with one product against the
+    combo matrix. A whole prop board is scored per player and window with one
+    broadcast comparison of the game values against every line asked for on
+    that player. Distribution summaries are memoized until the snapshot changes.
+    """
+
+    def __init__(self, store: PerformanceStore = performance_store):
+        self.store = store
+        self._snapshot = None
+        self._summaries: Dict[tuple, List[Optional[Dict]]] = {}
+        self._lock = threading.Lock()
+
+    def _summary_cache(self, snapshot: PerformanceSnapshot) -> Dict[tuple, List[Optional[Dict]]]:
+        if snapshot is not self.store.current:
+            # A private snapshot with uncommitted rows: nothing to share
+            return {}
+        with self._lock:
+            if snapshot is not self._snapshot:
+                self._summaries = {}
+                self._snapshot = snapshot
+            return self._summaries
+
+    @staticmethod
+    def _distributions(summaries: Dict, player_id: int, window: int, sample: np.ndarray) -> List[Optional[Dict]]:
+        """Summary of every stat column over one window, memoized in ``summaries``"""
+        key = (player_id, window)
+        distributions = summaries.get(key)
+        if distributions is None:
+            games = len(sample)
+            quantiles = np.quantile(sample, _QUANTILES, axis=0).T.tolist()
+            means = np.round(sample.mean(axis=0), 2).tolist()
+            stds = np.round(sample.std(axis=0, ddof=1), 2).tolist() if games > 1 else [None] * len(ALL_STATS)
+            distributions = [{
+                "mean": means[column], "std": stds[column],
+                "min": low, "p25": p25, "median": median, "p75": p75, "max": high,
+            } for column, (low, p25, median, p75, high) in enumerate(quantiles)]
+            summaries[key] = distributions
+        return distributions
+
+    def evaluate(self, db: Session, props: Sequence[Dict], windows: Iterable[int] = HIT_RATE_WINDOWS) -> List[Dict]:
+        """Score ``props`` (dicts with player_id, stat and line) over each trailing window.
+
+        Returns one result per prop, in input order, with the over/under/push rates
+        per window and a distribution summary of the stat per window.
+        """
+        windows = list(windows)
+        for prop in props:
+            if prop["stat"] not in ALL_STATS:
+                raise ValueError(f"Unknown stat {prop['stat']}, expected one of {', '.join(ALL_STATS)}")
+
+        by_player = defaultdict(list)
+        for i, prop in enumerate(props):
+            by_player[prop["player_id"]].append(i)
+        snapshot = self.store.snapshot(db, list(by_player))
+        cache = self._summary_cache(snapshot)
+
+        results: List[Optional[Dict]] = [None] * len(props)
+        for player_id, indexes in by_player.items():
+            data = snapshot.player_stats(player_id) @ _STAT_MATRIX
+            columns = np.array([ALL_STATS.index(props[i]["stat"]) for i in indexes])
+            lines = np.array([float(props[i]["line"]) for i in indexes])
+            summaries = [{} for _ in indexes]
+            for window in windows:
+                sample = data[-window:] if window else data
+                games = len(sample)
+                name = _window_name(window)
+                if not games:
+                    for summary in summaries:
+                        summary[name] = {"games": 0, "hit_rate": None, "push_rate": None,
+                                         "under_rate": None, "distribution": None}
+                    continue
+
+                # (games, props) comparisons for every line on this player at once
+                values = sample[:, columns]
+                overs = (values > lines).sum(axis=0) / games
+                pushes = (values == lines).sum(axis=0) / games
+                hit_rates = np.round(overs, 4).tolist()
+                push_rates = np.round(pushes, 4).tolist()
+                under_rates = np.round(1 - overs - pushes, 4).tolist()
+                distributions = self._distributions(cache, player_id, window, sample)
+                for j, column in enumerate(columns.tolist()):
+                    summaries[j][name] = {
+                        "games": games,
+                        "hit_rate": hit_rates[j],
+                        "push_rate": push_rates[j],
+                        "under_rate": under_rates[j],
+                        "distribution": distributions[column],
+                    }
+
+            for j, i in enumerate(indexes):
+                results[i] = {"player_id": player_id, "stat": props[i]["stat"], "line": props[i]["line"],
+                              "windows": summaries[j]}
+        return results
+
+
+hit_rate_engine = HitRateEngine()
@@ -0,0 +1,569 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..models.database import Game, Odds, Player, PlayerPerformance, Team, SessionLocal, create_tables, queue_commit_events
+from .aggregates import STAT_COLUMNS, apply_performances, assign_teams, rebuild_aggregates
+from .live_feed import score_event
+from .odds_history import apply_snapshots, default_selection
+from .seed import SeedConfig, _box_score, _odds_snapshots
+
+load_dotenv()
+
+# Events written per transaction, longest wait for a batch to fill, and events buffered ahead of the writer
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+INGEST_MAX_BATCH_DELAY_SECONDS = float(os.getenv("INGEST_MAX_BATCH_DELAY_SECONDS", "0.5"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "5000"))
+
+EVENT_TYPES = ("game", "performance", "odds")
+# Order game statuses move through; game events never move a game back
+GAME_STATUSES = {"scheduled": 0, "live": 1, "completed": 2}
+
+# A game is identified by its teams and tip-off time; feeds may also pass our game_id
+GameKey = Tuple[int, int, datetime]
+GameRef = Union[int, GameKey]
+
+
+def _datetime(value) -> datetime:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _game_key(game: Dict) -> GameKey:
+    return int(game["home_team_id"]), int(game["away_team_id"]), _datetime(game["date"])
+
+
+def _game_ref(event: Dict) -> GameRef:
+    return int(event["game_id"]) if event.get("game_id") is not None else _game_key(event["game"])
+
+
+def _later_score(current: Optional[int], incoming: Optional[int]) -> Optional[int]:
+    return current if incoming is None or (current is not None and current > incoming) else incoming
+
+
+def _merge_game(current: Dict, incoming: Dict) -> Dict:
+    """Game values after ``incoming`` arrives, whatever order deliveries come in.
+
+    Status only moves forward (scheduled, live, completed) and scores only go up;
+    a stale or redelivered event can never undo a later one.
+    """
+    if GAME_STATUSES.get(incoming["status"], 0) < GAME_STATUSES.get(current["status"], 0):
+        status = current["status"]
+    else:
+        status = incoming["status"]
+    return {
+        "home_score": _later_score(current["home_score"], incoming["home_score"]),
+        "away_score": _later_score(current["away_score"], incoming["away_score"]),
+        "status": status,
+    }
+
+
+class Batch:
+    """Feed events deduplicated by natural key: last one wins for box scores, games merge
+    forward and append-only odds keep the first"""
+
+    def __init__(self):
+        self.games: Dict[GameKey, Dict] = {}
+        self.performances: Dict[Tuple[int, GameRef], Dict] = {}
+        self.odds: Dict[tuple, Dict] = {}
+        self.duplicates = 0
+        self.superseded = 0
+        self.rejected = 0
+
+    def _keep_last(self, rows: Dict, key, values: Dict):
+        previous = rows.get(key)
+        if previous is not None:
+            if previous == values:
+                self.duplicates += 1
+            else:
+                self.superseded += 1
+        rows[key] = values
+
+    def add(self, event: Dict):
+        try:
+            kind = event["type"]
+            if kind == "game":
+                key = _game_key(event)
+                values = {
+                    "home_score": event.get("home_score"),
+                    "away_score": event.get("away_score"),
+                    "status": event.get("status") or "scheduled",
+                }
+                previous = self.games.get(key)
+                self._keep_last(self.games, key, values if previous is None else _merge_game(previous, values))
+            elif kind == "performance":
+                key = (int(event["player_id"]), _game_ref(event))
+                values = {column: int(event.get(column) or 0) for column in STAT_COLUMNS[:-1]}
+                values["minutes_played"] = float(event.get("minutes_played") or 0)
+                self._keep_last(self.performances, key, values)
+            elif kind == "odds":
+                row = {
+                    "bookmaker": str(event["bookmaker"]),
+                    "bet_type": str(event["bet_type"]),
+                    "odds_value": float(event["odds_value"]),
+                    "line": None if event.get("line") is None else float(event["line"]),
+                    "timestamp": _datetime(event["timestamp"]),
+                }
+                row["selection"] = event.get("selection") or default_selection(row["bet_type"])
+                key = (_game_ref(event), row["bookmaker"], row["bet_type"], row["selection"], row["timestamp"])
+                if key in self.odds:
+                    self.duplicates += 1
+                else:
+                    self.odds[key] = row
+            else:
+                self.rejected += 1
+        except (KeyError, TypeError, ValueError):
+            self.rejected += 1
+
+    def __len__(self) -> int:
+        return len(self.games) + len(self.performances) + len(self.odds)
+
+
+def _existing_ids(connection: Connection, model, ids: Iterable[int]) -> set:
+    ids = set(ids)
+    return set(connection.execute(select(model.id).where(model.id.in_(ids))).scalars()) if ids else set()
+
+
+def _write_games(connection: Connection, games: Dict[GameKey, Dict], counts: Counter) -> Dict[GameKey, Dict]:
+    """Insert new games and merge changes into existing ones; returns the values written per key"""
+    teams = _existing_ids(connection, Team, {team for key in games for team in key[:2]})
+    known = {key: values for key, values in games.items() if key[0] in teams and key[1] in teams}
+    counts["rejected"] += len(games) - len(known)
+    if not known:
+        return {}
+
+    existing = {
+        (home, away, date): (game_id, (home_score, away_score, status))
+        for game_id, home, away, date, home_score, away_score, status in connection.execute(
+            select(Game.id, Game.home_team_id, Game.away_team_id, Game.date,
+                   Game.home_score, Game.away_score, Game.status)
+            .where(Game.date.in_({key[2] for key in known}))
+        )
+    }
+    inserts, updates, written = [], [], {}
+    for key, values in known.items():
+        current = existing.get(key)
+        if current is None:
+            inserts.append({"home_team_id": key[0], "away_team_id": key[1], "date": key[2], **values})
+        else:
+            stored = dict(zip(("home_score", "away_score", "status"), current[1]))
+            values = _merge_game(stored, values)
+            if values == stored:
+                counts["duplicates"] += 1
+                continue
+            updates.append({"b_id": current[0], **{f"v_{column}": value for column, value in values.items()}})
+        written[key] = values
+
+    if inserts:
+        connection.execute(insert(Game.__table__), inserts)
+    if updates:
+        connection.execute(
+            update(Game.__table__)
+            .where(Game.__table__.c.id == bindparam("b_id"))
+            .values(home_score=bindparam("v_home_score"), away_score=bindparam("v_away_score"),
+                    status=bindparam("v_status")),
+            updates,
+        )
+    counts["games.inserted"] += len(inserts)
+    counts["games.updated"] += len(updates)
+    return written
+
+
+def _resolve_games(connection: Connection, refs: Iterable[GameRef]) -> Dict[GameRef, int]:
+    """Game id of every reference that points at an existing game"""
+    refs = set(refs)
+    ids = {ref for ref in refs if isinstance(ref, int)}
+    keys = refs - ids
+    resolved = {game_id: game_id for game_id in _existing_ids(connection, Game, ids)}
+    if keys:
+        for game_id, home, away, date in connection.execute(
+            select(Game.id, Game.home_team_id, Game.away_team_id, Game.date)
+            .where(Game.date.in_({key[2] for key in keys}))
+        ):
+            if (home, away, date) in keys:
+                resolved[(home, away, date)] = game_id
+    return resolved
+
+
+def _write_performances(connection: Connection, performances: Dict[Tuple[int, int], Dict], counts: Counter):
+    players = _existing_ids(connection, Player, {player_id for player_id, _ in performances})
+    rejected = [key for key in performances if key[0] not in players]
+    counts["rejected"] += len(rejected)
+    for key in rejected:
+        del performances[key]
+    if not performances:
+        return
+
+    existing = {
+        (row[1], row[2]): (row[0], tuple(row[3:]))
+        for row in connection.execute(
+            select(PlayerPerformance.id, PlayerPerformance.player_id, PlayerPerformance.game_id,
+                   *[getattr(PlayerPerformance, column) for column in STAT_COLUMNS])
+            .where(PlayerPerformance.game_id.in_({game_id for _, game_id in performances}))
+        )
+    }
+    inserts, updates = [], []
+    for (player_id, game_id), values in performances.items():
+        current = existing.get((player_id, game_id))
+        if current is None:
+            inserts.append({"player_id": player_id, "game_id": game_id, **values})
+        elif current[1] != tuple(values[column] for column in STAT_COLUMNS):
+            updates.append({"b_id": current[0], "player_id": player_id,
+                            **{f"v_{column}": value for column, value in values.items()}})
+        else:
+            counts["duplicates"] += 1
+
+    if inserts:
+        assign_teams(connection, inserts)
+        connection.execute(insert(PlayerPerformance.__table__), inserts)
+        apply_performances(connection, inserts)
+    if updates:
+        table = PlayerPerformance.__table__
+        connection.execute(
+            update(table).where(table.c.id == bindparam("b_id"))
+            .values({column: bindparam(f"v_{column}") for column in STAT_COLUMNS}),
+            [{key: value for key, value in row.items() if key != "player_id"} for row in updates],
+        )
+        # Running sums cannot take back the old line; recompute the players (and their teams) instead
+        rebuild_aggregates(connection, {row["player_id"] for row in updates})
+    counts["player_performances.inserted"] += len(inserts)
+    counts["player_performances.updated"] += len(updates)
+
+
+def _write_odds(connection: Connection, odds: Dict[tuple, Dict], counts: Counter):
+    if not odds:
+        return
+    timestamps = [row["timestamp"] for row in odds.values()]
+    existing = set(connection.execute(
+        select(Odds.game_id, Odds.bookmaker, Odds.bet_type, Odds.selection, Odds.timestamp)
+        .where(Odds.game_id.in_({row["game_id"] for row in odds.values()}),
+               Odds.timestamp.between(min(timestamps), max(timestamps)))
+    ).all())
+    rows = [row for key, row in odds.items() if key not in existing]
+    counts["duplicates"] += len(odds) - len(rows)
+    if rows:
+        connection.execute(insert(Odds.__table__), rows)
+        apply_snapshots(connection, rows)
+    counts["odds.inserted"] += len(rows)
+
+
+def ingest(connection: Connection, batch: Batch) -> Counter:
+    """Upsert one deduplicated batch: games, then box scores and odds snapshots referencing them.
+
+    Games are matched on (home team, away team, date), box scores on (player,
+    game) and odds snapshots on (game, bookmaker, bet type, side, timestamp).
+    Changed box scores are updated and identical ones skipped; games only move
+    forward (see _merge_game), so redelivered events never undo later ones; odds
+    snapshots are append-only. Season aggregates, odds_latest and live events
+    follow in the same transaction, which the caller commits.
+    """
+    counts = Counter(duplicates=batch.duplicates, superseded=batch.superseded, rejected=batch.rejected)
+
+    written = _write_games(connection, batch.games, counts)
+    refs = {ref for _, ref in batch.performances} | {key[0] for key in batch.odds}
+    game_ids = _resolve_games(connection, refs | set(written))
+    queue_commit_events(connection, [
+        score_event(game_ids[key], values["home_score"], values["away_score"], values["status"])
+        for key, values in written.items()
+    ])
+
+    performances, odds = {}, {}
+    for (player_id, ref), values in batch.performances.items():
+        if ref in game_ids:
+            performances[(player_id, game_ids[ref])] = values
+        else:
+            counts["rejected"] += 1
+    for key, row in batch.odds.items():
+        if key[0] in game_ids:
+            odds[(game_ids[key[0]], *key[1:])] = {"game_id": game_ids[key[0]], **row}
+        else:
+            counts["rejected"] += 1
+
+    _write_performances(connection, performances, counts)
+    _write_odds(connection, odds, counts)
+    return counts
+
+
+class IngestionMetrics:
+    """Throughput and lag of an ingestion run.
+
+    Lag is the time from an event entering the queue to its batch being
+    committed; the percentiles cover the most recent events.
+    """
+
+    def __init__(self, lag_window: int = 10000):
+        self.started = time.monotonic()
+        self.received = Counter()
+        self.written = Counter()
+        self.batches = 0
+        self.events = 0
+        self.write_seconds = 0.0
+        self._lags = deque(maxlen=lag_window)
+
+    def record(self, events: int, counts: Counter, seconds: float, lags: Iterable[float]):
+        self.batches += 1
+        self.events += events
+        self.written.update(counts)
+        self.write_seconds += seconds
+        self._lags.extend(lags)
+
+    def snapshot(self, queue_depth: int = 0) -> Dict:
+        elapsed = time.monotonic() - self.started
+        lags = np.fromiter(self._lags, dtype=float) * 1000
+        return {
+            "received": dict(self.received),
+            "written": dict(self.written),
+            "batches": self.batches,
+            "events": self.events,
+            "queue_depth": queue_depth,
+            "events_per_second": round(self.events / elapsed, 1) if elapsed else 0.0,
+            "avg_batch_ms": round(self.write_seconds / self.batches * 1000, 2) if self.batches else 0.0,
+            "lag_ms": {
+                "p50": round(float(np.percentile(lags, 50)), 2),
+                "p95": round(float(np.percentile(lags, 95)), 2),
+                "max": round(float(lags.max()), 2),
+            } if len(lags) else {},
+        }
+
+
+class IngestionWorker:
+    """Moves feed events from a source into the database in micro-batches.
+
+    The source is read into a bounded queue; when the writer falls behind the
+    queue fills and the source waits, so memory stays flat however fast the feed
+    is. The writer takes whatever is queued, up to ``batch_size`` events or
+    ``max_batch_delay`` seconds after the first one, deduplicates it and upserts
+    it in one transaction off the event loop.
+    """
+
+    def __init__(self, batch_size: int = INGEST_BATCH_SIZE, max_batch_delay: float = INGEST_MAX_BATCH_DELAY_SECONDS,
+                 queue_size: int = INGEST_QUEUE_SIZE, session_factory: Callable[[], Session] = SessionLocal):
+        self.batch_size = batch_size
+        self.max_batch_delay = max_batch_delay
+        self.queue_size = queue_size
+        self.session_factory = session_factory
+        self.metrics = IngestionMetrics()
+        self._queue: Optional[asyncio.Queue] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _produce(self, source: AsyncIterator[Dict]):
+        try:
+            async for event in source:
+                self.metrics.received[event.get("type") if isinstance(event, dict) else None] += 1
+                await self._queue.put((time.monotonic(), event))
+        finally:
+            # End of input; a full queue is drained by the writer before it sees this
+            await self._queue.put(None)
+
+    async def _next_batch(self) -> Tuple[List[Tuple[float, Dict]], bool]:
+        """Queued events for one batch, and whether the source is exhausted"""
+        item = await self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.max_batch_delay
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def write_batch(self, items: List[Tuple[float, Dict]]) -> Counter:
+        """Deduplicate and upsert one batch of queued events in its own transaction"""
+        started = time.perf_counter()
+        batch = Batch()
+        for _, event in items:
+            batch.add(event)
+        with self.session_factory() as db:
+            counts = ingest(db.connection(), batch)
+            db.commit()
+
+        committed = time.monotonic()
+        self.metrics.record(len(items), +counts, time.perf_counter() - started,
+                            (committed - queued for queued, _ in items))
+        return counts
+
+    async def run(self, source: AsyncIterator[Dict]) -> IngestionMetrics:
+        """Ingest ``source`` until it is exhausted (or the task is cancelled)"""
+        self._queue = asyncio.Queue(self.queue_size)
+        producer = asyncio.create_task(self._produce(source))
+        try:
+            done = False
+            while not done:
+                batch, done = await self._next_batch()
+                if batch:
+                    await asyncio.to_thread(self.write_batch, batch)
+            await producer
+        finally:
+            producer.cancel()
+        return self.metrics
+
+
+async def file_source(path: str, follow: bool = False, poll_interval: float = 0.5) -> AsyncIterator[Dict]:
+    """Events from a newline-delimited JSON file; with ``follow``, keep reading as it grows"""
+    with open(path) as feed:
+        pending = ""
+        while True:
+            chunk = await asyncio.to_thread(feed.read, 1 << 20)
+            if not chunk:
+                if not follow:
+                    break
+                await asyncio.sleep(poll_interval)
+                continue
+            lines = (pending + chunk).split("\n")
+            pending = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield _parse_line(line)
+        if pending.strip():
+            yield _parse_line(pending)
+
+
+def _parse_line(line: str) -> Dict:
+    try:
+        return json.loads(line)
+    except ValueError:
+        # Counted as rejected by the writer
+        return {"type": None}
+
+
+def _rosters(session_factory: Callable[[], Session]) -> Dict[int, List[int]]:
+    with session_factory() as db:
+        rosters: Dict[int, List[int]] = {}
+        for player_id, team_id in db.execute(select(Player.id, Player.team_id).where(Player.team_id.isnot(None))):
+            rosters.setdefault(team_id, []).append(player_id)
+        return rosters
+
+
+def simulated_events(rosters: Dict[int, List[int]], rng: random.Random, start: datetime,
+                     lines_per_game: int = 16) -> Iterable[Dict]:
+    """Endless feed of games in the event format: schedule, odds snapshots, final score and box scores"""
+    config = SeedConfig(odds_snapshots_per_game=3, snapshot_interval_minutes=60)
+    teams = [team_id for team_id, players in rosters.items() if players]
+    per_side = max(lines_per_game // 2, 1)
+    played = 0
+    while True:
+        home_id, away_id = rng.sample(teams, 2)
+        date = start + timedelta(minutes=played)
+        game = {"home_team_id": home_id, "away_team_id": away_id, "date": date.isoformat()}
+        played += 1
+
+        yield {"type": "game", **game, "status": "scheduled"}
+        for row in _odds_snapshots(rng, config, None, date):
+            row.pop("game_id")
+            yield {"type": "odds", "game": game, **row, "timestamp": row["timestamp"].isoformat()}
+        home_score, away_score = rng.randint(90, 130), rng.randint(90, 129)
+        yield {"type": "game", **game, "status": "completed",
+               "home_score": home_score + (home_score == away_score), "away_score": away_score}
+        for team_id in (home_id, away_id):
+            for player_id in rosters[team_id][:per_side]:
+                box_score = _box_score(rng, player_id, None)
+                box_score.pop("game_id")
+                yield {"type": "performance", "game": game, **box_score}
+
+
+async def simulated_source(events: Optional[int] = None, rate: Optional[float] = None, seed: Optional[int] = None,
+                           duplicate_ratio: float = 0.05,
+                           session_factory: Callable[[], Session] = SessionLocal) -> AsyncIterator[Dict]:
+    """Synthetic feed for the existing teams and rosters, ``rate`` events per second (unthrottled if None).
+
+    A ``duplicate_ratio`` share of events is sent again later, the way
+    at-least-once feeds redeliver, to exercise deduplication.
+    """
+    rng = random.Random(seed)
+    rosters = await asyncio.to_thread(_rosters, session_factory)
+    # Future tip-offs, one minute apart, so simulated games never collide with seeded ones
+    start = datetime.utcnow().replace(second=0, microsecond=0) + timedelta(days=rng.randint(365, 3650))
+    recent = deque(maxlen=1000)
+
+    def redelivering():
+        for event in simulated_events(rosters, rng, start):
+            recent.append(event)
+            yield event
+            if rng.random() < duplicate_ratio:
+                yield rng.choice(recent)
+
+    started = time.monotonic()
+    for produced, event in enumerate(islice(redelivering(), events), 1):
+        yield event
+        if rate:
+            delay = started + produced / rate - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        elif produced % 1000 == 0:
+            await asyncio.sleep(0)
+
+
+async def _report(worker: IngestionWorker, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        print(json.dumps(worker.metrics.snapshot(worker.queue_depth)))
+
+
+async def _run(worker: IngestionWorker, source: AsyncIterator[Dict], report_every: float) -> IngestionMetrics:
+    reporter = asyncio.create_task(_report(worker, report_every)) if report_every else None
+    try:
+        return await worker.run(source)
+    finally:
+        if reporter is not None:
+            reporter.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest game, box-score and odds events in micro-batches")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    parser.add_argument("--max-delay", type=float, default=INGEST_MAX_BATCH_DELAY_SECONDS,
+                        help="seconds to wait for a batch to fill")
+    parser.add_argument("--queue-size", type=int, default=INGEST_QUEUE_SIZE)
+    parser.add_argument("--report-every", type=float, default=5.0, help="seconds between metric lines, 0 for none")
+    sources = parser.add_subparsers(dest="source", required=True)
+    file_parser = sources.add_parser("file", help="newline-delimited JSON events")
+    file_parser.add_argument("path")
+    file_parser.add_argument("--follow", action="store_true", help="keep reading as the file grows")
+    simulate_parser = sources.add_parser("simulate", help="synthetic events for the existing teams")
+    simulate_parser.add_argument("--events", type=int, default=10000)
+    simulate_parser.add_argument("--rate", type=float, default=None, help="events per second, unthrottled if omitted")
+    simulate_parser.add_argument("--duplicates", type=float, default=0.05, help="share of redelivered events")
+    simulate_parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    create_tables()
+    if args.source == "file":
+        source = file_source(args.path, follow=args.follow)
+    else:
+        source = simulated_source(args.events, args.rate, args.seed, args.duplicates)
+    worker = IngestionWorker(args.batch_size, args.max_delay, args.queue_size)
+    try:
+        metrics = asyncio.run(_run(worker, source, args.report_every))
+    except KeyboardInterrupt:
+        metrics = worker.metrics
+    print(json.dumps(metrics.snapshot(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
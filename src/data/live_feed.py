@@ -0,0 +1,158 @@
+import argparse
+import asyncio
+import math
+import os
+import random
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from ..models.database import Game, Odds, SessionLocal, create_tables, queue_commit_events
+from .seed import BOOKMAKERS, _american
+
+load_dotenv()
+
+# Seconds between simulated feed ticks, and how many games are played at once
+LIVE_FEED_INTERVAL_SECONDS = float(os.getenv("LIVE_FEED_INTERVAL_SECONDS", "2.0"))
+LIVE_FEED_GAMES = int(os.getenv("LIVE_FEED_GAMES", "3"))
+
+# Ticks from tip-off to the final buzzer, roughly one per game minute
+SIMULATED_GAME_TICKS = 48
+
+# Game columns whose changes are published as score events
+_SCORE_COLUMNS = ("home_score", "away_score", "status")
+
+
+def score_event(game_id: int, home_score: Optional[int], away_score: Optional[int], status: str) -> Dict:
+    """Live event published when a game's score or status change is committed"""
+    return {"type": "score", "game_id": game_id, "home_score": home_score, "away_score": away_score, "status": status}
+
+
+@event.listens_for(Session, "after_flush")
+def _queue_score_changes(session, flush_context):
+    games = [
+        obj for obj in session.dirty
+        if isinstance(obj, Game) and any(inspect(obj).attrs[column].history.has_changes() for column in _SCORE_COLUMNS)
+    ]
+    if games:
+        queue_commit_events(session.connection(), [
+            score_event(game.id, game.home_score, game.away_score, game.status) for game in games
+        ])
+
+
+class SimulatedFeed:
+    """Plays scheduled games through to the final buzzer for local testing.
+
+    Every tick adds points to the live games and re-prices them at each
+    bookmaker (moneyline from the margin and time left, spread from the margin,
+    total from the scoring pace), then commits. The writes go through the
+    normal session, so REST responses, odds_latest and live subscribers all see
+    them like any other change.
+    """
+
+    def __init__(self, games: int = LIVE_FEED_GAMES, bookmakers: Optional[List[str]] = None,
+                 seed: Optional[int] = None):
+        self.games = games
+        self.bookmakers = bookmakers or list(BOOKMAKERS)
+        self.rng = random.Random(seed)
+        self._ticks: Dict[int, int] = {}
+
+    def _tip_off(self, db: Session, live: List[Game]) -> List[Game]:
+        upcoming = db.execute(
+            select(Game).where(Game.status == "scheduled").order_by(Game.date, Game.id).limit(self.games - len(live))
+        ).scalars().all()
+        for game in upcoming:
+            game.status = "live"
+            game.home_score = 0
+            game.away_score = 0
+        return live + list(upcoming)
+
+    def _snapshots(self, game: Game, played: int, timestamp: datetime) -> List[Dict]:
+        margin = game.home_score - game.away_score
+        remaining = 1 - played / SIMULATED_GAME_TICKS
+        home_win = 1 / (1 + math.exp(-margin / (1 + 12 * math.sqrt(remaining))))
+        home_spread = -round(margin * 2) / 2
+        total = round((game.home_score + game.away_score) / played * SIMULATED_GAME_TICKS * 2) / 2
+
+        rows = []
+        for bookmaker in self.bookmakers:
+            vig = self.rng.uniform(0.02, 0.05)
+            home_price = min(max(home_win + self.rng.uniform(-0.02, 0.02), 0.02), 0.98)
+            for bet_type, selection, probability, line in (
+                ("moneyline", "home", home_price, None),
+                ("moneyline", "away", 1 - home_price, None),
+                ("spread", "home", 0.5, home_spread),
+                ("spread", "away", 0.5, -home_spread),
+                ("over_under", "over", 0.5, total),
+                ("over_under", "under", 0.5, total),
+            ):
+                rows.append({
+                    "game_id": game.id,
+                    "bookmaker": bookmaker,
+                    "bet_type": bet_type,
+                    "selection": selection,
+                    "odds_value": round(_american(probability * (1 + vig)), 1),
+                    "line": line,
+                    "timestamp": timestamp,
+                })
+        return rows
+
+    def tick(self, db: Session) -> int:
+        """Advance every live game by one tick and commit; returns the number of games played"""
+        live = db.execute(select(Game).where(Game.status == "live")).scalars().all()
+        if len(live) < self.games:
+            live = self._tip_off(db, list(live))
+
+        timestamp = datetime.utcnow()
+        snapshots = []
+        for game in live:
+            played = self._ticks.get(game.id, 0) + 1
+            game.home_score = (game.home_score or 0) + self.rng.choice((0, 0, 1, 2, 2, 3, 3, 4, 5))
+            game.away_score = (game.away_score or 0) + self.rng.choice((0, 0, 1, 2, 2, 3, 3, 4, 5))
+            if played >= SIMULATED_GAME_TICKS:
+                game.status = "completed"
+                self._ticks.pop(game.id, None)
+            else:
+                self._ticks[game.id] = played
+                snapshots.extend(self._snapshots(game, played, timestamp))
+
+        db.add_all([Odds(**row) for row in snapshots])
+        db.commit()
+        return len(live)
+
+    def tick_in_new_session(self) -> int:
+        """``tick`` with a short-lived session of its own"""
+        with SessionLocal() as db:
+            return self.tick(db)
+
+    async def run(self, interval: float = LIVE_FEED_INTERVAL_SECONDS):
+        """Tick every ``interval`` seconds until cancelled, without blocking the event loop"""
+        while True:
+            await asyncio.to_thread(self.tick_in_new_session)
+            await asyncio.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate live games: scores and odds written every tick")
+    parser.add_argument("--interval", type=float, default=LIVE_FEED_INTERVAL_SECONDS, help="seconds between ticks")
+    parser.add_argument("--games", type=int, default=LIVE_FEED_GAMES, help="games played at once")
+    parser.add_argument("--ticks", type=int, default=None, help="stop after this many ticks")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    create_tables()
+    feed = SimulatedFeed(args.games, seed=args.seed)
+    tick = 0
+    while args.ticks is None or tick < args.ticks:
+        games = feed.tick_in_new_session()
+        tick += 1
+        print(f"tick {tick}: {games} live games")
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import argparse
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+from sqlalchemy import bindparam, case, delete, event, exists, func, insert, or_, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..models.database import Odds, OddsLatest, SessionLocal, create_tables, queue_commit_events
+
+# Snapshot columns copied into odds_latest
+LATEST_COLUMNS = ["game_id", "bookmaker", "bet_type", "selection", "odds_value", "line", "timestamp"]
+
+# The two sides of each market, first side first
+SELECTIONS = {
+    "moneyline": ("home", "away"),
+    "spread": ("home", "away"),
+    "over_under": ("over", "under"),
+}
+
+# Widest line-movement bucket served by the API, in minutes
+MAX_INTERVAL_MINUTES = 24 * 60
+
+
+def default_selection(bet_type: str) -> str:
+    """Side of snapshots stored without one: older data only priced the first side"""
+    return SELECTIONS.get(bet_type, ("home",))[0]
+
+
+def backfill_selections(connection: Connection, game_ids: Optional[Iterable[int]] = None):
+    """Give snapshots written before sides were recorded (or edited in without one) their default selection"""
+    first_sides = {bet_type: sides[0] for bet_type, sides in SELECTIONS.items()}
+    statement = (
+        update(Odds)
+        .where(Odds.selection.is_(None))
+        .values(selection=case(first_sides, value=Odds.bet_type, else_=default_selection("")))
+    )
+    if game_ids is not None:
+        statement = statement.where(Odds.game_id.in_(game_ids))
+    connection.execute(statement)
+
+
+def _recency(timestamp: Optional[datetime]) -> tuple:
+    """Sort key of a snapshot timestamp; a missing one ranks oldest, as in rebuild_latest"""
+    return timestamp is not None, timestamp or datetime.min
+
+
+def apply_snapshots(connection: Connection, rows: List[Dict]):
+    """Move odds_latest forward to newly inserted odds snapshots.
+
+    Must run in the same transaction as, and after, the insert of ``rows``.
+    The odds table is append-only: snapshots are never updated in place, a new
+    price is a new row. Snapshots older than the stored latest line are ignored;
+    one without a timestamp is older than any with one.
+    """
+    latest = {}
+    for row in rows:
+        selection = row.get("selection") or default_selection(row["bet_type"])
+        key = (row["game_id"], row["bookmaker"], row["bet_type"], selection)
+        if key not in latest or _recency(row.get("timestamp")) >= _recency(latest[key].get("timestamp")):
+            latest[key] = {**row, "selection": selection}
+    if not latest:
+        return
+
+    game_ids = {key[0] for key in latest}
+    existing = {
+        tuple(key): timestamp for *key, timestamp in connection.execute(
+            select(OddsLatest.game_id, OddsLatest.bookmaker, OddsLatest.bet_type, OddsLatest.selection,
+                   OddsLatest.timestamp)
+            .where(OddsLatest.game_id.in_(game_ids))
+        )
+    }
+
+    updates, inserts, advanced = [], [], []
+    for key, row in latest.items():
+        values = {column: row.get(column) for column in LATEST_COLUMNS}
+        if key not in existing:
+            inserts.append(values)
+        elif _recency(existing[key]) > _recency(row.get("timestamp")):
+            # Older than the stored line: neither written nor published
+            continue
+        else:
+            updates.append({f"b_{column}": value for column, value in values.items()})
+        advanced.append(row)
+
+    if updates:
+        connection.execute(
+            update(OddsLatest)
+            .where(
+                OddsLatest.game_id == bindparam("b_game_id"),
+                OddsLatest.bookmaker == bindparam("b_bookmaker"),
+                OddsLatest.bet_type == bindparam("b_bet_type"),
+                OddsLatest.selection == bindparam("b_selection"),
+                or_(OddsLatest.timestamp.is_(None), OddsLatest.timestamp <= bindparam("b_timestamp")),
+            )
+            .values(
+                odds_value=bindparam("b_odds_value"),
+                line=bindparam("b_line"),
+                timestamp=bindparam("b_timestamp"),
+            ),
+            updates,
+        )
+    if inserts:
+        connection.execute(insert(OddsLatest), inserts)
+    queue_commit_events(connection, (odds_event(row) for row in advanced))
+
+
+def odds_event(row: Dict) -> Dict:
+    """Live event published when a new latest line is committed"""
+    timestamp = row.get("timestamp")
+    return {
+        "type": "odds",
+        **{column: row.get(column) for column in LATEST_COLUMNS if column != "timestamp"},
+        "timestamp": timestamp.isoformat() if timestamp else None,
+    }
+
+
+def rebuild_latest(connection: Connection, game_ids: Optional[Iterable[int]] = None):
+    """Recompute odds_latest from the odds history, optionally for some games only.
+
+    Snapshots without a selection get their default one first, since the
+    selection is part of the odds_latest key.
+    """
+    if game_ids is not None:
+        game_ids = list(game_ids)
+    backfill_selections(connection, game_ids)
+    ranked = select(
+        *[getattr(Odds, column) for column in LATEST_COLUMNS],
+        func.row_number().over(
+            partition_by=(Odds.game_id, Odds.bookmaker, Odds.bet_type, Odds.selection),
+            order_by=(Odds.timestamp.desc().nulls_last(), Odds.id.desc()),
+        ).label("rank"),
+    )
+    latest_delete = delete(OddsLatest)
+    if game_ids is not None:
+        ranked = ranked.where(Odds.game_id.in_(game_ids))
+        latest_delete = latest_delete.where(OddsLatest.game_id.in_(game_ids))
+
+    ranked = ranked.subquery()
+    connection.execute(latest_delete)
+    connection.execute(insert(OddsLatest).from_select(
+        LATEST_COLUMNS,
+        select(*[ranked.c[column] for column in LATEST_COLUMNS]).where(ranked.c.rank == 1),
+    ))
+
+
+def ensure_latest(connection: Connection):
+    """Backfill odds_latest when it is empty but odds snapshots exist"""
+    has_latest = connection.execute(select(exists().where(OddsLatest.game_id.isnot(None)))).scalar()
+    has_odds = connection.execute(select(exists().where(Odds.id.isnot(None)))).scalar()
+    if has_odds and not has_latest:
+        # An empty odds_latest next to existing odds may have just been migrated
+        rebuild_latest(connection)
+
+
+def line_movement(connection: Connection, game_id: int, interval_minutes: int = 60,
+                  bookmaker: Optional[str] = None, bet_type: Optional[str] = None,
+                  since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[Dict]:
+    """Open/high/low/close of price and line per bookmaker, bet type, side and time bucket.
+
+    Reads the game's snapshots in index order and downsamples them to one row per
+    ``interval_minutes`` bucket that has at least one snapshot.
+    """
+    query = (
+        select(Odds.bookmaker, Odds.bet_type, Odds.selection, Odds.timestamp, Odds.odds_value, Odds.line)
+        .where(Odds.game_id == game_id)
+        .order_by(Odds.bookmaker, Odds.bet_type, Odds.timestamp)
+    )
+    if bookmaker:
+        query = query.where(Odds.bookmaker == bookmaker)
+    if bet_type:
+        query = query.where(Odds.bet_type == bet_type)
+    if since:
+        query = query.where(Odds.timestamp >= since)
+    if until:
+        query = query.where(Odds.timestamp < until)
+
+    snapshots = pd.DataFrame(connection.execute(query).all(),
+                             columns=["bookmaker", "bet_type", "selection", "timestamp", "odds_value", "line"])
+    if snapshots.empty:
+        return []
+
+    snapshots["selection"] = snapshots["selection"].fillna(snapshots["bet_type"].map(default_selection))
+    snapshots["bucket"] = snapshots["timestamp"].dt.floor(f"{interval_minutes}min")
+    grouped = snapshots.groupby(["bookmaker", "bet_type", "selection", "bucket"], sort=True)
+    bars = grouped.agg(
+        open=("odds_value", "first"),
+        high=("odds_value", "max"),
+        low=("odds_value", "min"),
+        close=("odds_value", "last"),
+        line_open=("line", "first"),
+        line_high=("line", "max"),
+        line_low=("line", "min"),
+        line_close=("line", "last"),
+        snapshots=("odds_value", "size"),
+    ).reset_index()
+
+    bars["bucket"] = bars["bucket"].map(lambda bucket: bucket.isoformat())
+    bars = bars.astype(object).where(bars.notna(), None)
+    bars["snapshots"] = bars["snapshots"].astype(int)
+    return bars.rename(columns={"bucket": "timestamp"}).to_dict("records")
+
+
+def _odds_row(odds: Odds) -> Dict:
+    return {column: getattr(odds, column) for column in LATEST_COLUMNS}
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_new_snapshots(session, flush_context):
+    rows = [_odds_row(obj) for obj in session.new if isinstance(obj, Odds)]
+    if rows:
+        apply_snapshots(session.connection(), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the odds_latest table")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: recompute latest lines from odds history")
+    parser.add_argument("--game", type=int, action="append", dest="game_ids",
+                        help="only rebuild this game (repeatable)")
+    args = parser.parse_args()
+
+    create_tables()
+    with SessionLocal() as db:
+        rebuild_latest(db.connection(), args.game_ids)
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+from datetime import datetime, time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import aliased
+
+from ..models.database import Team, Game, OddsLatest
+from .odds_history import SELECTIONS
+
+BET_TYPES = list(SELECTIONS)
+
+
+def implied_probability(american: np.ndarray) -> np.ndarray:
+    """Implied win probability of American odds, vig included"""
+    american = np.asarray(american, dtype=float)
+    # Both branches are evaluated; the one not selected may divide by zero at -100
+    with np.errstate(divide="ignore"):
+        return np.where(american < 0, -american / (100 - american), 100 / (american + 100))
+
+
+def decimal_odds(american: np.ndarray) -> np.ndarray:
+    """Total return per unit staked for American odds"""
+    american = np.asarray(american, dtype=float)
+    with np.errstate(divide="ignore"):
+        return np.where(american < 0, 1 + 100 / -american, 1 + american / 100)
+
+
+def load_current_odds(connection: Connection, game_ids: Optional[Iterable[int]] = None,
+                      bet_type: Optional[str] = None, since: Optional[datetime] = None) -> Dict:
+    """Latest lines as column arrays: the given games, or scheduled games from ``since`` on.
+
+    ``since`` defaults to the start of today. Games are selected through their
+    date index and joined to odds_latest on its primary key.
+    """
+    home_team, away_team = aliased(Team), aliased(Team)
+    query = (
+        select(
+            Game.id, Game.date, home_team.name, away_team.name,
+            OddsLatest.bet_type, OddsLatest.selection, OddsLatest.bookmaker, OddsLatest.odds_value, OddsLatest.line,
+        )
+        .select_from(Game)
+        .join(OddsLatest, OddsLatest.game_id == Game.id)
+        .outerjoin(home_team, Game.home_team_id == home_team.id)
+        .outerjoin(away_team, Game.away_team_id == away_team.id)
+        .where(OddsLatest.bet_type.in_([bet_type] if bet_type else BET_TYPES))
+    )
+    if game_ids is not None:
+        query = query.where(Game.id.in_(list(game_ids)))
+    else:
+        since = since or datetime.combine(datetime.now().date(), time.min)
+        query = query.where(Game.date >= since, Game.status == "scheduled")
+
+    rows = connection.execute(query).all()
+    games = {row[0]: {"game_id": row[0], "date": row[1].isoformat(), "home_team": row[2], "away_team": row[3]}
+             for row in rows}
+    return {
+        "games": games,
+        "game_id": np.array([row[0] for row in rows], dtype=np.int64),
+        "bet_type": np.array([BET_TYPES.index(row[4]) for row in rows], dtype=np.int64),
+        "side": np.array([SELECTIONS[row[4]].index(row[5]) if row[5] in SELECTIONS[row[4]] else 0
+                          for row in rows], dtype=np.int64),
+        "bookmaker": np.array([row[6] for row in rows], dtype=object),
+        "odds": np.array([row[7] for row in rows], dtype=float),
+        "line": np.array([np.nan if row[8] is None else row[8] for row in rows], dtype=float),
+    }
+
+
+def _first_per_key(keys: np.ndarray, order: np.ndarray, size: int) -> np.ndarray:
+    """Row index of the first row of each key in ``order``, -1 for absent keys"""
+    sorted_keys = keys[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    result = np.full(size, -1, dtype=np.int64)
+    result[sorted_keys[first]] = order[first]
+    return result
+
+
+def _nullable(values: np.ndarray) -> list:
+    """``values.tolist()`` with NaN replaced by None"""
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def scan_markets(odds: Dict, min_edge: Optional[float] = None, arbitrage_only: bool = False) -> List[Dict]:
+    """Best price per side, bookmaker hold, consensus fair odds and arbitrage for every market.
+
+    A market is one game, bet type and line (the home or over side's line), so
+    spreads and totals are only compared between bookmakers hanging the same
+    number. Everything is computed over all markets at once on the column arrays.
+    """
+    if len(odds["odds"]) == 0:
+        return []
+
+    spread = BET_TYPES.index("spread")
+    line = np.nan_to_num(odds["line"])
+    # Express every line from the first side so both sides of a market share it
+    market_line = np.where(odds["bet_type"] == BET_TYPES.index("moneyline"), 0.0,
+                           np.where((odds["bet_type"] == spread) & (odds["side"] == 1), -line, line))
+    market_keys, market = np.unique(
+        np.column_stack([odds["game_id"], odds["bet_type"], market_line]), axis=0, return_inverse=True
+    )
+    market = market.ravel()
+    bookmakers, bookmaker = np.unique(odds["bookmaker"], return_inverse=True)
+    markets, books = len(market_keys), len(bookmakers)
+
+    price = decimal_odds(odds["odds"])
+    probability = implied_probability(odds["odds"])
+    side_key = market * 2 + odds["side"]
+
+    # Best price per (market, side): highest decimal odds first within each key
+    best = _first_per_key(side_key, np.lexsort((-price, side_key)), markets * 2).reshape(markets, 2)
+
+    # Bookmakers pricing both sides of a market: overround, hold and no-vig probabilities
+    book_key = market * books + bookmaker
+    book_total = np.bincount(book_key, weights=probability, minlength=markets * books)
+    book_sides = np.bincount(book_key, minlength=markets * books)
+    complete = book_sides == 2
+    hold = np.where(complete, 1 - 1 / np.where(complete, book_total, 1), np.nan).reshape(markets, books)
+    complete_books = complete.reshape(markets, books).sum(axis=1)
+    average_hold = np.where(complete_books > 0, np.nansum(hold, axis=1) / np.maximum(complete_books, 1), np.nan)
+    lowest_hold = np.argmin(np.where(np.isnan(hold), np.inf, hold), axis=1)
+
+    row_complete = complete[book_key]
+    fair_row = np.where(row_complete, probability / book_total[book_key], 0.0)
+    fair_weight = np.bincount(side_key, weights=row_complete.astype(float), minlength=markets * 2)
+    fair = (np.bincount(side_key, weights=fair_row, minlength=markets * 2)
+            / np.maximum(fair_weight, 1)).reshape(markets, 2)
+    fair[fair_weight.reshape(markets, 2) == 0] = np.nan
+
+    both_sides = (best >= 0).all(axis=1)
+    best_price = np.where(best >= 0, price[np.maximum(best, 0)], np.nan)
+    edge = best_price * fair - 1
+    arbitrage_total = (1 / best_price).sum(axis=1)
+    is_arbitrage = both_sides & (arbitrage_total < 1)
+
+    selected = both_sides.copy()
+    if arbitrage_only:
+        selected &= is_arbitrage
+    if min_edge is not None:
+        selected &= is_arbitrage | (np.nan_to_num(edge, nan=-np.inf) >= min_edge).any(axis=1)
+
+    # Round in bulk and hand plain Python values to the per-market loop
+    rows = np.flatnonzero(selected)
+    best_rows = best[rows]
+    side_rows = np.maximum(best_rows, 0)
+    game_ids = market_keys[rows, 0].astype(np.int64).tolist()
+    bet_types = market_keys[rows, 1].astype(np.int64).tolist()
+    lines = market_keys[rows, 2].tolist()
+    side_bookmakers = odds["bookmaker"][side_rows].tolist()
+    side_odds = odds["odds"][side_rows].tolist()
+    side_lines = _nullable(odds["line"][side_rows])
+    side_implied = _nullable(np.round(probability[side_rows], 4))
+    side_fair = _nullable(np.round(fair[rows], 4))
+    side_edge = _nullable(np.round(edge[rows], 4))
+    book_counts = complete_books[rows].tolist()
+    average_holds = _nullable(np.round(average_hold[rows], 4))
+    lowest_books = bookmakers[lowest_hold[rows]].tolist()
+    lowest_holds = _nullable(np.round(hold[rows, lowest_hold[rows]], 4))
+    arbitrage = is_arbitrage[rows].tolist()
+    margins = np.round(1 / arbitrage_total[rows] - 1, 4).tolist()
+    stakes = np.round(1 / best_price[rows] / arbitrage_total[rows, None], 4).tolist()
+
+    results = []
+    for i in range(len(rows)):
+        bet_type = BET_TYPES[bet_types[i]]
+        selections = SELECTIONS[bet_type]
+        results.append({
+            **odds["games"][game_ids[i]],
+            "bet_type": bet_type,
+            "line": None if bet_type == "moneyline" else lines[i],
+            "bookmakers": book_counts[i],
+            "average_hold": average_holds[i],
+            "lowest_hold": {"bookmaker": lowest_books[i], "hold": lowest_holds[i]} if book_counts[i] else None,
+            "sides": [{
+                "selection": selection,
+                "bookmaker": side_bookmakers[i][s],
+                "odds": side_odds[i][s],
+                "line": side_lines[i][s],
+                "implied_probability": side_implied[i][s],
+                "fair_probability": side_fair[i][s],
+                "edge": side_edge[i][s],
+            } for s, selection in enumerate(selections)],
+            "arbitrage": {
+                "margin": margins[i],
+                "stakes": dict(zip(selections, stakes[i])),
+            } if arbitrage[i] else None,
+        })
+    return results
@@ -0,0 +1,255 @@
+import base64
+import json
+import re
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, false, func, not_, or_, select
+from sqlalchemy.orm import Session
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+# Rows fetched per round trip when streaming a listing
+STREAM_CHUNK_SIZE = 1000
+
+
+# Operators accepted in ``column:operator:value`` filters
+FILTER_OPERATORS = ("eq", "ne", "lt", "le", "gt", "ge", "contains")
+
+
+class InvalidCursor(ValueError):
+    """The cursor was not produced by encode_cursor or does not fit the listing"""
+
+
+class InvalidQuery(ValueError):
+    """A sort or filter names a column or operator the listing does not support"""
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Opaque, URL-safe cursor holding the sort key of the last row of a page"""
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List:
+    """Sort key values from a cursor, raising InvalidCursor if it is malformed"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = [_decode_value(value) for value in json.loads(payload)]
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+    if len(values) != size:
+        raise InvalidCursor(f"Invalid cursor: {cursor}")
+    return values
+
+
+def _nullable(column) -> bool:
+    return getattr(column, "nullable", False)
+
+
+def _order(column, descending: bool):
+    """ORDER BY term ranking NULLs below every value, as ``_after`` does"""
+    if not _nullable(column):
+        return column.desc() if descending else column.asc()
+    return column.desc().nulls_last() if descending else column.asc().nulls_first()
+
+
+def _beyond(column, value, descending: bool):
+    if value is None:
+        return false() if descending else column.is_not(None)
+    if descending:
+        return or_(column < value, column.is_(None)) if _nullable(column) else column < value
+    return column > value
+
+
+def _after(columns: Sequence, values: Sequence, descending: Sequence[bool]):
+    """Row-value comparison ``(columns) > (values)`` (``<`` for descending columns) written
+    as nested OR/AND so every backend can drive it from the sort index. NULLs rank below
+    every value, so a page may end on one"""
+    column, value = columns[0], values[0]
+    beyond = _beyond(column, value, descending[0])
+    if len(columns) == 1:
+        return beyond
+    same = column.is_(None) if value is None else column == value
+    return or_(beyond, and_(same, _after(columns[1:], values[1:], descending[1:])))
+
+
+def keyset_page(db: Session, query, keys: Sequence, limit: int, cursor: Optional[str] = None,
+                descending: bool = False) -> Tuple[List, Optional[str]]:
+    """Fetch one page of ``query`` ordered by ``keys`` and the cursor for the next page.
+
+    ``keys`` must be unique together and selected by ``query`` under their own names,
+    so the position of the last row can be read back from it. Unlike OFFSET, the cost
+    of a page does not grow with its depth. ``next_cursor`` is None on the last page.
+    """
+    if cursor:
+        query = query.where(_after(keys, decode_cursor(cursor, len(keys)), [descending] * len(keys)))
+    order = [_order(key, descending) for key in keys]
+    rows = db.execute(query.order_by(*order).limit(limit + 1)).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], key.key) for key in keys])
+
+
+def parse_sort(sort: Optional[str], columns: Dict, default: str, unique: str) -> List[Tuple[str, bool]]:
+    """``"-date,home_team"`` as (column, descending) pairs, checked against ``columns``.
+
+    ``unique`` is appended (in the direction of the last column) unless already
+    present, so the order is total and can be resumed from a cursor.
+    """
+    order = []
+    for part in (sort or default).split(","):
+        name = part.strip().lstrip("+-")
+        if name not in columns:
+            raise InvalidQuery(f"Cannot sort by {name or part!r}, expected one of {', '.join(columns)}")
+        if name not in (seen for seen, _ in order):
+            order.append((name, part.strip().startswith("-")))
+    if unique not in (name for name, _ in order):
+        order.append((unique, order[-1][1]))
+    return order
+
+
+def _date_range(value: str) -> Tuple[datetime, datetime]:
+    """Start and end of the year, month, day or instant written as ``value``"""
+    if re.fullmatch(r"\d{4}", value):
+        start = datetime(int(value), 1, 1)
+        return start, start.replace(year=start.year + 1)
+    if re.fullmatch(r"\d{4}-\d{2}", value):
+        start = datetime.strptime(value, "%Y-%m")
+        return start, (start + timedelta(days=31)).replace(day=1)
+    start = datetime.fromisoformat(value)
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", value):
+        return start, start + timedelta(days=1)
+    return start, start
+
+
+def _python_type(column):
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return str
+
+
+def _condition(column, operator: str, value: str):
+    python_type = _python_type(column)
+    if operator == "contains":
+        if python_type is not str:
+            raise InvalidQuery("contains only applies to text columns")
+        return func.lower(column).contains(value.lower(), autoescape=True)
+
+    if python_type is datetime:
+        # A date matches the whole day (month, year) it names
+        start, end = _date_range(value)
+        if start != end:
+            return {
+                "eq": and_(column >= start, column < end), "ne": not_(and_(column >= start, column < end)),
+                "lt": column < start, "le": column < end, "gt": column >= end, "ge": column >= start,
+            }[operator]
+        value = start
+    elif python_type in (int, float):
+        value = float(value)
+    return {
+        "eq": column == value, "ne": column != value, "lt": column < value,
+        "le": column <= value, "gt": column > value, "ge": column >= value,
+    }[operator]
+
+
+def apply_filters(query, filters: Optional[Sequence[str]], columns: Dict):
+    """Add a WHERE condition to ``query`` per ``column:operator:value`` filter.
+
+    Values are converted to the type of the column: numbers, ISO dates (a date,
+    month or year matches its whole range) or text, which ``contains`` matches
+    case-insensitively.
+    """
+    for spec in filters or ():
+        name, _, rest = spec.partition(":")
+        operator, _, value = rest.partition(":")
+        if name not in columns:
+            raise InvalidQuery(f"Cannot filter by {name!r}, expected one of {', '.join(columns)}")
+        if operator not in FILTER_OPERATORS:
+            raise InvalidQuery(f"Unknown filter operator {operator!r}, expected one of {', '.join(FILTER_OPERATORS)}")
+        try:
+            query = query.where(_condition(columns[name], operator, value))
+        except InvalidQuery:
+            raise
+        except ValueError as e:
+            raise InvalidQuery(f"Invalid value in filter {spec!r}") from e
+    return query
+
+
+def sorted_page(db: Session, query, columns: Dict, order: List[Tuple[str, bool]], limit: int,
+                cursor: Optional[str] = None, offset: int = 0, total: bool = False) -> Dict:
+    """One page of ``query`` in ``order`` (see parse_sort), by cursor or by offset.
+
+    A cursor continues from the row it was taken from, so paging forward stays as
+    cheap as the first page; ``offset`` jumps straight to a page number and the page
+    it returns still carries a ``next_cursor``. Cursors only fit the order they were
+    issued for. With ``total`` the number of matching rows is counted as well.
+    Returns ``{"rows", "next_cursor"}`` (and ``"total"``).
+    """
+    keys = [columns[name] for name, _ in order]
+    descending = [desc for _, desc in order]
+    signature = ",".join(("-" if desc else "") + name for name, desc in order)
+
+    counted = query
+    if cursor:
+        values = decode_cursor(cursor, len(keys) + 1)
+        if values[0] != signature:
+            raise InvalidCursor(f"Cursor was issued for another sort order: {cursor}")
+        query = query.where(_after(keys, values[1:], descending))
+    query = query.add_columns(*(key.label(f"sort_key_{i}") for i, key in enumerate(keys)))
+    query = query.order_by(*(_order(key, desc) for key, desc in zip(keys, descending)))
+    if offset and not cursor:
+        query = query.offset(offset)
+    rows = db.execute(query.limit(limit + 1)).all()
+
+    page = {"rows": rows[:limit], "next_cursor": None}
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        page["next_cursor"] = encode_cursor([signature] + [getattr(last, f"sort_key_{i}") for i in range(len(keys))])
+    if total:
+        page["total"] = db.scalar(select(func.count()).select_from(counted.subquery()))
+    return page
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def stream_ndjson(session_factory, model, filters: Optional[Dict] = None,
+                        chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[str]:
+    """Yield a table as newline-delimited JSON, one chunk of rows at a time.
+
+    Rows come from a server-side cursor (``yield_per``) on a session owned by the
+    generator, so the session outlives the request handler and memory stays bounded
+    by ``chunk_size`` whatever the size of the table.
+    """
+    columns = list(model.__table__.columns)
+    statement = select(*columns).order_by(model.__table__.c.id)
+    for name, value in (filters or {}).items():
+        statement = statement.where(model.__table__.c[name] == value)
+
+    names = [column.name for column in columns]
+    async with session_factory() as db:
+        result = await db.stream(statement.execution_options(yield_per=chunk_size))
+        async for partition in result.partitions():
+            yield "".join(
+                json.dumps(dict(zip(names, row)), default=_json_default) + "\n" for row in partition
+            )
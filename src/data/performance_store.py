@@ -0,0 +1,202 @@
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..models.database import Game, PlayerPerformance, PERFORMANCE_REWRITES, get_table_versions, has_pending_writes
+
+# Integer box-score columns, stored as int16 in this order
+BOX_COLUMNS = [
+    "points", "assists", "rebounds", "steals", "blocks", "turnovers",
+    "field_goals_made", "field_goals_attempted",
+    "three_pointers_made", "three_pointers_attempted",
+    "free_throws_made", "free_throws_attempted",
+]
+
+# Above this share of new rows a refresh re-sorts everything instead of inserting in place
+_MERGE_RATIO = 0.25
+
+
+class PerformanceSnapshot:
+    """player_performances as column arrays sorted by player, game date and game.
+
+    ``offsets[i]:offsets[i + 1]`` are the rows of ``players[i]``, so one player's
+    history is a contiguous, zero-copy slice of every column. Snapshots are never
+    modified in place; a refresh builds a new one.
+    """
+
+    __slots__ = ("ids", "player_ids", "game_ids", "dates", "stats", "minutes", "players", "offsets")
+
+    def __init__(self, ids: np.ndarray, player_ids: np.ndarray, game_ids: np.ndarray, dates: np.ndarray,
+                 stats: np.ndarray, minutes: np.ndarray):
+        self.ids = ids
+        self.player_ids = player_ids
+        self.game_ids = game_ids
+        self.dates = dates
+        self.stats = stats
+        self.minutes = minutes
+        self.players, starts = np.unique(player_ids, return_index=True)
+        self.offsets = np.r_[starts, len(player_ids)].astype(np.int64)
+
+    @classmethod
+    def empty(cls) -> "PerformanceSnapshot":
+        return cls(np.empty(0, np.int64), np.empty(0, np.int32), np.empty(0, np.int32),
+                   np.empty(0, "datetime64[s]"), np.empty((0, len(BOX_COLUMNS)), np.int16), np.empty(0, np.float32))
+
+    @classmethod
+    def from_rows(cls, rows: List) -> "PerformanceSnapshot":
+        """Build from (id, player_id, game_id, date, *BOX_COLUMNS, minutes_played) rows in sort order"""
+        if not rows:
+            return cls.empty()
+        columns = list(zip(*rows))
+        stats = np.array(columns[4:4 + len(BOX_COLUMNS)], dtype=float).T
+        minutes = np.array(columns[-1], dtype=float)
+        return cls(
+            np.array(columns[0], dtype=np.int64),
+            np.array(columns[1], dtype=np.int32),
+            np.array(columns[2], dtype=np.int32),
+            np.array(columns[3], dtype="datetime64[s]"),
+            np.nan_to_num(stats).astype(np.int16),
+            np.nan_to_num(minutes).astype(np.float32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
+
+    @property
+    def max_id(self) -> int:
+        return int(self.ids.max()) if len(self.ids) else 0
+
+    def rows(self, player_id: int) -> slice:
+        """Row range of one player's games, empty if they have none"""
+        i = int(np.searchsorted(self.players, player_id))
+        if i < len(self.players) and self.players[i] == player_id:
+            return slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+        return slice(0, 0)
+
+    def player_stats(self, player_id: int) -> np.ndarray:
+        """``(games, BOX_COLUMNS)`` view of one player's box scores in date order"""
+        return self.stats[self.rows(player_id)]
+
+    def column(self, player_id: int, name: str) -> np.ndarray:
+        """One stat of one player as a view, ``minutes_played`` included"""
+        if name == "minutes_played":
+            return self.minutes[self.rows(player_id)]
+        return self.stats[self.rows(player_id), BOX_COLUMNS.index(name)]
+
+    def _position(self, player_id: int, date: np.datetime64, game_id: int) -> int:
+        """Row index a new line would take to keep the sort order"""
+        rows = self.rows(player_id)
+        if rows.start == rows.stop:
+            return int(self.offsets[np.searchsorted(self.players, player_id)])
+        position = rows.start + int(np.searchsorted(self.dates[rows], date, side="right"))
+        while position > rows.start and self.dates[position - 1] == date and self.game_ids[position - 1] > game_id:
+            position -= 1
+        return position
+
+    def merged(self, new: "PerformanceSnapshot") -> "PerformanceSnapshot":
+        """A snapshot with the lines of ``new`` added, in sort order"""
+        if len(new) == 0:
+            return self
+        columns = ("ids", "player_ids", "game_ids", "dates", "stats", "minutes")
+        if len(new) > _MERGE_RATIO * len(self):
+            merged = {name: np.concatenate([getattr(self, name), getattr(new, name)]) for name in columns}
+            order = np.lexsort((merged["game_ids"], merged["dates"], merged["player_ids"]))
+            return PerformanceSnapshot(*[merged[name][order] for name in columns])
+
+        positions = [self._position(player_id, date, game_id) for player_id, date, game_id
+                     in zip(new.player_ids.tolist(), new.dates, new.game_ids.tolist())]
+        return PerformanceSnapshot(*[np.insert(getattr(self, name), positions, getattr(new, name), axis=0)
+                                     for name in columns])
+
+
+class PerformanceStore:
+    """Read-optimized, in-memory copy of player_performances for the analytics.
+
+    The whole table is loaded once into a ``PerformanceSnapshot`` (about 50 bytes
+    per box-score line). When the player_performances version moves, lines with a
+    higher id than any loaded are read and merged in; if they don't account for
+    the new row count, or the player_performances_rewrite version moved too (lines
+    were updated or deleted, or games re-dated, by any process), the table is
+    reloaded.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[PerformanceSnapshot] = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load(db: Session, player_ids: Optional[Iterable[int]] = None,
+             after_id: Optional[int] = None) -> PerformanceSnapshot:
+        """Read box scores into a new snapshot, optionally for some players or after an id"""
+        query = (
+            select(PlayerPerformance.id, PlayerPerformance.player_id, PlayerPerformance.game_id, Game.date,
+                   *[getattr(PlayerPerformance, column) for column in BOX_COLUMNS],
+                   PlayerPerformance.minutes_played)
+            .join(Game, PlayerPerformance.game_id == Game.id)
+            .order_by(PlayerPerformance.player_id, Game.date, PlayerPerformance.game_id)
+        )
+        if player_ids is not None:
+            query = query.where(PlayerPerformance.player_id.in_(list(player_ids)))
+        if after_id is not None:
+            query = query.where(PlayerPerformance.id > after_id)
+        return PerformanceSnapshot.from_rows(db.execute(query).all())
+
+    def snapshot(self, db: Session, player_ids: Optional[Iterable[int]] = None) -> PerformanceSnapshot:
+        """The current snapshot, caught up with box scores committed since the last call.
+
+        With uncommitted writes in ``db``, a private snapshot of ``player_ids`` (all
+        players if None) is read through the session instead.
+        """
+        if has_pending_writes(db):
+            # Uncommitted rows must not leak into the shared snapshot
+            return self.load(db, player_ids)
+        versions = get_table_versions(db)
+        version = (versions.get("player_performances", (0, None))[0], versions.get(PERFORMANCE_REWRITES, (0, None))[0])
+        with self._lock:
+            base, base_version = self._snapshot, self._version
+        if base is not None and version == base_version:
+            return base
+
+        # Read outside the lock: under AsyncSession.run_sync this runs on the event
+        # loop, and a request waiting on the lock would stop the reading one resuming
+        snapshot = self._refresh(db, base, base_version, version)
+        with self._lock:
+            if self._snapshot is base:
+                self._snapshot, self._version = snapshot, version
+        return snapshot
+
+    def _refresh(self, db: Session, base: Optional[PerformanceSnapshot], base_version, version) -> PerformanceSnapshot:
+        """``base`` caught up from ``base_version`` to ``version``"""
+        if base is None or version[1] != base_version[1]:
+            return self.load(db)
+        count, max_id = db.execute(
+            select(func.count(PlayerPerformance.id), func.max(PlayerPerformance.id))
+            .join(Game, PlayerPerformance.game_id == Game.id)
+        ).one()
+        new = self.load(db, after_id=base.max_id) if (max_id or 0) > base.max_id else None
+        if new is not None and len(base) + len(new) == count:
+            return base.merged(new)
+        # The move is not only new lines: existing ones were changed or removed
+        return self.load(db)
+
+    @property
+    def current(self) -> Optional[PerformanceSnapshot]:
+        """The shared snapshot as of the last refresh, without checking for new rows"""
+        return self._snapshot
+
+    def stats(self) -> Dict:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"loaded": False}
+        return {"loaded": True, "rows": len(snapshot), "players": len(snapshot.players), "bytes": snapshot.nbytes}
+
+
+performance_store = PerformanceStore()
@@ -0,0 +1,336 @@
+import argparse
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..models.database import (
+    Team, Player, Game, PlayerPerformance, Odds,
+    SessionLocal, create_tables
+)
+from .aggregates import apply_performances
+from .odds_history import apply_snapshots
+
+# (name, city, conference, division); the first six are the original sample teams
+NBA_TEAMS = [
+    ("Lakers", "Los Angeles", "Western", "Pacific"),
+    ("Warriors", "Golden State", "Western", "Pacific"),
+    ("Celtics", "Boston", "Eastern", "Atlantic"),
+    ("Heat", "Miami", "Eastern", "Southeast"),
+    ("Nuggets", "Denver", "Western", "Northwest"),
+    ("76ers", "Philadelphia", "Eastern", "Atlantic"),
+    ("Bucks", "Milwaukee", "Eastern", "Central"),
+    ("Knicks", "New York", "Eastern", "Atlantic"),
+    ("Nets", "Brooklyn", "Eastern", "Atlantic"),
+    ("Raptors", "Toronto", "Eastern", "Atlantic"),
+    ("Bulls", "Chicago", "Eastern", "Central"),
+    ("Cavaliers", "Cleveland", "Eastern", "Central"),
+    ("Pistons", "Detroit", "Eastern", "Central"),
+    ("Pacers", "Indiana", "Eastern", "Central"),
+    ("Hawks", "Atlanta", "Eastern", "Southeast"),
+    ("Hornets", "Charlotte", "Eastern", "Southeast"),
+    ("Magic", "Orlando", "Eastern", "Southeast"),
+    ("Wizards", "Washington", "Eastern", "Southeast"),
+    ("Timberwolves", "Minnesota", "Western", "Northwest"),
+    ("Thunder", "Oklahoma City", "Western", "Northwest"),
+    ("Trail Blazers", "Portland", "Western", "Northwest"),
+    ("Jazz", "Utah", "Western", "Northwest"),
+    ("Clippers", "Los Angeles", "Western", "Pacific"),
+    ("Suns", "Phoenix", "Western", "Pacific"),
+    ("Kings", "Sacramento", "Western", "Pacific"),
+    ("Mavericks", "Dallas", "Western", "Southwest"),
+    ("Rockets", "Houston", "Western", "Southwest"),
+    ("Grizzlies", "Memphis", "Western", "Southwest"),
+    ("Pelicans", "New Orleans", "Western", "Southwest"),
+    ("Spurs", "San Antonio", "Western", "Southwest"),
+]
+
+SAMPLE_PLAYERS = [
+    "LeBron James", "Stephen Curry", "Jayson Tatum", "Jimmy Butler",
+    "Nikola Jokic", "Joel Embiid", "Anthony Davis", "Klay Thompson",
+    "Jaylen Brown", "Tyler Herro", "Jamal Murray", "James Harden"
+]
+
+POSITIONS = ["PG", "SG", "SF", "PF", "C"]
+BOOKMAKERS = ["DraftKings", "Bet365", "FanDuel", "BetMGM"]
+BET_TYPES = ["moneyline", "spread", "over_under"]
+
+
+@dataclass
+class SeedConfig:
+    """Scale and randomness of a generated league dataset"""
+    teams: int = 30
+    players_per_team: int = 15
+    games: int = 1230
+    scheduled_games: int = 15  # Upcoming games the day after the season, with odds but no results
+    lines_per_game: int = 20  # Box-score lines per game, split between both teams
+    odds_snapshots_per_game: int = 1
+    snapshot_interval_minutes: int = 60
+    bookmakers: List[str] = field(default_factory=lambda: list(BOOKMAKERS))
+    season_days: int = 170
+    start_date: Optional[datetime] = None  # Defaults to season_days before today
+    seed: int = 42
+    batch_size: int = 5000
+
+    @classmethod
+    def sample(cls) -> "SeedConfig":
+        """The small demo dataset the app seeds on first start"""
+        return cls(teams=6, players_per_team=2, games=20, scheduled_games=3, lines_per_game=10, season_days=30)
+
+
+def _batched(rows: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _max_id(db: Session, model) -> int:
+    return db.scalar(select(func.max(model.id))) or 0
+
+
+def _box_score(rng: random.Random, player_id: int, game_id: int) -> Dict:
+    field_goals_attempted = rng.randint(4, 25)
+    three_pointers_attempted = rng.randint(0, min(12, field_goals_attempted))
+    three_pointers_made = rng.randint(three_pointers_attempted // 5, three_pointers_attempted // 2)
+    two_pointers_attempted = field_goals_attempted - three_pointers_attempted
+    two_pointers_made = rng.randint(two_pointers_attempted * 2 // 5, two_pointers_attempted * 3 // 5)
+    free_throws_attempted = rng.randint(0, 12)
+    free_throws_made = rng.randint(free_throws_attempted // 2, free_throws_attempted)
+    return {
+        "player_id": player_id,
+        "game_id": game_id,
+        "points": 2 * two_pointers_made + 3 * three_pointers_made + free_throws_made,
+        "assists": rng.randint(0, 12),
+        "rebounds": rng.randint(1, 15),
+        "steals": rng.randint(0, 4),
+        "blocks": rng.randint(0, 3),
+        "turnovers": rng.randint(0, 6),
+        "field_goals_made": two_pointers_made + three_pointers_made,
+        "field_goals_attempted": field_goals_attempted,
+        "three_pointers_made": three_pointers_made,
+        "three_pointers_attempted": three_pointers_attempted,
+        "free_throws_made": free_throws_made,
+        "free_throws_attempted": free_throws_attempted,
+        "minutes_played": round(rng.uniform(12.0, 42.0), 1),
+    }
+
+
+def _american(probability: float) -> float:
+    """American odds for an implied probability"""
+    if probability >= 0.5:
+        return -100 * probability / (1 - probability)
+    return 100 * (1 - probability) / probability
+
+
+def _odds_snapshots(rng: random.Random, config: SeedConfig, game_id: int, game_date: datetime) -> Iterator[Dict]:
+    interval = timedelta(minutes=config.snapshot_interval_minutes)
+    first_snapshot = game_date - interval * config.odds_snapshots_per_game
+    # Bookmakers price around a shared view of the game, each with its own margin
+    home_win = rng.uniform(0.25, 0.75)
+    spread = round((0.5 - home_win) * 30 * 2) / 2
+    total = round(rng.uniform(200, 240) * 2) / 2
+    for bookmaker in config.bookmakers:
+        margin = rng.uniform(0.02, 0.06)
+        home_price = min(max(home_win + rng.uniform(-0.03, 0.03), 0.08), 0.92)
+        home_spread = spread + rng.choice((-0.5, 0.0, 0.0, 0.5))
+        total_line = total + rng.choice((-0.5, 0.0, 0.0, 0.5))
+        for snapshot in range(config.odds_snapshots_per_game):
+            timestamp = first_snapshot + interval * snapshot
+            spread_home = rng.uniform(0.47, 0.53)
+            over = rng.uniform(0.47, 0.53)
+            for bet_type, selection, probability, line in (
+                ("moneyline", "home", home_price, None),
+                ("moneyline", "away", 1 - home_price, None),
+                ("spread", "home", spread_home, home_spread),
+                ("spread", "away", 1 - spread_home, -home_spread),
+                ("over_under", "over", over, total_line),
+                ("over_under", "under", 1 - over, total_line),
+            ):
+                yield {
+                    "game_id": game_id,
+                    "bookmaker": bookmaker,
+                    "bet_type": bet_type,
+                    "selection": selection,
+                    "odds_value": round(_american(probability * (1 + margin)), 1),
+                    "line": line,
+                    "timestamp": timestamp,
+                }
+            # Lines drift between snapshots
+            home_price = min(max(home_price + rng.uniform(-0.01, 0.01), 0.08), 0.92)
+            home_spread += rng.choice((-0.5, 0.0, 0.0, 0.5))
+            total_line += rng.choice((-0.5, 0.0, 0.0, 0.5))
+
+
+def bulk_seed(db: Session, config: SeedConfig) -> Dict[str, int]:
+    """Generate a deterministic league dataset and load it with batched executemany inserts.
+
+    Rows are written through Core inserts in ``config.batch_size`` chunks inside a
+    single transaction; season aggregates and latest odds lines are folded in per
+    batch. Returns the number of rows written per table.
+    """
+    rng = random.Random(config.seed)
+    connection = db.connection()
+    start_date = config.start_date or datetime.now() - timedelta(days=config.season_days)
+    counts = {}
+
+    # Teams
+    base_id = _max_id(db, Team)
+    team_rows = []
+    for i in range(config.teams):
+        if i < len(NBA_TEAMS):
+            name, city, conference, division = NBA_TEAMS[i]
+        else:
+            name, city, conference, division = f"Team {i + 1}", f"City {i + 1}", "Expansion", "Expansion"
+        team_rows.append({"name": name, "city": city, "conference": conference, "division": division,
+                          "wins": 0, "losses": 0})
+    connection.execute(insert(Team.__table__), team_rows)
+    team_ids = list(db.scalars(select(Team.id).where(Team.id > base_id).order_by(Team.id)))
+    counts["teams"] = len(team_ids)
+
+    # Players, assigned round-robin like the original sample data
+    base_id = _max_id(db, Player)
+    player_rows = []
+    for i in range(config.teams * config.players_per_team):
+        player_rows.append({
+            "name": SAMPLE_PLAYERS[i] if i < len(SAMPLE_PLAYERS) else f"Player {i + 1:04d}",
+            "team_id": team_ids[i % len(team_ids)],
+            "position": rng.choice(POSITIONS),
+            "age": rng.randint(20, 38),
+            "height": f"{rng.randint(6, 7)}'{rng.randint(0, 11)}\"",
+            "weight": rng.randint(180, 280),
+            "injury_status": rng.choice(["healthy", "healthy", "probable", "questionable"]),
+        })
+    for batch in _batched(iter(player_rows), config.batch_size):
+        connection.execute(insert(Player.__table__), batch)
+    roster = {team_id: [] for team_id in team_ids}
+    for player_id, team_id in db.execute(select(Player.id, Player.team_id).where(Player.id > base_id)):
+        roster[team_id].append(player_id)
+    counts["players"] = len(player_rows)
+
+    # Games, spread evenly over the season
+    base_id = _max_id(db, Game)
+    game_rows = []
+    record = {team_id: [0, 0] for team_id in team_ids}
+    for i in range(config.games):
+        home_id, away_id = rng.sample(team_ids, 2)
+        home_score, away_score = rng.randint(90, 130), rng.randint(90, 130)
+        if home_score == away_score:
+            home_score += 1
+        record[home_id][0 if home_score > away_score else 1] += 1
+        record[away_id][0 if away_score > home_score else 1] += 1
+        offset = timedelta(days=config.season_days * i / max(config.games, 1), hours=rng.randint(0, 4))
+        game_rows.append({
+            "date": start_date + offset,
+            "home_team_id": home_id,
+            "away_team_id": away_id,
+            "home_score": home_score,
+            "away_score": away_score,
+            "status": "completed",
+        })
+    for i in range(config.scheduled_games):
+        home_id, away_id = rng.sample(team_ids, 2)
+        game_rows.append({
+            "date": start_date + timedelta(days=config.season_days + 1, hours=rng.randint(0, 4)),
+            "home_team_id": home_id,
+            "away_team_id": away_id,
+            "home_score": None,
+            "away_score": None,
+            "status": "scheduled",
+        })
+    for batch in _batched(iter(game_rows), config.batch_size):
+        connection.execute(insert(Game.__table__), batch)
+    games = db.execute(
+        select(Game.id, Game.date, Game.home_team_id, Game.away_team_id, Game.status)
+        .where(Game.id > base_id).order_by(Game.id)
+    ).all()
+    counts["games"] = len(games)
+
+    # Team records follow from the generated results
+    connection.execute(
+        update(Team.__table__).where(Team.__table__.c.id == bindparam("b_id")),
+        [{"b_id": team_id, "wins": wins, "losses": losses} for team_id, (wins, losses) in record.items()]
+    )
+
+    # Box scores
+    def performance_rows():
+        per_side = max(config.lines_per_game // 2, 1)
+        for game in games:
+            if game.status != "completed":
+                continue
+            for team_id in (game.home_team_id, game.away_team_id):
+                for player_id in roster[team_id][:per_side]:
+                    yield {**_box_score(rng, player_id, game.id), "team_id": team_id}
+
+    counts["player_performances"] = 0
+    for batch in _batched(performance_rows(), config.batch_size):
+        connection.execute(insert(PlayerPerformance.__table__), batch)
+        apply_performances(connection, batch)
+        counts["player_performances"] += len(batch)
+
+    # Odds snapshots
+    def odds_rows():
+        for game in games:
+            yield from _odds_snapshots(rng, config, game.id, game.date)
+
+    counts["odds"] = 0
+    for batch in _batched(odds_rows(), config.batch_size):
+        connection.execute(insert(Odds.__table__), batch)
+        apply_snapshots(connection, batch)
+        counts["odds"] += len(batch)
+
+    db.commit()
+    return counts
+
+
+def main():
+    defaults = SeedConfig()
+    parser = argparse.ArgumentParser(description="Bulk-load a deterministic synthetic NBA dataset")
+    parser.add_argument("--teams", type=int, default=defaults.teams)
+    parser.add_argument("--players-per-team", type=int, default=defaults.players_per_team)
+    parser.add_argument("--games", type=int, default=defaults.games)
+    parser.add_argument("--scheduled-games", type=int, default=defaults.scheduled_games,
+                        help="upcoming games after the season, with odds but no results")
+    parser.add_argument("--lines-per-game", type=int, default=defaults.lines_per_game)
+    parser.add_argument("--odds-snapshots", type=int, default=defaults.odds_snapshots_per_game,
+                        help="odds snapshots per game, bookmaker, bet type and side")
+    parser.add_argument("--snapshot-interval", type=int, default=defaults.snapshot_interval_minutes,
+                        help="minutes between odds snapshots")
+    parser.add_argument("--season-days", type=int, default=defaults.season_days)
+    parser.add_argument("--start-date", type=datetime.fromisoformat, default=None,
+                        help="date of the first game (ISO format), defaults to season-days ago")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    args = parser.parse_args()
+
+    config = SeedConfig(
+        teams=args.teams,
+        players_per_team=args.players_per_team,
+        games=args.games,
+        scheduled_games=args.scheduled_games,
+        lines_per_game=args.lines_per_game,
+        odds_snapshots_per_game=args.odds_snapshots,
+        snapshot_interval_minutes=args.snapshot_interval,
+        season_days=args.season_days,
+        start_date=args.start_date,
+        seed=args.seed,
+        batch_size=args.batch_size,
+    )
+    create_tables()
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        counts = bulk_seed(db, config)
+    elapsed = time.perf_counter() - started
+    print(", ".join(f"{count} {table}" for table, count in counts.items()) + f" loaded in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
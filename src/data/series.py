@@ -0,0 +1,158 @@
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+
+from ..models.database import Odds
+from .hit_rates import COMBO_STATS
+from .odds_history import default_selection
+from .performance_store import BOX_COLUMNS, PerformanceSnapshot
+
+load_dotenv()
+
+# Points kept per series when the caller does not say, about the plot width of a chart in pixels
+SERIES_POINTS = int(os.getenv("SERIES_POINTS", "800"))
+MIN_SERIES_POINTS = 10
+MAX_SERIES_POINTS = 10000
+
+# Stats a player's game-by-game series can be drawn for
+SERIES_STATS = BOX_COLUMNS + ["minutes_played"] + list(COMBO_STATS)
+DEFAULT_SERIES_STATS = ("points", "rebounds", "assists")
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the ``threshold`` points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept; every bucket in between keeps the
+    point forming the largest triangle with the point kept before it and the mean
+    of the next bucket, which preserves peaks and troughs a plain stride would
+    drop. ``x`` must be sorted. All indices are returned when there are at most
+    ``threshold`` points.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # threshold - 2 buckets over the interior points, each at least one point wide
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    means_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / sizes
+    means_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / sizes
+    next_x = np.append(means_x[1:], x[n - 1])
+    next_y = np.append(means_y[1:], y[n - 1])
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        ax, ay = x[previous], y[previous]
+        # Twice the triangle areas, for every candidate of the bucket at once
+        areas = np.abs((ax - next_x[bucket]) * (y[start:stop] - ay) - (ax - x[start:stop]) * (next_y[bucket] - ay))
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def _timestamps(values: np.ndarray) -> np.ndarray:
+    """datetime64 values as float seconds, the x axis LTTB measures areas on"""
+    return values.astype("datetime64[s]").astype(np.int64).astype(float)
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored as naive UTC"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _iso(values: np.ndarray) -> List[str]:
+    return np.datetime_as_string(values.astype("datetime64[s]")).tolist()
+
+
+def _stat_values(snapshot: PerformanceSnapshot, rows: slice, stat: str) -> np.ndarray:
+    if stat == "minutes_played":
+        return snapshot.minutes[rows].astype(float)
+    columns = [BOX_COLUMNS.index(part) for part in COMBO_STATS.get(stat, (stat,))]
+    return snapshot.stats[rows][:, columns].sum(axis=1).astype(float)
+
+
+def player_series(snapshot: PerformanceSnapshot, player_id: int, stats: Sequence[str] = DEFAULT_SERIES_STATS,
+                  points: int = SERIES_POINTS, start: Optional[datetime] = None,
+                  end: Optional[datetime] = None) -> Dict:
+    """A player's game-by-game ``stats`` between ``start`` and ``end``, LTTB-downsampled to ``points``.
+
+    Each stat keeps its own points, so every series keeps its own peaks. Once the
+    range holds no more than ``points`` games (zoomed in) the series are exact.
+    """
+    start, end = _naive_utc(start), _naive_utc(end)
+    rows = snapshot.rows(player_id)
+    dates = snapshot.dates[rows]
+    first = int(np.searchsorted(dates, np.datetime64(start, "s"))) if start else 0
+    last = int(np.searchsorted(dates, np.datetime64(end, "s"), side="right")) if end else len(dates)
+    rows = slice(rows.start + first, rows.start + max(first, last))
+    dates = snapshot.dates[rows]
+
+    x = _timestamps(dates)
+    series = {}
+    for stat in stats:
+        values = _stat_values(snapshot, rows, stat)
+        kept = lttb(x, values, points)
+        series[stat] = {"dates": _iso(dates[kept]), "values": values[kept].tolist()}
+    return {"player_id": player_id, "games": len(dates), "downsampled": len(dates) > points, "series": series}
+
+
+def odds_series(connection: Connection, game_id: int, bet_type: Optional[str] = None,
+                bookmaker: Optional[str] = None, points: int = SERIES_POINTS,
+                since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[Dict]:
+    """Price (and line) over time per bookmaker, bet type and side, LTTB-downsampled to ``points`` each.
+
+    Where a market has a line, half the points follow the price and half the
+    line, so line moves survive as well as price spikes.
+    """
+    query = (
+        select(Odds.bookmaker, Odds.bet_type, Odds.selection, Odds.timestamp, Odds.odds_value, Odds.line)
+        .where(Odds.game_id == game_id)
+        .order_by(Odds.bookmaker, Odds.bet_type, Odds.timestamp)
+    )
+    if bookmaker:
+        query = query.where(Odds.bookmaker == bookmaker)
+    if bet_type:
+        query = query.where(Odds.bet_type == bet_type)
+    if since:
+        query = query.where(Odds.timestamp >= _naive_utc(since))
+    if until:
+        query = query.where(Odds.timestamp <= _naive_utc(until))
+
+    snapshots = pd.DataFrame(connection.execute(query).all(),
+                             columns=["bookmaker", "bet_type", "selection", "timestamp", "odds_value", "line"])
+    if snapshots.empty:
+        return []
+
+    snapshots["selection"] = snapshots["selection"].fillna(snapshots["bet_type"].map(default_selection))
+    series = []
+    for (book, market, selection), group in snapshots.groupby(["bookmaker", "bet_type", "selection"], sort=True):
+        group = group.sort_values("timestamp", kind="stable")
+        timestamps = group["timestamp"].to_numpy(dtype="datetime64[ns]")
+        x = _timestamps(timestamps)
+        prices = group["odds_value"].to_numpy(dtype=float)
+        lines = group["line"].to_numpy(dtype=float)
+        if np.isnan(lines).any():
+            kept = lttb(x, prices, points)
+        else:
+            kept = np.union1d(lttb(x, prices, points // 2), lttb(x, lines, points - points // 2))
+        series.append({
+            "bookmaker": book,
+            "bet_type": market,
+            "selection": selection,
+            "snapshots": len(group),
+            "timestamps": _iso(timestamps[kept]),
+            "odds_value": prices[kept].tolist(),
+            "line": [None if np.isnan(line) else line for line in lines[kept].tolist()],
+        })
+    return series
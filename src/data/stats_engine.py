@@ -0,0 +1,179 @@
+from types import SimpleNamespace
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..models.database import Team, Player, PlayerSeasonAggregate, TeamSeasonAggregate
+from .performance_store import BOX_COLUMNS, performance_store
+
+# Per-game columns returned in player game logs
+GAME_LOG_COLUMNS = [
+    "points", "assists", "rebounds", "steals", "blocks", "turnovers",
+    "field_goals_made", "field_goals_attempted",
+    "three_pointers_made", "three_pointers_attempted",
+    "minutes_played",
+]
+
+_GAME_LOG_KEYS = ["game_id", "date", *GAME_LOG_COLUMNS]
+_GAME_LOG_INDEXES = {column: BOX_COLUMNS.index(column) for column in GAME_LOG_COLUMNS[:-1]}
+
+
+def _pct(made, attempted) -> float:
+    return round((made or 0) / max(attempted or 0, 1) * 100, 1)
+
+
+def _per_game(total, games) -> float:
+    return round((total or 0) / games, 1) if games else 0.0
+
+
+class StatsEngine:
+    """Player and team aggregates read from the season aggregate tables"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _aggregate_query(self, season: Optional[int] = None):
+        aggregate = PlayerSeasonAggregate
+        join_on = aggregate.player_id == Player.id
+        if season is not None:
+            join_on = join_on & (aggregate.season == season)
+
+        return (
+            select(
+                Player.id,
+                Player.name,
+                Player.position,
+                Team.name.label("team"),
+                func.coalesce(func.sum(aggregate.games_played), 0).label("games_played"),
+                func.sum(aggregate.points).label("points"),
+                func.sum(aggregate.assists).label("assists"),
+                func.sum(aggregate.rebounds).label("rebounds"),
+                func.sum(aggregate.field_goals_made).label("fgm"),
+                func.sum(aggregate.field_goals_attempted).label("fga"),
+                func.sum(aggregate.three_pointers_made).label("tpm"),
+                func.sum(aggregate.three_pointers_attempted).label("tpa"),
+            )
+            .select_from(Player)
+            .outerjoin(Team, Player.team_id == Team.id)
+            .outerjoin(aggregate, join_on)
+            .group_by(Player.id, Player.name, Player.position, Team.name)
+        )
+
+    @staticmethod
+    def _row_to_stats(row) -> Dict:
+        if not row.games_played:
+            return {"name": row.name, "games_played": 0}
+
+        return {
+            "name": row.name,
+            "team": row.team,
+            "position": row.position,
+            "games_played": row.games_played,
+            "avg_points": _per_game(row.points, row.games_played),
+            "avg_assists": _per_game(row.assists, row.games_played),
+            "avg_rebounds": _per_game(row.rebounds, row.games_played),
+            "fg_percentage": _pct(row.fgm, row.fga),
+            "three_pt_percentage": _pct(row.tpm, row.tpa),
+        }
+
+    def player_stats(self, player_id: int, season: Optional[int] = None) -> Dict:
+        """Aggregate stats for one player, empty dict if the player does not exist"""
+        row = self.db.execute(
+            self._aggregate_query(season).where(Player.id == player_id)
+        ).first()
+        return self._row_to_stats(row) if row else {}
+
+    def bulk_player_stats(self, player_ids: Optional[Iterable[int]] = None,
+                          team_id: Optional[int] = None,
+                          season: Optional[int] = None) -> Dict[int, Dict]:
+        """Aggregate stats for many players (or a whole team) in one round trip"""
+        query = self._aggregate_query(season)
+        if player_ids is not None:
+            query = query.where(Player.id.in_(list(player_ids)))
+        if team_id:
+            query = query.where(Player.team_id == team_id)
+
+        return {row.id: self._row_to_stats(row) for row in self.db.execute(query)}
+
+    def player_game_logs(self, player_ids: Iterable[int]) -> Dict[int, Dict]:
+        """Stats and per-game series for several players, read from the performance snapshot.
+
+        Returns ``{player_id: {"stats": ..., "game_log": [...]}}`` for every existing
+        player; the stats match ``player_stats`` but come from the same rows as the log.
+        """
+        players = self.db.execute(
+            select(Player.id, Player.name, Player.position, Team.name.label("team"))
+            .select_from(Player)
+            .outerjoin(Team, Player.team_id == Team.id)
+            .where(Player.id.in_(list(player_ids)))
+            .order_by(Player.id)
+        ).all()
+        if not players:
+            return {}
+
+        snapshot = performance_store.snapshot(self.db, [player.id for player in players])
+        results = {}
+        for player in players:
+            rows = snapshot.rows(player.id)
+            box_scores = snapshot.stats[rows]
+            totals = dict(zip(BOX_COLUMNS, box_scores.sum(axis=0, dtype=np.int64).tolist()))
+            stats = self._row_to_stats(SimpleNamespace(
+                name=player.name, team=player.team, position=player.position,
+                games_played=len(box_scores),
+                points=totals["points"], assists=totals["assists"], rebounds=totals["rebounds"],
+                fgm=totals["field_goals_made"], fga=totals["field_goals_attempted"],
+                tpm=totals["three_pointers_made"], tpa=totals["three_pointers_attempted"],
+            ))
+
+            columns = [box_scores[:, _GAME_LOG_INDEXES[column]].tolist() for column in GAME_LOG_COLUMNS[:-1]]
+            game_log = [
+                dict(zip(_GAME_LOG_KEYS, values)) for values in zip(
+                    snapshot.game_ids[rows].tolist(),
+                    np.datetime_as_string(snapshot.dates[rows], unit="D").tolist(),
+                    *columns,
+                    np.round(snapshot.minutes[rows].astype(float), 1).tolist(),
+                )
+            ]
+            results[player.id] = {"stats": stats, "game_log": game_log}
+        return results
+
+    def team_stats(self, team_id: int, season: Optional[int] = None) -> Dict:
+        """Per-game team box-score averages, empty dict if the team does not exist"""
+        aggregate = TeamSeasonAggregate
+        join_on = aggregate.team_id == Team.id
+        if season is not None:
+            join_on = join_on & (aggregate.season == season)
+
+        row = self.db.execute(
+            select(
+                Team.name,
+                func.coalesce(func.sum(aggregate.games_played), 0).label("games_played"),
+                func.sum(aggregate.points).label("points"),
+                func.sum(aggregate.assists).label("assists"),
+                func.sum(aggregate.rebounds).label("rebounds"),
+                func.sum(aggregate.field_goals_made).label("fgm"),
+                func.sum(aggregate.field_goals_attempted).label("fga"),
+                func.sum(aggregate.three_pointers_made).label("tpm"),
+                func.sum(aggregate.three_pointers_attempted).label("tpa"),
+            )
+            .select_from(Team)
+            .outerjoin(aggregate, join_on)
+            .where(Team.id == team_id)
+            .group_by(Team.id, Team.name)
+        ).first()
+        if not row:
+            return {}
+        if not row.games_played:
+            return {"name": row.name, "games_played": 0}
+
+        return {
+            "name": row.name,
+            "games_played": row.games_played,
+            "avg_points": _per_game(row.points, row.games_played),
+            "avg_assists": _per_game(row.assists, row.games_played),
+            "avg_rebounds": _per_game(row.rebounds, row.games_played),
+            "fg_percentage": _pct(row.fgm, row.fga),
+            "three_pt_percentage": _pct(row.tpm, row.tpa),
+        }
@@ -1,8 +1,15 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy import create_engine, event, insert, inspect, select, text, update, Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Index
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import Session, sessionmaker, relationship
+from sqlalchemy.pool import Pool
+from sqlalchemy.sql.dml import Delete, Update, UpdateBase
 from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -30,7 +37,7 @@ class Player(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
-    team_id = Column(Integer, ForeignKey("teams.id"))
+    team_id = Column(Integer, ForeignKey("teams.id"), index=True)
     position = Column(String)
     age = Column(Integer)
     height = Column(String)
@@ -45,7 +52,7 @@ class Game(Base):
     __tablename__ = "games"
     
     id = Column(Integer, primary_key=True, index=True)
-    date = Column(DateTime, default=datetime.utcnow)
+    date = Column(DateTime, default=datetime.utcnow, index=True)
     home_team_id = Column(Integer, ForeignKey("teams.id"))
     away_team_id = Column(Integer, ForeignKey("teams.id"))
     home_score = Column(Integer)
@@ -60,10 +67,14 @@ class Game(Base):
 
 class PlayerPerformance(Base):
     __tablename__ = "player_performances"
+    __table_args__ = (
+        Index("ix_player_performances_player_game", "player_id", "game_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     player_id = Column(Integer, ForeignKey("players.id"))
-    game_id = Column(Integer, ForeignKey("games.id"))
+    game_id = Column(Integer, ForeignKey("games.id"), index=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=True)  # Team the player played for in this game
     points = Column(Integer, default=0)
     assists = Column(Integer, default=0)
     rebounds = Column(Integer, default=0)
@@ -84,29 +95,336 @@ class PlayerPerformance(Base):
 
 class Odds(Base):
     __tablename__ = "odds"
+    __table_args__ = (
+        Index("ix_odds_game_bookmaker_bet_type_timestamp", "game_id", "bookmaker", "bet_type", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     game_id = Column(Integer, ForeignKey("games.id"))
     bookmaker = Column(String)
     bet_type = Column(String)  # moneyline, spread, over_under
+    selection = Column(String, nullable=True)  # home/away for moneyline and spread, over/under for totals
     odds_value = Column(Float)
-    line = Column(Float, nullable=True)  # For spread/over_under bets
+    line = Column(Float, nullable=True)  # For spread/over_under bets, from the selection's side
     timestamp = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     game = relationship("Game", back_populates="odds")
 
+# Most recent snapshot per (game, bookmaker, bet type, selection), derived from the append-only odds history
+class OddsLatest(Base):
+    __tablename__ = "odds_latest"
+    
+    game_id = Column(Integer, ForeignKey("games.id"), primary_key=True)
+    bookmaker = Column(String, primary_key=True)
+    bet_type = Column(String, primary_key=True)
+    selection = Column(String, primary_key=True)
+    odds_value = Column(Float)
+    line = Column(Float, nullable=True)
+    timestamp = Column(DateTime)
+
+class PlayerSeasonAggregate(Base):
+    __tablename__ = "player_season_aggregates"
+    
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    season = Column(Integer, primary_key=True)  # Start year, e.g. 2024 for 2024-25
+    team_id = Column(Integer, ForeignKey("teams.id"))
+    games_played = Column(Integer, default=0)
+    points = Column(Integer, default=0)
+    assists = Column(Integer, default=0)
+    rebounds = Column(Integer, default=0)
+    steals = Column(Integer, default=0)
+    blocks = Column(Integer, default=0)
+    turnovers = Column(Integer, default=0)
+    field_goals_made = Column(Integer, default=0)
+    field_goals_attempted = Column(Integer, default=0)
+    three_pointers_made = Column(Integer, default=0)
+    three_pointers_attempted = Column(Integer, default=0)
+    free_throws_made = Column(Integer, default=0)
+    free_throws_attempted = Column(Integer, default=0)
+    minutes_played = Column(Float, default=0.0)
+
+class TeamSeasonAggregate(Base):
+    __tablename__ = "team_season_aggregates"
+    
+    team_id = Column(Integer, ForeignKey("teams.id"), primary_key=True)
+    season = Column(Integer, primary_key=True)  # Start year, e.g. 2024 for 2024-25
+    games_played = Column(Integer, default=0)
+    points = Column(Integer, default=0)
+    assists = Column(Integer, default=0)
+    rebounds = Column(Integer, default=0)
+    steals = Column(Integer, default=0)
+    blocks = Column(Integer, default=0)
+    turnovers = Column(Integer, default=0)
+    field_goals_made = Column(Integer, default=0)
+    field_goals_attempted = Column(Integer, default=0)
+    three_pointers_made = Column(Integer, default=0)
+    three_pointers_attempted = Column(Integer, default=0)
+    free_throws_made = Column(Integer, default=0)
+    free_throws_attempted = Column(Integer, default=0)
+    minutes_played = Column(Float, default=0.0)
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+    
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, default=0)
+    updated_at = Column(DateTime, nullable=True)
+
 # Database setup
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///nba_betting.db")
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
+
+# Connection pool settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# SQLite settings: WAL lets several processes read while one writes
+SQLITE_WAL = os.getenv("SQLITE_WAL", "true").lower() in ("1", "true", "yes")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+def async_database_url(url: str) -> str:
+    """Swap the sync driver for its asyncio counterpart (aiosqlite / asyncpg)"""
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def is_sqlite_memory(url: str) -> bool:
+    return is_sqlite(url) and (":memory:" in url or url.split("://", 1)[1] in ("", "/"))
+
+def engine_options(url: str) -> dict:
+    """Keyword arguments for create_engine/create_async_engine driven by the environment"""
+    options = {"pool_pre_ping": True}
+    if is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        if is_sqlite_memory(url):
+            # In-memory databases live in a single connection; pool sizing does not apply
+            return options
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return options
+
+def configure_sqlite_connection(dbapi_connection, connection_record):
+    """Apply per-connection SQLite pragmas (WAL journal, busy timeout)"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    if SQLITE_WAL and not is_sqlite_memory(DATABASE_URL):
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+if is_sqlite(DATABASE_URL):
+    event.listen(engine, "connect", configure_sqlite_connection)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async database setup, used by the FastAPI endpoints
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", async_database_url(DATABASE_URL))
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+if is_sqlite(ASYNC_DATABASE_URL):
+    event.listen(async_engine.sync_engine, "connect", configure_sqlite_connection)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+def create_indexes(bind=engine):
+    """Create declared indexes that are missing from tables built by older versions"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+# Tables rebuilt from other tables on startup; safe to drop when their primary key changes
+DERIVED_TABLES = {"odds_latest", "player_season_aggregates", "team_season_aggregates"}
+
+def add_missing_columns(bind=engine):
+    """Add declared columns that are missing from tables built by older versions.
+
+    A primary key column cannot be added in place, so derived tables that gained
+    one are dropped and recreated empty, to be backfilled on startup.
+    """
+    inspector = inspect(bind)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing = [column for column in table.columns if column.name not in existing]
+        if not missing:
+            continue
+        if any(column.primary_key for column in missing):
+            if table.name not in DERIVED_TABLES:
+                raise RuntimeError(f"Cannot add primary key columns to {table.name}")
+            table.drop(bind=bind)
+            table.create(bind=bind)
+            continue
+        with bind.begin() as connection:
+            for column in missing:
+                connection.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(bind.dialect)}"
+                ))
+
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    create_indexes()
+    with engine.begin() as connection:
+        ensure_table_versions(connection)
 
 def get_db():
+    """FastAPI dependency yielding a request-scoped session"""
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """FastAPI dependency yielding a request-scoped async session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Table versions: every committed write bumps a per-table counter in table_versions,
+# so caches and HTTP validators in any process can tell when data changed
+TABLE_VERSION_POLL_SECONDS = float(os.getenv("TABLE_VERSION_POLL_SECONDS", "1.0"))
+
+_WRITTEN_TABLES = "written_tables"
+# Writes that change box-score lines a PerformanceStore may already hold also bump
+# this version: any update or delete of player_performances, and game date changes
+PERFORMANCE_REWRITES = "player_performances_rewrite"
+_REWRITE_COLUMNS = {"player_performances": None, "games": {"date"}}
+_PENDING_EVENTS = "pending_events"
+_commit_listeners: List[Callable[[set], None]] = []
+_event_listeners: List[Callable[[List[Dict]], None]] = []
+_version_lock = threading.Lock()
+_version_snapshot = {"fetched_at": float("-inf"), "versions": {}}
+
+def ensure_table_versions(connection):
+    """Create the version row of every table that does not have one yet"""
+    existing = set(connection.execute(select(TableVersion.table_name)).scalars())
+    missing = [name for name in Base.metadata.tables if name not in existing and name != TableVersion.__tablename__]
+    if missing:
+        connection.execute(insert(TableVersion), [{"table_name": name, "version": 0} for name in missing])
+
+def bump_table_versions(connection, tables: Iterable[str]):
+    tables = set(tables)
+    result = connection.execute(
+        update(TableVersion)
+        .where(TableVersion.table_name.in_(tables))
+        .values(version=TableVersion.version + 1, updated_at=datetime.utcnow())
+    )
+    if result.rowcount < len(tables):
+        existing = set(connection.execute(
+            select(TableVersion.table_name).where(TableVersion.table_name.in_(tables))
+        ).scalars())
+        connection.execute(insert(TableVersion), [
+            {"table_name": name, "version": 1, "updated_at": datetime.utcnow()} for name in tables - existing
+        ])
+
+def get_table_versions(db) -> Dict[str, Tuple[int, Optional[datetime]]]:
+    """(version, updated_at) per table, re-read at most every TABLE_VERSION_POLL_SECONDS.
+
+    Commits made by this process refresh the snapshot immediately; writes from other
+    processes become visible within the poll interval.
+    """
+    with _version_lock:
+        if time.monotonic() - _version_snapshot["fetched_at"] < TABLE_VERSION_POLL_SECONDS:
+            return _version_snapshot["versions"]
+
+    fetched_at = time.monotonic()
+    rows = db.execute(select(TableVersion.table_name, TableVersion.version, TableVersion.updated_at)).all()
+    versions = {name: (version, updated_at) for name, version, updated_at in rows}
+    with _version_lock:
+        _version_snapshot.update(fetched_at=fetched_at, versions=versions)
+    return versions
+
+def has_pending_writes(session: Session) -> bool:
+    """True when the session holds writes that are not committed yet"""
+    if session.new or session.dirty or session.deleted:
+        return True
+    return session.in_transaction() and bool(session.connection().info.get(_WRITTEN_TABLES))
+
+def on_tables_committed(listener: Callable[[set], None]):
+    """Call ``listener(table_names)`` after this process commits writes to those tables"""
+    _commit_listeners.append(listener)
+
+def on_events_committed(listener: Callable[[List[Dict]], None]):
+    """Call ``listener(events)`` with the change events queued by a transaction once it commits"""
+    _event_listeners.append(listener)
+
+def queue_commit_events(connection, events: Iterable[Dict]):
+    """Hold change events on ``connection`` until its session commits; no-op without listeners"""
+    if _event_listeners:
+        connection.info.setdefault(_PENDING_EVENTS, []).extend(events)
+
+def _rewrites_performances(name: str, clauseelement, multiparams, params) -> bool:
+    if name not in _REWRITE_COLUMNS or not isinstance(clauseelement, (Update, Delete)):
+        return False
+    columns = _REWRITE_COLUMNS[name]
+    if columns is None or isinstance(clauseelement, Delete):
+        return True
+    # Columns set by the statement itself, or by the parameters of an ORM flush
+    written = {getattr(key, "key", key) for key in (clauseelement._values or {})}
+    for parameters in [*(multiparams or []), params or {}]:
+        if isinstance(parameters, dict):
+            written.update(parameters)
+    return bool(columns & written)
+
+@event.listens_for(Engine, "after_execute")
+def _track_written_tables(conn, clauseelement, multiparams, params, execution_options, result):
+    if isinstance(clauseelement, UpdateBase):
+        name = getattr(getattr(clauseelement, "table", None), "name", None)
+        if name and name != TableVersion.__tablename__:
+            written = conn.info.setdefault(_WRITTEN_TABLES, set())
+            written.add(name)
+            if _rewrites_performances(name, clauseelement, multiparams, params):
+                written.add(PERFORMANCE_REWRITES)
+
+@event.listens_for(Engine, "rollback")
+def _forget_written_tables(conn):
+    conn.info.pop(_WRITTEN_TABLES, None)
+    conn.info.pop(_PENDING_EVENTS, None)
+
+@event.listens_for(Pool, "checkin")
+def _forget_written_tables_on_checkin(dbapi_connection, connection_record):
+    if connection_record is not None:
+        connection_record.info.pop(_WRITTEN_TABLES, None)
+        connection_record.info.pop(_PENDING_EVENTS, None)
+
+@event.listens_for(Session, "before_commit")
+def _bump_written_table_versions(session):
+    session.flush()
+    connection = session.connection()
+    written = connection.info.pop(_WRITTEN_TABLES, None)
+    if written:
+        bump_table_versions(connection, written)
+        session.info.setdefault(_WRITTEN_TABLES, set()).update(written)
+    events = connection.info.pop(_PENDING_EVENTS, None)
+    if events:
+        session.info.setdefault(_PENDING_EVENTS, []).extend(events)
+
+@event.listens_for(Session, "after_commit")
+def _notify_committed_tables(session):
+    written = session.info.pop(_WRITTEN_TABLES, None)
+    if written:
+        with _version_lock:
+            _version_snapshot["fetched_at"] = float("-inf")
+        for listener in _commit_listeners:
+            listener(written)
+    events = session.info.pop(_PENDING_EVENTS, None)
+    if events:
+        for listener in _event_listeners:
+            listener(events)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_committed_tables(session):
+    session.info.pop(_WRITTEN_TABLES, None)
+    session.info.pop(_PENDING_EVENTS, None)
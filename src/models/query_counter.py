@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+from typing import List, Tuple
+
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Records every SQL statement executed on an engine while active.
+
+    Works with both sync and async engines::
+
+        with QueryCounter(engine) as counter:
+            service.get_recent_games(50)
+        assert counter.count == 1
+    """
+
+    def __init__(self, engine):
+        self.engine = getattr(engine, "sync_engine", engine)
+        self.statements: List[Tuple[str, object]] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return False
+
+
+@contextmanager
+def assert_max_queries(engine, limit: int):
+    """Fail with the offending statements if the block runs more than ``limit`` queries"""
+    with QueryCounter(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        executed = "\n".join(statement for statement, _ in counter.statements)
+        raise AssertionError(f"Expected at most {limit} queries, {counter.count} were executed:\n{executed}")
@@ -0,0 +1,128 @@
+import argparse
+import re
+import sys
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .database import Team, Player, Game, PlayerPerformance, Odds, SessionLocal, create_tables, engine, is_sqlite
+from .query_counter import QueryCounter
+from ..data.pagination import encode_cursor
+
+# Tables that grow with league history; a full scan of these is always a regression
+LARGE_TABLES = {"games", "player_performances", "odds", "odds_latest"}
+
+_SQLITE_SCAN = re.compile(r"\bSCAN (?:TABLE )?(\w+)(?! USING (?:COVERING )?INDEX)(?!\w)")
+_POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def _service_calls(db: Session) -> List[tuple]:
+    """Representative call for every DataService query, using ids present in the database"""
+    team_id = db.scalar(select(Team.id).limit(1))
+    player_id = db.scalar(select(Player.id).limit(1))
+    game_id = db.scalar(select(Game.id).limit(1))
+    game_date = db.scalar(select(Game.date).where(Game.id == game_id))
+    return [
+        ("get_teams", ()),
+        ("get_teams_page", (10, None, "-win_pct")),
+        ("get_team_stats", (team_id,)),
+        ("get_players", ()),
+        ("get_players", (team_id,)),
+        ("get_players_page", (50, None, team_id)),
+        ("get_recent_games", (10,)),
+        ("get_games_page", (50,)),
+        ("get_games_page", (50, encode_cursor(["-date,-id", game_date, game_id]))),
+        ("get_games_page", (50, None, None, "-home_score", [f"date:eq:{game_date:%Y-%m}", "status:eq:completed"], 50, True)),
+        ("get_performances_page", (50, None, player_id)),
+        ("get_performances_page", (50, None, None, game_id)),
+        ("get_odds_page", (50, None, game_id)),
+        ("get_odds_page", (50, None, game_id, "-timestamp", ["bet_type:eq:spread"])),
+        ("get_player_stats", (player_id,)),
+        ("get_players_stats", (None, team_id)),
+        ("get_players_analysis", ([player_id],)),
+        ("get_players_form", ([player_id],)),
+        ("get_hit_rates", ([{"player_id": player_id, "stat": "points", "line": 20.5}],)),
+        ("get_odds_comparison", (game_id,)),
+        ("get_line_movement", (game_id, 60)),
+        ("get_odds_series", (game_id, "spread")),
+        ("get_player_series", (player_id,)),
+        ("get_odds_scanner", ()),
+        ("get_odds_scanner", ([game_id],)),
+        ("get_betting_insights", (player_id,)),
+    ]
+
+
+def _large_tables(db: Session, min_rows: Optional[int]) -> set:
+    tables = set(LARGE_TABLES)
+    if min_rows is not None:
+        for model in (Team, Player, Game, PlayerPerformance, Odds):
+            if db.scalar(select(func.count()).select_from(model)) >= min_rows:
+                tables.add(model.__tablename__)
+    return tables
+
+
+def audit_query_plans(db: Session, min_rows: Optional[int] = None) -> List[Dict]:
+    """Explain every statement issued by the DataService queries.
+
+    Returns one entry per statement with its plan and the large tables it
+    scans without an index (``full_scans``).
+    """
+    from ..data.cache import response_cache
+    from ..data.data_service import DataService
+
+    service = DataService(db)
+    large_tables = _large_tables(db, min_rows)
+    connection = db.connection()
+    sqlite = is_sqlite(str(connection.engine.url))
+    explain, scan_pattern = ("EXPLAIN QUERY PLAN ", _SQLITE_SCAN) if sqlite else ("EXPLAIN ", _POSTGRES_SCAN)
+
+    results = []
+    for method, args in _service_calls(db):
+        # Cached results would hide the statements being audited
+        response_cache.clear()
+        with QueryCounter(connection.engine) as counter:
+            getattr(service, method)(*args)
+
+        for statement, parameters in counter.statements:
+            if not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            plan_rows = connection.exec_driver_sql(explain + statement, parameters).all()
+            plan = [str(row[-1]) for row in plan_rows]
+            scans = {table for line in plan for table in scan_pattern.findall(line)}
+            results.append({
+                "method": method,
+                "statement": statement,
+                "plan": plan,
+                "full_scans": sorted(scans & large_tables),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if a DataService query full-scans a large table")
+    parser.add_argument("--min-rows", type=int, default=None,
+                        help="also treat any table with at least this many rows as large")
+    parser.add_argument("--verbose", action="store_true", help="print every plan, not only failures")
+    args = parser.parse_args()
+
+    create_tables()
+    with SessionLocal() as db:
+        results = audit_query_plans(db, args.min_rows)
+
+    failures = [result for result in results if result["full_scans"]]
+    for result in results:
+        if args.verbose or result["full_scans"]:
+            status = "FULL SCAN " + ", ".join(result["full_scans"]) if result["full_scans"] else "ok"
+            print(f"[{status}] {result['method']}")
+            print("    " + " ".join(result["statement"].split()))
+            for line in result["plan"]:
+                print(f"      {line}")
+
+    print(f"{len(results)} statements audited, {len(failures)} with full scans of large tables")
+    engine.dispose()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import os
+import tempfile
+
+import pytest
+
+# A throwaway SQLite database, set before src.models.database creates its engines
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+# Read table versions on every call, so query counts do not depend on timing
+os.environ["TABLE_VERSION_POLL_SECONDS"] = "0"
+
+from src.data.cache import response_cache  # noqa: E402
+from src.data.data_service import DataService  # noqa: E402
+from src.data.seed import SeedConfig, bulk_seed  # noqa: E402
+from src.models.database import SessionLocal, create_tables  # noqa: E402
+
+# Small enough to seed in a second, with several pages of every table
+TEST_SEED = SeedConfig(teams=6, players_per_team=4, games=120, scheduled_games=6, lines_per_game=8,
+                       odds_snapshots_per_game=2, season_days=60)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def dataset():
+    create_tables()
+    with SessionLocal() as db:
+        counts = bulk_seed(db, TEST_SEED)
+        db.commit()
+    return counts
+
+
+@pytest.fixture
+def service():
+    response_cache.clear()
+    service = DataService()
+    yield service
+    service.close()
@@ -0,0 +1,48 @@
+from sqlalchemy import select
+
+from src.data.aggregates import rebuild_aggregates, season_for_date
+from src.models.database import Game, Player, PlayerPerformance, PlayerSeasonAggregate, SessionLocal, Team
+
+
+def player_aggregates(db):
+    return db.execute(select(PlayerSeasonAggregate).order_by(PlayerSeasonAggregate.player_id,
+                                                             PlayerSeasonAggregate.season)).scalars().all()
+
+
+def as_rows(aggregates):
+    # Minutes are float sums, which differ in the last digits with summation order
+    return [{column.name: round(getattr(aggregate, column.name), 6) if column.name == "minutes_played"
+             else getattr(aggregate, column.name) for column in PlayerSeasonAggregate.__table__.columns}
+            for aggregate in aggregates]
+
+
+def test_rebuild_after_a_trade_matches_the_incremental_aggregates():
+    with SessionLocal() as db:
+        player = db.scalar(select(Player).order_by(Player.id).limit(1))
+        old_team = player.team_id
+        new_team = db.scalar(select(Team.id).where(Team.id != old_team).limit(1))
+        last_date = db.scalar(select(Game.date).join(PlayerPerformance, PlayerPerformance.game_id == Game.id)
+                              .where(PlayerPerformance.player_id == player.id)
+                              .order_by(Game.date.desc()).limit(1))
+        later_game = db.scalar(select(Game.id).where(Game.date > last_date).order_by(Game.date).limit(1))
+        season = season_for_date(last_date)
+
+        # Traded: past lines stay with the old team until a line for the new one lands
+        player.team_id = new_team
+        db.flush()
+        incremental = as_rows(player_aggregates(db))
+        rebuild_aggregates(db.connection())
+        db.expire_all()
+        assert as_rows(player_aggregates(db)) == incremental
+        assert db.get(PlayerSeasonAggregate, (player.id, season)).team_id == old_team
+
+        db.add(PlayerPerformance(player_id=player.id, game_id=later_game, points=10, minutes_played=20))
+        db.flush()
+        db.expire_all()
+        incremental = as_rows(player_aggregates(db))
+        rebuild_aggregates(db.connection(), [player.id])
+        db.expire_all()
+        assert as_rows(player_aggregates(db)) == incremental
+        later_season = season_for_date(db.get(Game, later_game).date)
+        assert db.get(PlayerSeasonAggregate, (player.id, later_season)).team_id == new_team
+        db.rollback()
@@ -0,0 +1,85 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import select, update
+
+from src.data.cache import TTLCache
+from src.models.database import SessionLocal, Team, engine
+from src.models.query_counter import QueryCounter
+
+
+@pytest.fixture
+def team():
+    with SessionLocal() as db:
+        team_id, wins = db.execute(select(Team.id, Team.wins).order_by(Team.id).limit(1)).one()
+    yield team_id
+    with SessionLocal() as db:
+        db.execute(update(Team).where(Team.id == team_id).values(wins=wins))
+        db.commit()
+
+
+def wins_of(teams, team_id):
+    return next(team["wins"] for team in teams if team["id"] == team_id)
+
+
+def test_cached_listing_only_reads_table_versions(service):
+    service.get_teams()
+    with QueryCounter(engine) as counter:
+        service.get_teams()
+    assert counter.count == 1
+    assert "table_versions" in counter.statements[0][0]
+
+
+def test_commit_in_this_process_invalidates(service, team):
+    service.get_teams()
+    with SessionLocal() as db:
+        db.execute(update(Team).where(Team.id == team).values(wins=99))
+        db.commit()
+    assert wins_of(service.get_teams(), team) == 99
+
+
+def test_commit_in_another_process_invalidates_through_table_versions(service, team):
+    service.get_teams()
+    # Straight through sqlite3, as another process would: no commit listener runs here
+    connection = sqlite3.connect(engine.url.database)
+    with connection:
+        connection.execute("UPDATE teams SET wins = 77 WHERE id = ?", (team,))
+        connection.execute("UPDATE table_versions SET version = version + 1 WHERE table_name = 'teams'")
+    connection.close()
+    assert wins_of(service.get_teams(), team) == 77
+
+
+def test_uncommitted_writes_bypass_the_cache(service, team):
+    cached = service.get_teams()
+    service.db.execute(update(Team).where(Team.id == team).values(wins=55))
+    assert wins_of(service.get_teams(), team) == 55
+    service.db.rollback()
+    assert service.get_teams() == cached
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.evictions == 1
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=2, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a", "missing") == "missing"
+    assert cache.expirations == 1
+
+
+def test_ttl_cache_invalidates_by_table():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("games", 1, ["games", "teams"])
+    cache.set("players", 2, ["players"])
+    cache.invalidate_tables(["teams"])
+    assert cache.get("games") is None
+    assert cache.get("players") == 2
+    assert cache.invalidations == 1
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import delete, func, select
+
+from src.data.columnar import import_table
+from src.models.database import Game, Odds, OddsLatest, SessionLocal
+
+BOOKMAKER = "Import Test"
+
+
+@pytest.fixture
+def game_id():
+    with SessionLocal() as db:
+        game_id = db.scalar(select(Game.id).limit(1))
+    yield game_id
+    with SessionLocal() as db:
+        db.execute(delete(Odds).where(Odds.bookmaker == BOOKMAKER))
+        db.execute(delete(OddsLatest).where(OddsLatest.bookmaker == BOOKMAKER))
+        db.commit()
+
+
+def write_odds(path, game_id, timestamps, with_timestamp=True):
+    columns = {
+        "game_id": [game_id] * len(timestamps),
+        "bookmaker": [BOOKMAKER] * len(timestamps),
+        "bet_type": ["moneyline"] * len(timestamps),
+        "selection": ["home"] * len(timestamps),
+        "odds_value": [float(100 + i) for i in range(len(timestamps))],
+    }
+    if with_timestamp:
+        columns["timestamp"] = pa.array(timestamps, type=pa.timestamp("us"))
+    pq.write_table(pa.table(columns), path)
+
+
+def test_snapshots_without_a_timestamp_rank_oldest(tmp_path, game_id):
+    path = str(tmp_path / "odds.parquet")
+    write_odds(path, game_id, [None, datetime(2024, 1, 2), None, datetime(2024, 1, 1)])
+    with SessionLocal() as db:
+        assert import_table(db, Odds, path, keep_ids=False) == 4
+        latest = db.execute(select(OddsLatest.odds_value, OddsLatest.timestamp)
+                            .where(OddsLatest.bookmaker == BOOKMAKER)).one()
+    assert latest == (101.0, datetime(2024, 1, 2))
+
+
+def test_only_snapshots_without_a_timestamp(tmp_path, game_id):
+    path = str(tmp_path / "odds.parquet")
+    write_odds(path, game_id, [None, None])
+    with SessionLocal() as db:
+        import_table(db, Odds, path, keep_ids=False)
+        latest = db.execute(select(OddsLatest.odds_value, OddsLatest.timestamp)
+                            .where(OddsLatest.bookmaker == BOOKMAKER)).one()
+    assert latest == (101.0, None)
+
+
+def test_odds_file_without_timestamps_is_rejected_before_writing(tmp_path, game_id):
+    path = str(tmp_path / "odds.parquet")
+    write_odds(path, game_id, [datetime(2024, 1, 1)] * 3, with_timestamp=False)
+    with SessionLocal() as db:
+        with pytest.raises(ValueError, match="no timestamp column"):
+            import_table(db, Odds, path, keep_ids=False)
+        db.rollback()
+        assert db.scalar(select(func.count()).select_from(Odds).where(Odds.bookmaker == BOOKMAKER)) == 0
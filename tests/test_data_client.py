@@ -0,0 +1,42 @@
+from src.client import data_client
+from src.client.data_client import HttpDataClient
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, etag=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = {"ETag": etag} if etag else {}
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Answers every URL with a body and an ETag, and a 304 when that ETag comes back"""
+
+    def __init__(self):
+        self.full_responses = 0
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        etag = f'"{url}"'
+        if (headers or {}).get("If-None-Match") == etag:
+            return FakeResponse(304)
+        self.full_responses += 1
+        return FakeResponse(200, {"url": url}, etag)
+
+
+def test_validated_responses_are_kept_in_a_bounded_lru(monkeypatch):
+    monkeypatch.setattr(data_client, "CACHE_MAX_ENTRIES", 3)
+    client = HttpDataClient("http://api.test")
+    client.session = FakeSession()
+
+    for game_id in range(10):
+        assert client._get(f"/games/{game_id}") == {"url": f"http://api.test/games/{game_id}"}
+    assert client._validated.stats()["size"] == 3
+
+    # The three most recent URLs revalidate with a 304, older ones download again
+    client._get("/games/9")
+    assert client.session.full_responses == 10
+    client._get("/games/0")
+    assert client.session.full_responses == 11
@@ -0,0 +1,37 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from src.api.main import app
+from src.models.database import PlayerPerformance, SessionLocal
+
+
+@pytest.fixture(scope="module")
+def player_id():
+    with SessionLocal() as db:
+        return db.scalar(select(PlayerPerformance.player_id).limit(1))
+
+
+@pytest.mark.parametrize("windows", ["5,0", "-3", "10,-1"])
+def test_hit_rate_windows_below_one_game_are_rejected_by_both_routes(player_id, windows):
+    client = TestClient(app)
+    by_query = client.get(f"/api/players/{player_id}/hit-rates",
+                          params={"stat": "points", "lines": "20.5", "windows": windows})
+    by_board = client.post("/api/props/hit-rates", json={
+        "props": [{"player_id": player_id, "stat": "points", "line": 20.5}],
+        "windows": [int(window) for window in windows.split(",")],
+    })
+    assert by_query.status_code == by_board.status_code == 422
+    assert by_query.json() == by_board.json()
+
+
+def test_both_routes_score_the_same_windows(player_id):
+    client = TestClient(app)
+    by_query = client.get(f"/api/players/{player_id}/hit-rates",
+                          params={"stat": "points", "lines": "20.5", "windows": "3,5"})
+    by_board = client.post("/api/props/hit-rates", json={
+        "props": [{"player_id": player_id, "stat": "points", "line": 20.5}], "windows": [3, 5],
+    })
+    assert by_query.status_code == by_board.status_code == 200
+    assert by_query.json() == by_board.json()
+    assert set(by_query.json()["results"][0]["windows"]) == {"last_3", "last_5"}
@@ -0,0 +1,66 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from src.data.ingestion import Batch, IngestionWorker, ingest, simulated_source
+from src.models.database import Game, PlayerPerformance, SessionLocal, Team
+
+
+def game_event(game, status, home_score=None, away_score=None):
+    return {"type": "game", **game, "status": status, "home_score": home_score, "away_score": away_score}
+
+
+def ingest_events(*batches):
+    for events in batches:
+        batch = Batch()
+        for event in events:
+            batch.add(event)
+        with SessionLocal() as db:
+            ingest(db.connection(), batch)
+            db.commit()
+
+
+def stored(game):
+    with SessionLocal() as db:
+        return db.execute(
+            select(Game.status, Game.home_score, Game.away_score)
+            .where(Game.home_team_id == game["home_team_id"], Game.away_team_id == game["away_team_id"],
+                   Game.date == datetime.fromisoformat(game["date"]))
+        ).one()
+
+
+def new_game(minutes):
+    with SessionLocal() as db:
+        home, away = db.scalars(select(Team.id).order_by(Team.id).limit(2)).all()
+    date = datetime(2100, 1, 1) + timedelta(minutes=minutes)
+    return {"home_team_id": home, "away_team_id": away, "date": date.isoformat()}
+
+
+def test_redelivered_game_events_never_move_a_game_back():
+    game = new_game(1)
+    ingest_events([game_event(game, "scheduled")], [game_event(game, "live", 50, 48)],
+                  [game_event(game, "completed", 101, 99)])
+    ingest_events([game_event(game, "scheduled")], [game_event(game, "live", 50, 48)], [game_event(game, "live")])
+    assert stored(game) == ("completed", 101, 99)
+
+
+def test_stale_events_in_one_batch_merge_forward():
+    game = new_game(2)
+    ingest_events([game_event(game, "live", 60, 62), game_event(game, "scheduled"), game_event(game, "live", 58, 70)])
+    assert stored(game) == ("live", 60, 70)
+
+
+def test_simulated_redeliveries_leave_every_played_game_completed():
+    worker = IngestionWorker(batch_size=200, max_batch_delay=0.01)
+    asyncio.run(worker.run(simulated_source(events=3000, seed=1, duplicate_ratio=0.2)))
+    assert worker.metrics.batches > 1
+
+    with SessionLocal() as db:
+        statuses = db.execute(
+            select(Game.status, Game.home_score).distinct()
+            .join(PlayerPerformance, PlayerPerformance.game_id == Game.id)
+            .where(Game.date > datetime.utcnow() + timedelta(days=300))
+        ).all()
+    assert statuses and {status for status, _ in statuses} == {"completed"}
+    assert all(score is not None for _, score in statuses)
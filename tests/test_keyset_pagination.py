@@ -0,0 +1,139 @@
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from src.api.main import app
+from src.data.data_service import DataService
+from src.data.pagination import InvalidCursor, decode_cursor, encode_cursor, stream_ndjson
+from src.models.database import AsyncSessionLocal, Game, Odds, PlayerPerformance, SessionLocal
+
+
+def walk(fetch, key, limit):
+    """Every row of a listing, page by page through next_cursor"""
+    rows, cursor = [], None
+    while True:
+        page = fetch(limit, cursor)
+        assert len(page[key]) <= limit
+        rows.extend(page[key])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return rows
+
+
+def test_cursor_round_trip():
+    values = ["-date,-id", datetime(2024, 1, 2, 3, 4, 5), 17]
+    assert decode_cursor(encode_cursor(values), 3) == values
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor([1, 2])])
+def test_malformed_cursor_is_rejected(service, cursor):
+    with pytest.raises(InvalidCursor):
+        service.get_performances_page(10, cursor)
+
+
+def test_performance_pages_cover_every_line_once(service):
+    ids = service.db.scalars(select(PlayerPerformance.id).order_by(PlayerPerformance.id)).all()
+    rows = walk(service.get_performances_page, "performances", 97)
+    assert [row["id"] for row in rows] == ids
+
+
+def test_performance_pages_for_one_player(service):
+    player_id = service.db.scalar(select(PlayerPerformance.player_id).limit(1))
+    rows = walk(lambda limit, cursor: service.get_performances_page(limit, cursor, player_id),
+                "performances", 7)
+    assert rows and {row["player_id"] for row in rows} == {player_id}
+    assert len(rows) == len(set(row["id"] for row in rows))
+
+
+def test_game_pages_follow_date_then_id(service):
+    games = service.db.execute(select(Game.id, Game.date)).all()
+    expected = [game.id for game in sorted(games, key=lambda game: (game.date, game.id), reverse=True)]
+    rows = walk(service.get_games_page, "games", 25)
+    assert [row["id"] for row in rows] == expected
+
+
+def test_cursor_of_another_sort_is_rejected(service):
+    cursor = service.get_games_page(10)["next_cursor"]
+    with pytest.raises(InvalidCursor, match="another sort order"):
+        service.get_games_page(10, cursor, sort="home_score")
+
+
+def test_odds_page_tolerates_missing_timestamps():
+    with SessionLocal() as db:
+        game_id = db.scalar(select(Game.id).limit(1))
+        snapshot = Odds(game_id=game_id, bookmaker="Test", bet_type="moneyline", selection="home", odds_value=100)
+        db.add(snapshot)
+        db.flush()
+        db.execute(Odds.__table__.update().where(Odds.id == snapshot.id).values(timestamp=None))
+        page = DataService(db).get_odds_page(5, None, game_id, sort="-id")
+        assert page["odds"][0]["id"] == snapshot.id
+        assert page["odds"][0]["timestamp"] is None
+        db.rollback()
+
+
+def test_ndjson_stream_yields_every_row_in_id_order():
+    with SessionLocal() as db:
+        game_id = db.scalar(select(Odds.game_id).limit(1))
+        ids = db.scalars(select(Odds.id).where(Odds.game_id == game_id).order_by(Odds.id)).all()
+
+    async def collect():
+        return [chunk async for chunk in stream_ndjson(AsyncSessionLocal, Odds, {"game_id": game_id}, chunk_size=5)]
+
+    chunks = asyncio.run(collect())
+    assert len(chunks) > 1
+    rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert [row["id"] for row in rows] == ids
+
+
+@pytest.mark.parametrize("sort", ["timestamp", "-timestamp", "bookmaker,-timestamp"])
+def test_pages_cross_null_sort_values(sort):
+    with SessionLocal() as db:
+        game_id = db.scalar(select(Odds.game_id).limit(1))
+        ids = db.scalars(select(Odds.id).where(Odds.game_id == game_id).order_by(Odds.id)).all()
+        db.execute(Odds.__table__.update().where(Odds.id.in_(ids[::3])).values(timestamp=None))
+        snapshots = db.execute(select(Odds.id, Odds.bookmaker, Odds.timestamp).where(Odds.game_id == game_id)).all()
+
+        # NULLs rank below every value, ties go by id in the direction of the last column
+        def by_time(row):
+            return row.timestamp is not None, row.timestamp or datetime.min, row.id
+
+        expected = {
+            "timestamp": sorted(snapshots, key=by_time),
+            "-timestamp": sorted(snapshots, key=by_time, reverse=True),
+            "bookmaker,-timestamp": sorted(sorted(snapshots, key=by_time, reverse=True), key=lambda row: row.bookmaker),
+        }[sort]
+        service = DataService(db)
+        rows = walk(lambda limit, cursor: service.get_odds_page(limit, cursor, game_id, sort=sort), "odds", 4)
+        assert [row["id"] for row in rows] == [row.id for row in expected]
+        db.rollback()
+
+
+def test_odds_listing_pages_by_timestamp_across_snapshots_without_one():
+    with SessionLocal() as db:
+        game_id = db.scalar(select(Odds.game_id).order_by(Odds.game_id.desc()).limit(1))
+        saved = db.execute(select(Odds.id, Odds.timestamp).where(Odds.game_id == game_id)).all()
+        db.execute(Odds.__table__.update().where(Odds.id.in_([row.id for row in saved[::2]])).values(timestamp=None))
+        db.commit()
+    try:
+        client = TestClient(app)
+        rows, cursor = [], None
+        while True:
+            response = client.get("/api/odds", params={"game_id": game_id, "sort": "timestamp", "limit": 3,
+                                                       **({"cursor": cursor} if cursor else {})})
+            assert response.status_code == 200, response.text
+            rows.extend(response.json()["odds"])
+            cursor = response.json()["next_cursor"]
+            if cursor is None:
+                break
+        assert sorted(row["id"] for row in rows) == sorted(row.id for row in saved)
+        missing = [row["timestamp"] is None for row in rows]
+        assert missing == sorted(missing, reverse=True)
+    finally:
+        with SessionLocal() as db:
+            for row in saved:
+                db.execute(Odds.__table__.update().where(Odds.id == row.id).values(timestamp=row.timestamp))
+            db.commit()
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+from src.data.odds_scanner import BET_TYPES, decimal_odds, implied_probability, scan_markets
+from src.data.odds_history import SELECTIONS
+from src.models.database import Game
+
+
+def current_odds(*lines):
+    """load_current_odds-shaped arrays for (game_id, bet_type, selection, bookmaker, odds, line) tuples"""
+    return {
+        "games": {game_id: {"game_id": game_id} for game_id, *_ in lines},
+        "game_id": np.array([line[0] for line in lines], dtype=np.int64),
+        "bet_type": np.array([BET_TYPES.index(line[1]) for line in lines], dtype=np.int64),
+        "side": np.array([SELECTIONS[line[1]].index(line[2]) for line in lines], dtype=np.int64),
+        "bookmaker": np.array([line[3] for line in lines], dtype=object),
+        "odds": np.array([line[4] for line in lines], dtype=float),
+        "line": np.array([np.nan if line[5] is None else line[5] for line in lines], dtype=float),
+    }
+
+
+def test_price_conversions():
+    american = np.array([-110, 100, 150, -200])
+    assert implied_probability(american) == pytest.approx([110 / 210, 0.5, 0.4, 2 / 3])
+    assert decimal_odds(american) == pytest.approx([1 + 100 / 110, 2.0, 2.5, 1.5])
+
+
+def test_hold_fair_probability_and_edge():
+    markets = scan_markets(current_odds(
+        (1, "moneyline", "home", "A", -110, None),
+        (1, "moneyline", "away", "A", -110, None),
+        (1, "moneyline", "home", "B", -105, None),
+        (1, "moneyline", "away", "B", -120, None),
+    ))
+    assert len(markets) == 1
+    market = markets[0]
+    assert market["bookmakers"] == 2
+    assert market["lowest_hold"]["bookmaker"] == "A"
+    assert market["lowest_hold"]["hold"] == pytest.approx(1 - 1 / (2 * 110 / 210), abs=1e-4)
+    home, away = market["sides"]
+    assert (home["bookmaker"], home["odds"]) == ("B", -105)
+    assert (away["bookmaker"], away["odds"]) == ("A", -110)
+    # Consensus: the mean of each bookmaker's no-vig probability
+    book_b = implied_probability([-105, -120])
+    assert home["fair_probability"] == pytest.approx((0.5 + book_b[0] / book_b.sum()) / 2, abs=1e-4)
+    assert home["fair_probability"] + away["fair_probability"] == pytest.approx(1, abs=1e-3)
+    assert home["edge"] == pytest.approx((1 + 100 / 105) * home["fair_probability"] - 1, abs=1e-3)
+    assert market["arbitrage"] is None
+
+
+def test_arbitrage_stakes():
+    markets = scan_markets(current_odds(
+        (1, "moneyline", "home", "A", 110, None),
+        (1, "moneyline", "away", "A", -130, None),
+        (1, "moneyline", "home", "B", -130, None),
+        (1, "moneyline", "away", "B", 115, None),
+    ), arbitrage_only=True)
+    assert len(markets) == 1
+    total = 1 / 2.1 + 1 / 2.15
+    arbitrage = markets[0]["arbitrage"]
+    assert arbitrage["margin"] == pytest.approx(1 / total - 1, abs=1e-4)
+    assert arbitrage["stakes"] == pytest.approx({"home": 1 / 2.1 / total, "away": 1 / 2.15 / total}, abs=1e-4)
+    # Equal payout whichever side wins
+    assert arbitrage["stakes"]["home"] * 2.1 == pytest.approx(arbitrage["stakes"]["away"] * 2.15, abs=1e-3)
+
+
+def test_spreads_are_only_compared_on_the_same_line():
+    markets = scan_markets(current_odds(
+        (1, "spread", "home", "A", -110, -3.5),
+        (1, "spread", "away", "A", -110, 3.5),
+        (1, "spread", "home", "B", 120, -4.5),
+        (1, "spread", "away", "B", -140, 4.5),
+    ))
+    assert sorted(market["line"] for market in markets) == [-4.5, -3.5]
+    assert all(market["bookmakers"] == 1 for market in markets)
+
+
+def test_one_sided_markets_and_edge_threshold():
+    odds = current_odds(
+        (1, "moneyline", "home", "A", -110, None),
+        (1, "moneyline", "away", "A", -110, None),
+        (2, "over_under", "over", "A", -110, 220.5),
+    )
+    assert [market["game_id"] for market in scan_markets(odds)] == [1]
+    assert scan_markets(odds, min_edge=0.01) == []
+    assert scan_markets(current_odds()) == []
+
+
+def test_scanner_reads_the_latest_lines(service):
+    game_id = service.db.scalar(select(Game.id).where(Game.status == "scheduled").limit(1))
+    markets = service.get_odds_scanner([game_id])
+    assert markets and {market["game_id"] for market in markets} == {game_id}
+    assert {market["bet_type"] for market in markets} <= set(BET_TYPES)
+    assert all(len(market["sides"]) == 2 for market in markets)
@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+import httpx
+from sqlalchemy import select, update
+
+from src.api.main import app
+from src.data.performance_store import PerformanceStore, performance_store
+from src.models.database import Player, PlayerPerformance, SessionLocal
+
+
+def test_concurrent_requests_load_the_snapshot_without_stalling():
+    with SessionLocal() as db:
+        player_ids = db.scalars(select(Player.id).order_by(Player.id).limit(8)).all()
+    # Every request finds no snapshot and reads one through the async session
+    performance_store._snapshot = performance_store._version = None
+
+    async def analyses():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get(f"/api/players/{player_id}/analysis")
+                                          for player_id in player_ids))
+
+    results = []
+    # A stalled event loop cannot time itself out, so wait from another thread
+    worker = threading.Thread(target=lambda: results.extend(asyncio.run(analyses())), daemon=True)
+    worker.start()
+    worker.join(timeout=60)
+    assert not worker.is_alive(), "concurrent analysis requests stalled"
+    assert [response.status_code for response in results] == [200] * len(player_ids)
+
+
+def test_rewrites_reload_the_snapshot():
+    store = PerformanceStore()
+    with SessionLocal() as db:
+        first = store.snapshot(db)
+        line_id, points = db.execute(select(PlayerPerformance.id, PlayerPerformance.points).limit(1)).one()
+        db.rollback()
+        try:
+            db.execute(update(PlayerPerformance).where(PlayerPerformance.id == line_id).values(points=points + 100))
+            db.commit()
+            second = store.snapshot(db)
+            assert second is not first
+            assert (second.stats == points + 100).any()
+            db.rollback()
+            assert store.snapshot(db) is second
+        finally:
+            db.execute(update(PlayerPerformance).where(PlayerPerformance.id == line_id).values(points=points))
+            db.commit()
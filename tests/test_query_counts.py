@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import select
+
+from src.data.cache import response_cache
+from src.models.database import Player, engine
+from src.models.query_counter import QueryCounter, assert_max_queries
+
+# The table-version read of the response cache, then the listing itself
+LISTING_QUERIES = 2
+
+
+def count_queries(call) -> int:
+    response_cache.clear()
+    with QueryCounter(engine) as counter:
+        call()
+    return counter.count
+
+
+@pytest.mark.parametrize("limit", [1, 10, 100])
+def test_recent_games_is_one_query(service, limit):
+    response_cache.clear()
+    with assert_max_queries(engine, LISTING_QUERIES):
+        games = service.get_recent_games(limit)
+    assert len(games) == limit
+    assert all(game["home_team"] and game["away_team"] for game in games)
+
+
+@pytest.mark.parametrize("limit", [1, 10, 100])
+def test_games_page_is_one_query(service, limit):
+    response_cache.clear()
+    with assert_max_queries(engine, LISTING_QUERIES):
+        page = service.get_games_page(limit)
+    assert len(page["games"]) == limit
+
+
+def test_games_page_queries_do_not_grow_with_page_size(service):
+    counts = {count_queries(lambda: service.get_games_page(limit, sort="-home_score", filters=["status:eq:completed"],
+                                                            total=True))
+              for limit in (1, 10, 100)}
+    # The page and its total
+    assert counts == {LISTING_QUERIES + 1}
+
+
+def test_player_stats_queries_do_not_grow_with_games_played(service):
+    player_ids = service.db.scalars(select(Player.id)).all()
+    games_played = {player_id: service.get_player_stats(player_id)["games_played"] for player_id in player_ids}
+    assert min(games_played.values()) < max(games_played.values())
+
+    counts = {count_queries(lambda: service.get_player_stats(player_id)) for player_id in player_ids}
+    assert counts == {LISTING_QUERIES}
+
+
+def test_assert_max_queries_reports_the_statements(service):
+    response_cache.clear()
+    with pytest.raises(AssertionError, match="Expected at most 1 queries, 2 were executed") as error:
+        with assert_max_queries(engine, 1):
+            service.get_recent_games(5)
+    assert "FROM games" in str(error.value)
@@ -0,0 +1,128 @@
+import pytest
+from sqlalchemy import select
+
+from src.client.tables import fetch_table_page, table_filters, table_sort
+from src.data.pagination import InvalidQuery
+from src.models.database import Game
+
+
+def walk(service, limit, **query):
+    rows, cursor = [], None
+    while True:
+        page = service.get_games_page(limit, cursor, **query)
+        rows.extend(page["games"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return rows
+
+
+def completed_games(service):
+    return service.db.execute(
+        select(Game.id, Game.date, Game.home_score).where(Game.status == "completed")
+    ).all()
+
+
+def test_sorted_and_filtered_pages(service):
+    games = completed_games(service)
+    expected = [game.id for game in sorted(games, key=lambda game: (game.home_score, game.id), reverse=True)]
+    rows = walk(service, 17, sort="-home_score", filters=["status:eq:completed"])
+    assert [row["id"] for row in rows] == expected
+
+
+def test_offset_and_cursor_reach_the_same_page(service):
+    query = {"sort": "home_team,-date", "filters": ["status:eq:completed"]}
+    first = service.get_games_page(10, **query)
+    by_cursor = service.get_games_page(10, first["next_cursor"], **query)
+    by_offset = service.get_games_page(10, offset=10, **query)
+    assert by_offset["games"] == by_cursor["games"]
+    assert by_offset["next_cursor"] == by_cursor["next_cursor"]
+
+
+def test_total_counts_every_matching_row(service):
+    page = service.get_games_page(5, filters=["status:eq:completed"], total=True)
+    assert page["total"] == len(completed_games(service))
+    assert "total" not in service.get_games_page(5, filters=["status:eq:completed"])
+
+
+def test_date_filter_matches_the_whole_month(service):
+    dates = service.db.scalars(select(Game.date)).all()
+    month = dates[0].strftime("%Y-%m")
+    rows = walk(service, 50, filters=[f"date:eq:{month}"])
+    assert len(rows) == sum(1 for date in dates if date.strftime("%Y-%m") == month)
+    assert all(row["date"].startswith(month) for row in rows)
+
+
+def test_text_filters_match_case_insensitively(service):
+    team = service.get_teams()[0]["name"]
+    rows = walk(service, 50, filters=[f"home_team:contains:{team[1:4].upper()}"])
+    assert rows and all(team[1:4].lower() in row["home_team"].lower() for row in rows)
+
+
+def test_teams_sorted_by_win_percentage(service):
+    teams = service.get_teams_page(50, sort="-win_pct")["teams"]
+    assert [team["win_pct"] for team in teams] == sorted((team["win_pct"] for team in teams), reverse=True)
+
+
+@pytest.mark.parametrize("filters, message", [
+    (["wins:contains:3"], "contains only applies to text columns"),
+    (["wins:gt:many"], "Invalid value in filter 'wins:gt:many'"),
+    (["rank:eq:1"], "Cannot filter by 'rank'"),
+    (["wins:like:3"], "Unknown filter operator 'like'"),
+])
+def test_invalid_filters(service, filters, message):
+    with pytest.raises(InvalidQuery, match=message):
+        service.get_teams_page(10, filters=filters)
+
+
+def test_invalid_sort(service):
+    with pytest.raises(InvalidQuery, match="Cannot sort by 'rank'"):
+        service.get_teams_page(10, sort="-rank")
+
+
+def test_table_query_translation():
+    assert table_sort([{"column_id": "date", "direction": "desc"}, {"column_id": "home_team", "direction": "asc"}]) \
+        == "-date,home_team"
+    assert table_sort([]) is None
+    assert table_filters('{status} scontains "live" && {home_score} >= 100') \
+        == ["status:contains:live", "home_score:ge:100"]
+    with pytest.raises(ValueError, match="Unsupported filter"):
+        table_filters("{status} matches x")
+
+
+class FakeFetch:
+    """A DataClient page getter over 25 rows, recording its calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, limit, cursor, offset, sort, filters, total):
+        self.calls.append({"cursor": cursor, "offset": offset, "total": total})
+        start = int(cursor) if cursor else offset
+        page = {"rows": list(range(start, min(start + limit, 25))),
+                "next_cursor": str(start + limit) if start + limit < 25 else None}
+        if total:
+            page["total"] = 25
+        return page
+
+
+def test_table_pages_step_by_cursor_and_recount_the_first_page():
+    fetch = FakeFetch()
+    page, pages, current, state = fetch_table_page(fetch, 0, 10, None, None, None)
+    assert (page["rows"][0], pages, current) == (0, 3, 0)
+    page, pages, current, state = fetch_table_page(fetch, 1, 10, None, None, state)
+    assert page["rows"][0] == 10
+    assert fetch.calls[-1] == {"cursor": "10", "offset": 0, "total": False}
+    # An unseen page is reached by offset
+    page, _, _, state = fetch_table_page(fetch, 2, 10, None, None, {**state, "cursors": {}})
+    assert fetch.calls[-1] == {"cursor": None, "offset": 20, "total": False}
+    fetch_table_page(fetch, 0, 10, None, None, state)
+    assert fetch.calls[-1]["total"] is True
+
+
+def test_new_table_query_starts_over():
+    fetch = FakeFetch()
+    _, _, _, state = fetch_table_page(fetch, 0, 10, None, None, None)
+    _, _, _, state = fetch_table_page(fetch, 1, 10, None, None, state)
+    _, _, current, state = fetch_table_page(fetch, 1, 10, [{"column_id": "date", "direction": "asc"}], None, state)
+    assert current == 0
+    assert fetch.calls[-1] == {"cursor": None, "offset": 0, "total": True}